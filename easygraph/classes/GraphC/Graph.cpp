@@ -1,3 +1,4 @@
+#include <limits>
 #include "Graph.h"
 
 //Է
@@ -92,7 +93,17 @@ void _add_one_node(Graph* self, PyObject* one_node_for_adding, PyObject* node_at
     }
 }
 
+// Sets an error and returns true if the graph is frozen.
+static bool frozen_error(Graph* self) {
+    if (self->frozen == nullptr)
+        return false;
+    PyErr_SetString(PyExc_RuntimeError, "Frozen graph can't be modified.");
+    return true;
+}
+
 PyObject* Graph_add_node(Graph* self, PyObject* args, PyObject* kwargs) {
+    if (frozen_error(self))
+        return nullptr;
     if(PyTuple_Size(args) != 1) {
         PyErr_Format(PyExc_TypeError, "add_node() takes only 1 positional argument.");
         return nullptr;
@@ -103,7 +114,8 @@ PyObject* Graph_add_node(Graph* self, PyObject* args, PyObject* kwargs) {
 }
 
 PyObject* Graph_add_nodes(Graph* self, PyObject* args, PyObject* kwargs) {
-    
+    if (frozen_error(self))
+        return nullptr;
     PyObject* nodes_for_adding = nullptr, * nodes_attr = nullptr;
     static char* kwlist[] = { (char*)"nodes_for_adding", (char*)"nodes_attr", NULL };
     if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O|O", kwlist, &nodes_for_adding, &nodes_attr))
@@ -162,6 +174,8 @@ void _add_one_edge(Graph* self, PyObject* pu, PyObject* pv, PyObject* edge_attr,
 }
 
 PyObject* Graph_add_edge(Graph* self, PyObject* args, PyObject* kwargs) {
+    if (frozen_error(self))
+        return nullptr;
     PyObject* u = nullptr, * v = nullptr;
     if(PyTuple_Size(args) != 2) {
         PyErr_Format(PyExc_TypeError, "add_edge() takes only 2 positional arguments.");
@@ -173,6 +187,8 @@ PyObject* Graph_add_edge(Graph* self, PyObject* args, PyObject* kwargs) {
 }
 
 PyObject* Graph_add_weighted_edge(Graph* self, PyObject* args, PyObject* kwargs) {
+    if (frozen_error(self))
+        return nullptr;
     PyObject* pu, * pv;
     float weight;
     static char* kwlist[] = { (char*)"u_of_edge", (char*)"v_of_edge", (char*)"weight", NULL };
@@ -197,6 +213,8 @@ PyObject* Graph_add_weighted_edge(Graph* self, PyObject* args, PyObject* kwargs)
 }
 
 PyObject * Graph_add_edges(Graph * self, PyObject* args, PyObject* kwargs) {
+    if (frozen_error(self))
+        return nullptr;
     PyObject* edges_for_adding, * edges_attr = nullptr;
     static char* kwlist[] = { (char*)"edges_for_adding", (char*)"edges_attr", NULL };
     if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O|O", kwlist, &edges_for_adding, &edges_attr))
@@ -223,48 +241,213 @@ PyObject * Graph_add_edges(Graph * self, PyObject* args, PyObject* kwargs) {
     return Py_BuildValue("");
 }
 
-PyObject* Graph_add_edges_from_file(Graph* self, PyObject* args, PyObject* kwargs) {
-    std::ios::sync_with_stdio(0);
-    char* file_path;
-    PyObject* weighted = Py_False;
-    static char* kwlist[] = { (char*)"file", (char*)"weighted", NULL };
-    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "s|O", kwlist, &file_path, &weighted))
-        return nullptr;
-    std::ifstream in;
-    in.open(file_path, std::ios::in);
-    in.imbue(std::locale(std::locale(), new commactype));
-    std::string data, key("weight");
-    std::string su, sv;
-    float weight;
-    while (in >> su >> sv) {
-        PyObject* pu = PyUnicode_FromString(su.c_str()), * pv = PyUnicode_FromString(sv.c_str());
-        int u, v;
-        if (!PyDict_Contains(self->node_to_id, pu)) {
-            _add_one_node(self, pu, nullptr);
-            u = self->id;
+// Returns a new reference to a list or tuple of the items of obj. NumPy
+// arrays go through tolist() so that their items are Python scalars.
+static PyObject* sequence_items(PyObject* obj) {
+    const char* message = "Edge arrays must be sequences.";
+    if (PyObject_HasAttrString(obj, "tolist")) {
+        PyObject* list = PyObject_CallMethod(obj, "tolist", nullptr);
+        if (list == nullptr)
+            return nullptr;
+        PyObject* items = PySequence_Fast(list, message);
+        Py_DECREF(list);
+        return items;
+    }
+    return PySequence_Fast(obj, message);
+}
+
+// The id of the node, added to the graph if needed, or -1 on error.
+static int node_id(Graph* self, PyObject* node) {
+    PyObject* id = PyDict_GetItemWithError(self->node_to_id, node);
+    if (id != nullptr)
+        return PyLong_AsLong(id);
+    if (PyErr_Occurred())
+        return -1;
+    _add_one_node(self, node, nullptr);
+    return self->id;
+}
+
+PyObject* Graph_add_edges_from_arrays(Graph* self, PyObject* args, PyObject* kwargs) {
+    if (frozen_error(self))
+        return nullptr;
+    Py_ssize_t n_args = PyTuple_Size(args);
+    if (n_args < 2 || n_args > 3) {
+        PyErr_Format(PyExc_TypeError, "add_edges_from_arrays() takes 2 or 3 positional arguments.");
+        return nullptr;
+    }
+    // The weights and the keyword columns, in the order of the attributes
+    PyObject* weights = n_args == 3 ? PyTuple_GetItem(args, 2) : nullptr;
+    PyObject* weights_keyword = kwargs ? PyDict_GetItemString(kwargs, "weights") : nullptr;
+    if (weights_keyword != nullptr) {
+        if (weights != nullptr) {
+            PyErr_Format(PyExc_TypeError, "add_edges_from_arrays() got multiple values for argument 'weights'.");
+            return nullptr;
         }
-        else
-            u = PyLong_AsLong(PyDict_GetItem(self->node_to_id, pu));
-        if (!PyDict_Contains(self->node_to_id, pv)) {
-            _add_one_node(self, pv, nullptr);
-            v = self->id;
+        weights = weights_keyword;
+    }
+    std::vector<std::string> names;
+    std::vector<PyObject*> arrays;
+    if (weights != nullptr && weights != Py_None) {
+        names.push_back("weight");
+        arrays.push_back(weights);
+    }
+    PyObject* py_key, * py_value;
+    Py_ssize_t pos = 0;
+    while (kwargs != nullptr && PyDict_Next(kwargs, &pos, &py_key, &py_value)) {
+        std::string key(PyUnicode_AsUTF8(py_key));
+        if (key == "weights")
+            continue;
+        if (key == "weight" && !arrays.empty() && names[0] == "weight") {
+            PyErr_SetString(PyExc_AssertionError, "The weights are given twice.");
+            return nullptr;
         }
-        else
-            v = PyLong_AsLong(PyDict_GetItem(self->node_to_id, pv));
-        if (PyObject_IsTrue(weighted)) {
-            in >> weight;
-            self->adj[u][v][key] = self->adj[v][u][key] = weight;
+        names.push_back(key);
+        arrays.push_back(py_value);
+    }
+
+    PyObject* src = sequence_items(PyTuple_GetItem(args, 0));
+    PyObject* dst = src ? sequence_items(PyTuple_GetItem(args, 1)) : nullptr;
+    std::vector<PyObject*> columns;
+    std::vector<float> values;
+    std::vector<int> ends, degree;
+    std::vector<std::unordered_map<int, std::map<std::string, float>>*> rows;
+    PyObject* result = nullptr;
+    Py_ssize_t n_edges = 0;
+    if (dst == nullptr)
+        goto done;
+    n_edges = PySequence_Fast_GET_SIZE(src);
+    if (PySequence_Fast_GET_SIZE(dst) != n_edges) {
+        PyErr_SetString(PyExc_AssertionError, "The edge arrays and attribute columns must have the same length.");
+        goto done;
+    }
+    // The values are converted first, so that a bad one leaves the graph as it was
+    for (PyObject* array : arrays) {
+        PyObject* column = sequence_items(array);
+        if (column == nullptr)
+            goto done;
+        columns.push_back(column);
+        if (PySequence_Fast_GET_SIZE(column) != n_edges) {
+            PyErr_SetString(PyExc_AssertionError, "The edge arrays and attribute columns must have the same length.");
+            goto done;
         }
-        else {
-            if (!self->adj[u].count(v)) {
-                self->adj[u][v] = std::map<std::string, float>();
-            }
-            if (!self->adj[v].count(u)) {
-                self->adj[v][u] = std::map<std::string, float>();
-            }
+    }
+    values.reserve(columns.size() * n_edges);
+    for (Py_ssize_t i = 0; i < n_edges; i++) {
+        for (PyObject* column : columns) {
+            values.push_back(PyFloat_AsDouble(PySequence_Fast_GET_ITEM(column, i)));
+            if (PyErr_Occurred())
+                goto done;
         }
     }
-    in.close();
+    ends.resize(2 * n_edges);
+    for (Py_ssize_t i = 0; i < n_edges; i++) {
+        ends[2 * i] = node_id(self, PySequence_Fast_GET_ITEM(src, i));
+        if (ends[2 * i] < 0)
+            goto done;
+        ends[2 * i + 1] = node_id(self, PySequence_Fast_GET_ITEM(dst, i));
+        if (ends[2 * i + 1] < 0)
+            goto done;
+    }
+    // The rows of the adjacency are looked up and grown once per node
+    degree.resize(self->id + 1);
+    for (Py_ssize_t i = 0; i < n_edges; i++) {
+        degree[ends[2 * i]]++;
+        degree[ends[2 * i + 1]] += ends[2 * i] != ends[2 * i + 1];
+    }
+    rows.resize(self->id + 1);
+    for (size_t id = 0; id < degree.size(); id++) {
+        if (degree[id]) {
+            rows[id] = &(self->adj[id]);
+            rows[id]->reserve(rows[id]->size() + degree[id]);
+        }
+    }
+    for (Py_ssize_t i = 0; i < n_edges; i++) {
+        int u = ends[2 * i], v = ends[2 * i + 1];
+        std::map<std::string, float>& uv = (*rows[u])[v];
+        std::map<std::string, float>& vu = (*rows[v])[u];
+        const float* row = values.data() + i * names.size();
+        for (size_t j = 0; j < names.size(); j++)
+            uv[names[j]] = vu[names[j]] = row[j];
+    }
+    result = Py_BuildValue("");
+done:
+    for (PyObject* column : columns)
+        Py_DECREF(column);
+    Py_XDECREF(src);
+    Py_XDECREF(dst);
+    return result;
+}
+
+PyObject* Graph_add_edges_from_file(Graph* self, PyObject* args, PyObject* kwargs) {
+    if (frozen_error(self))
+        return nullptr;
+    char* file_path;
+    PyObject* weighted = Py_False;
+    int n_workers = 0;
+    static char* kwlist[] = { (char*)"file", (char*)"weighted", (char*)"n_workers", NULL };
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "s|Oi", kwlist, &file_path, &weighted, &n_workers))
+        return nullptr;
+    int is_weighted = PyObject_IsTrue(weighted);
+    if (is_weighted < 0)
+        return nullptr;
+    // The file is parsed without the GIL, only the node table needs Python objects
+    MappedFile file;
+    EdgeListData edges;
+    bool opened = false, no_memory = false;
+    Py_BEGIN_ALLOW_THREADS
+    try {
+        opened = file.open(file_path);
+        if (opened)
+            read_edge_list(file.data, file.size, is_weighted, n_workers, edges);
+    }
+    catch (std::bad_alloc&) {
+        no_memory = true;
+    }
+    Py_END_ALLOW_THREADS
+    if (!opened)
+        return PyErr_SetFromErrnoWithFilename(PyExc_OSError, file_path);
+    if (no_memory)
+        return PyErr_NoMemory();
+    if (edges.bad_line) {
+        PyErr_Format(PyExc_ValueError, "%s, line %zu: expected %s.", file_path, edges.bad_line,
+            is_weighted ? "two nodes and a weight" : "two nodes");
+        return nullptr;
+    }
+    std::vector<EdgeListToken>& tokens = edges.tokens;
+    std::vector<int> ids(tokens.size());
+    for (size_t i = 0; i < tokens.size(); i++) {
+        PyObject* node = PyUnicode_FromStringAndSize(tokens[i].data, tokens[i].size);
+        if (node == nullptr)
+            return nullptr;
+        PyObject* id = PyDict_GetItemWithError(self->node_to_id, node);
+        if (id != nullptr)
+            ids[i] = PyLong_AsLong(id);
+        else if (!PyErr_Occurred()) {
+            _add_one_node(self, node, nullptr);
+            ids[i] = self->id;
+        }
+        Py_DECREF(node);
+        if (PyErr_Occurred())
+            return nullptr;
+    }
+    std::vector<int> degree(tokens.size());
+    for (size_t j = 0; j < edges.src.size(); j++) {
+        degree[edges.src[j]]++;
+        degree[edges.dst[j]] += edges.src[j] != edges.dst[j];
+    }
+    std::vector<std::unordered_map<int, std::map<std::string, float>>*> rows(tokens.size());
+    for (size_t i = 0; i < tokens.size(); i++) {
+        rows[i] = &(self->adj[ids[i]]);
+        rows[i]->reserve(rows[i]->size() + degree[i]);
+    }
+    std::string key("weight");
+    for (size_t j = 0; j < edges.src.size(); j++) {
+        int u = edges.src[j], v = edges.dst[j];
+        std::map<std::string, float>& uv = (*rows[u])[ids[v]];
+        std::map<std::string, float>& vu = (*rows[v])[ids[u]];
+        if (is_weighted)
+            uv[key] = vu[key] = edges.weights[j];
+    }
     return Py_BuildValue("");
 }
 
@@ -347,6 +530,8 @@ void _remove_one_node(Graph* self, PyObject* node_to_remove) {
 }
 
 PyObject* Graph_remove_node(Graph* self, PyObject* args, PyObject* kwargs) {
+    if (frozen_error(self))
+        return nullptr;
     PyObject* node_to_remove;
     static char* kwlist[] = { (char*)"node_to_remove", NULL };
     if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O", kwlist, &node_to_remove)) {
@@ -357,6 +542,8 @@ PyObject* Graph_remove_node(Graph* self, PyObject* args, PyObject* kwargs) {
 } 
 
 PyObject* Graph_remove_nodes(Graph* self, PyObject* args, PyObject* kwargs) {
+    if (frozen_error(self))
+        return nullptr;
     PyObject* nodes_to_remove;
     static char* kwlist[] = { (char*)"nodes_to_remove", NULL };
     if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O", kwlist, &nodes_to_remove))
@@ -386,6 +573,8 @@ void _remove_one_edge(Graph* self, int u, int v) {
 }
 
 PyObject* Graph_remove_edge(Graph* self, PyObject* args, PyObject* kwargs) {
+    if (frozen_error(self))
+        return nullptr;
     PyObject* pu , * pv;
     static char* kwlist[] = { (char*)"u", (char*)"v", NULL };
     if (!PyArg_ParseTupleAndKeywords(args, kwargs, "OO", kwlist, &pu, &pv))
@@ -406,6 +595,8 @@ PyObject* Graph_remove_edge(Graph* self, PyObject* args, PyObject* kwargs) {
 }
 
 PyObject* Graph_remove_edges(Graph* self, PyObject* args, PyObject* kwargs) {
+    if (frozen_error(self))
+        return nullptr;
     PyObject* edges_to_remove;
     static char* kwlist[] = { (char*)"edges_to_remove", NULL };
     if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O", kwlist, &edges_to_remove))
@@ -480,7 +671,11 @@ PyObject* Graph_number_of_edges(Graph* self, PyObject* args, PyObject* kwargs) {
 }
 
 PyObject* Graph_is_directed(Graph* self, PyObject* args, PyObject* kwargs) {
-    return Py_False;
+    Py_RETURN_FALSE;
+}
+
+PyObject* Graph_is_multigraph(Graph* self, PyObject* args, PyObject* kwargs) {
+    Py_RETURN_FALSE;
 }
 
 PyMethodDef GraphMethods[] = {
@@ -488,6 +683,7 @@ PyMethodDef GraphMethods[] = {
     {"add_nodes", (PyCFunction)Graph_add_nodes, METH_VARARGS | METH_KEYWORDS, "" },
     {"add_edge", (PyCFunction)Graph_add_edge, METH_VARARGS | METH_KEYWORDS, "" },
     {"add_edges", (PyCFunction)Graph_add_edges, METH_VARARGS | METH_KEYWORDS, ""},
+    {"add_edges_from_arrays", (PyCFunction)Graph_add_edges_from_arrays, METH_VARARGS | METH_KEYWORDS, ""},
     {"add_weighted_edge", (PyCFunction)Graph_add_weighted_edge, METH_VARARGS | METH_KEYWORDS, ""},
     {"add_edges_from_file", (PyCFunction)Graph_add_edges_from_file, METH_VARARGS | METH_KEYWORDS, ""},
     {"degree", (PyCFunction)Graph_degree, METH_VARARGS | METH_KEYWORDS, ""},
@@ -503,6 +699,12 @@ PyMethodDef GraphMethods[] = {
     {"number_of_nodes", (PyCFunction)Graph_number_of_nodes, METH_VARARGS | METH_KEYWORDS, ""},
     {"number_of_edges", (PyCFunction)Graph_number_of_edges, METH_VARARGS | METH_KEYWORDS, ""},
     {"is_directed", (PyCFunction)Graph_is_directed, METH_VARARGS | METH_KEYWORDS, ""},
+    {"is_multigraph", (PyCFunction)Graph_is_multigraph, METH_VARARGS | METH_KEYWORDS, ""},
+    {"freeze", (PyCFunction)Graph_freeze, METH_VARARGS | METH_KEYWORDS,
+        "freeze()\n--\n\nMakes the graph read-only and returns it. The adjacency is also kept in\n"
+        "compressed sparse rows, read in place by the native algorithms, which then\n"
+        "skip rebuilding it on every call. The copy adds to the memory of the graph."},
+    {"is_frozen", (PyCFunction)Graph_is_frozen, METH_VARARGS | METH_KEYWORDS, ""},
     {"copy", (PyCFunction)Graph_copy, METH_VARARGS | METH_KEYWORDS, ""},
     {"nodes_subgraph", (PyCFunction)Graph_nodes_subgraph, METH_VARARGS | METH_KEYWORDS, ""},
     {"ego_subgraph", (PyCFunction)Graph_ego_subgraph, METH_VARARGS | METH_KEYWORDS, ""},
@@ -573,6 +775,7 @@ void* Graph_dealloc(PyObject* obj) {
     Graph* self = (Graph*)obj;
     self->node.~unordered_map<int, std::map<std::string, float>>();
     self->adj.~unordered_map<int, std::unordered_map<int, std::map<std::string, float>>>();
+    delete self->frozen;
     Py_TYPE(self->id_to_node)->tp_free(self->id_to_node);
     Py_TYPE(self->node_to_id)->tp_free(self->node_to_id);
     Py_TYPE(obj)->tp_free(obj);
@@ -644,6 +847,50 @@ PyTypeObject GraphType = {
 #endif
 };
 
+// Makes the graph read-only, with its adjacency also kept in compressed
+// sparse rows, which the native kernels read in place instead of walking the
+// hash maps. This trades memory for the speed of repeated kernel calls.
+PyObject* Graph_freeze(Graph* self, PyObject* args, PyObject* kwargs) {
+    if (self->frozen == nullptr) {
+        FrozenAdj* f = new FrozenAdj;
+        f->index.assign(self->id + 1, -1);
+        for (auto& v : self->node) {
+            f->index[v.first] = f->ids.size();
+            f->ids.push_back(v.first);
+        }
+        size_t n = f->ids.size(), m = 0;
+        for (auto& row : self->adj)
+            m += row.second.size();
+        f->indptr.assign(n + 1, 0);
+        f->nbrs.reserve(m);
+        for (size_t i = 0; i < n; i++) {
+            auto row = self->adj.find(f->ids[i]);
+            if (row != self->adj.end()) {
+                for (auto& w : row->second) {
+                    size_t k = f->nbrs.size();
+                    f->nbrs.push_back(f->index[w.first]);
+                    for (auto& attr : w.second) {
+                        auto column = f->schema.emplace(attr.first, f->columns.size());
+                        if (column.second)
+                            f->columns.emplace_back(m, std::numeric_limits<float>::quiet_NaN());
+                        f->columns[column.first->second][k] = attr.second;
+                    }
+                }
+            }
+            f->indptr[i + 1] = f->nbrs.size();
+        }
+        self->frozen = f;
+    }
+    Py_INCREF(self);
+    return (PyObject*)self;
+}
+
+PyObject* Graph_is_frozen(Graph* self, PyObject* args, PyObject* kwargs) {
+    if (self->frozen != nullptr)
+        Py_RETURN_TRUE;
+    Py_RETURN_FALSE;
+}
+
 PyObject* Graph_copy(Graph* self, PyObject* args, PyObject* kwargs) {
     Graph* temp_graph = (Graph*)PyObject_CallFunctionObjArgs((PyObject*)&GraphType, nullptr);
     temp_graph->graph = PyDict_Copy(self->graph);
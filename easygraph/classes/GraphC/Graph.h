@@ -10,6 +10,21 @@ union edge_tuple {
     long long val;
 };
 
+// A copy of the adjacency in compressed sparse rows, made by Graph_freeze as
+// a cache for the native kernels, which read it in place. It is kept besides
+// the hash maps, which still serve adj and edges, so a frozen graph takes
+// more memory, not less. Each edge attribute name is interned once into a
+// column of per-edge values, where NaN marks the edges without the attribute.
+struct FrozenAdj {
+    std::vector<int> ids;  // node ids by index
+    std::vector<int> index;  // indices by node id, -1 for the removed ids
+    std::vector<size_t> indptr;  // the neighbors of i are nbrs[indptr[i]:indptr[i + 1]]
+    std::vector<int> nbrs;
+    std::unordered_map<std::string, int> schema;  // attribute name -> column
+    std::vector<std::vector<float>> columns;
+    std::unordered_map<std::string, std::vector<double>> weights;  // kernel weights by key, made on first use
+};
+
 struct Graph {
     PyObject_HEAD
         PyObject* graph;
@@ -17,6 +32,7 @@ struct Graph {
     std::unordered_map<int, std::unordered_map<int, std::map<std::string, float>>> adj;
     PyObject* node_to_id, * id_to_node;
     int id;
+    FrozenAdj* frozen = nullptr;
 };
 
 PyObject* Graph_get_graph(Graph* self, void*);
@@ -42,6 +58,8 @@ PyObject* Graph_add_weighted_edge(Graph* self, PyObject* args, PyObject* kwargs)
 
 PyObject* Graph_add_edges(Graph* self, PyObject* args, PyObject* kwargs);
 
+PyObject* Graph_add_edges_from_arrays(Graph* self, PyObject* args, PyObject* kwargs);
+
 PyObject* Graph_add_edges_from_file(Graph* self, PyObject* args, PyObject* kwargs);
 
 PyObject* Graph_degree(Graph* self, PyObject* args, PyObject* kwargs);
@@ -71,6 +89,11 @@ PyObject* Graph_number_of_nodes(Graph* self, PyObject* args, PyObject* kwargs);
 PyObject* Graph_number_of_edges(Graph* self, PyObject* args, PyObject* kwargs);
 
 PyObject* Graph_is_directed(Graph* self, PyObject* args, PyObject* kwargs);
+PyObject* Graph_is_multigraph(Graph* self, PyObject* args, PyObject* kwargs);
+
+PyObject* Graph_freeze(Graph* self, PyObject* args, PyObject* kwargs);
+
+PyObject* Graph_is_frozen(Graph* self, PyObject* args, PyObject* kwargs);
 
 PyObject* Graph_copy(Graph* self, PyObject* args, PyObject* kwargs);
 
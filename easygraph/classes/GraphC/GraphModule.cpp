@@ -4,6 +4,11 @@ PyMethodDef ModuleMethods[] = {  //method list
     {"cpp_effective_size", (PyCFunction)effective_size, METH_VARARGS | METH_KEYWORDS, "" },
     {"cpp_constraint", (PyCFunction)constraint, METH_VARARGS | METH_KEYWORDS, "" },
     {"cpp_hierarchy", (PyCFunction)hierarchy, METH_VARARGS | METH_KEYWORDS, "" },
+    {"cpp_triangles", (PyCFunction)triangles, METH_VARARGS | METH_KEYWORDS, "" },
+    {"cpp_bfs", (PyCFunction)bfs, METH_VARARGS | METH_KEYWORDS, "" },
+    {"cpp_dijkstra", (PyCFunction)dijkstra, METH_VARARGS | METH_KEYWORDS, "" },
+    {"cpp_connected_components", (PyCFunction)connected_components, METH_VARARGS | METH_KEYWORDS, "" },
+    {"cpp_betweenness_centrality", (PyCFunction)betweenness_centrality, METH_VARARGS | METH_KEYWORDS, "" },
     {NULL}
 };
 
@@ -1,157 +1,418 @@
+#include <algorithm>
+#include <atomic>
+#include <cmath>
+#include <new>
+#include <queue>
+#include <thread>
 #include "ModuleMethods.h"
 
-std::unordered_map<long long, float> sum_nmw_rec, max_nmw_rec, local_constraint_rec;
+// A read-only array owned by someone else.
+template <typename T>
+struct ArrayView {
+	const T* data = nullptr;
+	size_t n = 0;
 
-float mutual_weight(mimimsf_t& G, int u, int v, std::string weight = "None") {
-	float a_uv = 0, a_vu = 0;
-	if (G.count(u) && G[u].count(v)) {
-		msf_t& guv = G[u][v];
-		a_uv = guv.count(weight) ? guv[weight] : 1;
+	void view(const std::vector<T>& v) {
+		data = v.data();
+		n = v.size();
 	}
-	if (G.count(v) && G[v].count(u)) {
-		msf_t& gvu = G[v][u];
-		a_uv = gvu.count(weight) ? gvu[weight] : 1;
+	const T& operator[](size_t i) const { return data[i]; }
+	size_t size() const { return n; }
+};
+
+// The adjacency of a graph as arrays indexed from 0, which the native kernels
+// read without the GIL. The arrays of a frozen graph are used in place, the
+// others are copied from the hash maps into arrays owned by the struct.
+struct NativeCSR {
+	ArrayView<int> ids;  // node ids by index
+	ArrayView<int> index;  // indices by node id, -1 for the removed ids
+	ArrayView<size_t> indptr;  // the neighbors of i are nbrs[indptr[i]:indptr[i + 1]]
+	ArrayView<int> nbrs;
+	ArrayView<double> weights;
+	FrozenAdj storage;  // the arrays of a graph that is not frozen
+
+	NativeCSR() {}
+private:
+	NativeCSR(const NativeCSR&);
+	NativeCSR& operator=(const NativeCSR&);
+};
+
+// The weights of the edges of a frozen graph for the key weight, made once
+// from its column. Edges without the attribute, or every edge if weight is
+// empty, weigh 1.
+static const std::vector<double>& frozen_weights(FrozenAdj& f, const std::string& weight) {
+	auto found = f.weights.find(weight);
+	if (found != f.weights.end())
+		return found->second;
+	std::vector<double> weights(f.nbrs.size(), 1);
+	auto column = weight.empty() ? f.schema.end() : f.schema.find(weight);
+	if (column != f.schema.end()) {
+		const std::vector<float>& values = f.columns[column->second];
+		for (size_t k = 0; k < values.size(); k++) {
+			if (!std::isnan(values[k]))
+				weights[k] = values[k];
+		}
+	}
+	return f.weights[weight] = std::move(weights);
+}
+
+// Must be called with the GIL, which guards the weights of frozen graphs.
+static void build_csr(Graph* graph, const std::string& weight, NativeCSR& t) {
+	FrozenAdj* f = graph->frozen;
+	if (f == nullptr) {
+		f = &t.storage;
+		std::vector<double>& weights = f->weights[weight];
+		f->index.assign(graph->id + 1, -1);
+		for (auto& v : graph->node) {
+			f->index[v.first] = f->ids.size();
+			f->ids.push_back(v.first);
+		}
+		size_t n = f->ids.size();
+		f->indptr.assign(n + 1, 0);
+		for (size_t i = 0; i < n; i++) {
+			auto row = graph->adj.find(f->ids[i]);
+			if (row != graph->adj.end()) {
+				for (auto& w : row->second) {
+					double a = 1;
+					if (!weight.empty()) {
+						auto found = w.second.find(weight);
+						if (found != w.second.end())
+							a = found->second;
+					}
+					f->nbrs.push_back(f->index[w.first]);
+					weights.push_back(a);
+				}
+			}
+			f->indptr[i + 1] = f->nbrs.size();
+		}
 	}
-	return a_uv + a_vu;
+	t.ids.view(f->ids);
+	t.index.view(f->index);
+	t.indptr.view(f->indptr);
+	t.nbrs.view(f->nbrs);
+	t.weights.view(frozen_weights(*f, weight));
 }
 
-float normalized_mutual_weight(mimimsf_t& G, int u, int v, std::string weight = "None", int norm = 0) {
-	edge_tuple edge = { u, v };
-	auto& nmw_rec = norm ? sum_nmw_rec : max_nmw_rec;
-	if (nmw_rec.count(edge.val)) {
-		return nmw_rec[edge.val];
+// The sums and maxima of the weights around each node, which normalize the
+// mutual weights.
+struct BurtTables : NativeCSR {
+	std::vector<double> sum_scale, max_scale;
+
+	// Normalized mutual weight of the k-th edge, leaving i
+	double sum_nmw(int i, size_t k) const {
+		return sum_scale[i] ? weights[k] / sum_scale[i] : 0;
 	}
-	else {
-		float scale = 0;
-		for (auto& w : G[u]) {
-			scale += mutual_weight(G, u, w.first, weight);
+	double max_nmw(int i, size_t k) const {
+		return max_scale[i] ? weights[k] / max_scale[i] : 0;
+	}
+};
+
+// The mutual weight of an undirected edge is twice its weight, which cancels
+// out in the normalized mutual weights.
+static void build_tables(Graph* graph, const std::string& weight, BurtTables& t) {
+	build_csr(graph, weight, t);
+	size_t n = t.ids.size();
+	t.sum_scale.assign(n, 0);
+	t.max_scale.assign(n, 0);
+	for (size_t i = 0; i < n; i++) {
+		for (size_t k = t.indptr[i]; k < t.indptr[i + 1]; k++) {
+			double a = t.weights[k];
+			t.sum_scale[i] += a;
+			if (k == t.indptr[i] || a > t.max_scale[i])
+				t.max_scale[i] = a;
 		}
-		float nmw;
-		nmw = scale ? mutual_weight(G, u, v, weight) / scale : 0;
-		nmw_rec[edge.val] = nmw;
-		return nmw;
 	}
 }
 
-inline float redundancy(mimimsf_t& G, int u, int v, std::string weight = "None") {
-	float r = 0;
-	for (auto& w : G[u]) {
-		r += normalized_mutual_weight(G, u, w.first, weight) * normalized_mutual_weight(G, v, w.first, weight);
+// The key of the weight attribute, empty if weight is None.
+static bool weight_key_of(PyObject* weight, std::string& key) {
+	if (weight == Py_None)
+		return true;
+	const char* chars = PyUnicode_AsUTF8(weight);
+	if (chars == nullptr)
+		return false;
+	key = chars;
+	return true;
+}
+
+// The number of threads for n_workers: one if None, all the cores if not
+// positive, or -1 on error.
+static int n_threads_of(PyObject* n_workers) {
+	if (n_workers == Py_None)
+		return 1;
+	long n_threads = PyLong_AsLong(n_workers);
+	if (n_threads == -1 && PyErr_Occurred())
+		return -1;
+	if (n_threads <= 0)
+		n_threads = std::max(1u, std::thread::hardware_concurrency());
+	return n_threads;
+}
+
+// The index of a node of the graph, or -1 with a KeyError set.
+static int index_of(Graph* graph, const NativeCSR& t, PyObject* node) {
+	PyObject* id = PyDict_GetItemWithError(graph->node_to_id, node);
+	if (id == nullptr) {
+		if (!PyErr_Occurred())
+			PyErr_SetObject(PyExc_KeyError, node);
+		return -1;
 	}
-	return 1 - r;
+	return t.index[PyLong_AsLong(id)];
 }
 
-PyObject* effective_size(PyObject* easygraph, PyObject* args, PyObject* kwargs) {
-	PyObject* nodes = Py_None, * weight = Py_None;
-	Graph *graph = nullptr;
-	static char* kwlist[] = { (char*)"G", (char*)"nodes", (char*)"weight", NULL };
-	if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O|OO", kwlist, &graph, &nodes, &weight))
+// The node of the index i, as a borrowed reference.
+static PyObject* node_of(Graph* graph, const NativeCSR& t, int i) {
+	PyObject* id = PyLong_FromLong(t.ids[i]);
+	if (id == nullptr)
 		return nullptr;
-	
-	sum_nmw_rec.clear();
-	max_nmw_rec.clear();
-	PyObject* ret = PyDict_New();
-	mimimsf_t& G = graph->adj;
-	if (PyObject_CallMethod((PyObject*)graph, "is_directed", "()") == Py_False && weight == Py_None) {
-		if (nodes == Py_None) {
-			for (auto& v : G) {
-				PyObject* pv = PyLong_FromLong(v.first);
-				if (!v.second.size()) {
-					PyDict_SetItem(ret, PyDict_GetItem(graph->id_to_node, pv), PyFloat_FromDouble(Py_NAN));
-					continue;
-				}
-				Graph* E = (Graph*)PyObject_CallMethod((PyObject*)graph, "ego_subgraph", "(O)", PyDict_GetItem(graph->id_to_node, pv));
-				if (E->node.size() > 1) {
-					PyDict_SetItem(ret, PyDict_GetItem(graph->id_to_node, pv), PyFloat_FromDouble(E->node.size() - 1 - 1.0 * (2 * PyLong_AsLong(PyObject_CallMethod((PyObject*)E, "size", "()"))) / (E->node.size() - 1)));
-				}
-				else {
-					PyDict_SetItem(ret, PyDict_GetItem(graph->id_to_node, pv), PyFloat_FromDouble(0));
-				}
-			}
-		}
-		else {
-			for (Py_ssize_t i = 0; i < PyList_Size(nodes);i++) {
-				PyObject* pv = PyDict_GetItem(graph->node_to_id, PyList_GetItem(nodes, i));
-				int v = PyLong_AsLong(pv);
-				if (!G[v].size()) {
-					PyDict_SetItem(ret, PyDict_GetItem(graph->id_to_node, pv), PyFloat_FromDouble(Py_NAN));
-					continue;
-				}
-				Graph* E = (Graph*)PyObject_CallMethod((PyObject*)graph, "ego_subgraph", "(O)", PyDict_GetItem(graph->id_to_node, pv));
-				if (E->adj.size() > 1) {
-					PyDict_SetItem(ret, PyDict_GetItem(graph->id_to_node, pv), PyFloat_FromDouble(E->node.size() - 1 - 1.0 * (2 * PyLong_AsLong(PyObject_CallMethod((PyObject*)E, "size", "()"))) / (E->node.size() - 1)));
-				}
-				else {
-					PyDict_SetItem(ret, PyDict_GetItem(graph->id_to_node, pv), PyFloat_FromDouble(0));
-				}
-			}
+	PyObject* node = PyDict_GetItem(graph->id_to_node, id);
+	Py_DECREF(id);
+	return node;
+}
+
+// Appends the indices of the nodes of the sequence nodes to indices.
+static bool indices_of(Graph* graph, const NativeCSR& t, PyObject* nodes, std::vector<int>& indices) {
+	PyObject* items = PySequence_Fast(nodes, "nodes must be a sequence.");
+	if (items == nullptr)
+		return false;
+	for (Py_ssize_t j = 0; j < PySequence_Fast_GET_SIZE(items); j++) {
+		int i = index_of(graph, t, PySequence_Fast_GET_ITEM(items, j));
+		if (i < 0) {
+			Py_DECREF(items);
+			return false;
 		}
+		indices.push_back(i);
 	}
-	else {
-		if (nodes == Py_None) {
-			for (auto& v : G) {
-				PyObject* pv = PyLong_FromLong(v.first);
-				if (!v.second.size()) {
-					PyDict_SetItem(ret, PyDict_GetItem(graph->id_to_node, pv), PyFloat_FromDouble(Py_NAN));
-					continue;
-				}
-				else{
-					float sum = 0;
-					for (auto& u : v.second) {
-						sum += redundancy(G, v.first, u.first, weight == Py_None ? std::string("None") : std::string(PyUnicode_AsUTF8(weight)));
-					}
-					PyDict_SetItem(ret, PyDict_GetItem(graph->id_to_node, pv), PyFloat_FromDouble(sum));
-				}
-			}
-		}
-		else {
-			for (Py_ssize_t i = 0; i < PyList_Size(nodes);i++) {
-				int v = PyLong_AsLong(PyDict_GetItem(graph->node_to_id, PyList_GetItem(nodes, i)));
-				if (!G[v].size()) {
-					PyDict_SetItem(ret, PyDict_GetItem(graph->id_to_node, PyLong_FromLong(v)), PyFloat_FromDouble(Py_NAN));
-					continue;
-				}
-				else {
-					float sum = 0;
-					for (auto& u : G[v]) {
-						sum += redundancy(G, v, u.first, weight == Py_None ? std::string("None") : std::string(PyUnicode_AsUTF8(weight)));
-					}
-					PyDict_SetItem(ret, PyDict_GetItem(graph->id_to_node, PyLong_FromLong(v)), PyFloat_FromDouble(sum));
-				}
-			}
+	Py_DECREF(items);
+	return true;
+}
+
+// Returns {node: value} for the given indices, in their order.
+template <typename T>
+static PyObject* dict_of(Graph* graph, const NativeCSR& t, const std::vector<int>& indices, const std::vector<T>& values, PyObject* (*convert)(T)) {
+	PyObject* ret = PyDict_New();
+	if (ret == nullptr)
+		return nullptr;
+	for (size_t j = 0; j < indices.size(); j++) {
+		PyObject* value = convert(values[j]);
+		int status = -1;
+		if (value != nullptr)
+			status = PyDict_SetItem(ret, node_of(graph, t, indices[j]), value);
+		Py_XDECREF(value);
+		if (status < 0) {
+			Py_DECREF(ret);
+			return nullptr;
 		}
 	}
 	return ret;
 }
 
-float local_constraint(mimimsf_t& G, int u, int v, std::string weight = "None") {
-	edge_tuple edge = { u, v };
-	if (local_constraint_rec.count(edge.val)) {
-		return local_constraint_rec[edge.val];
+static PyObject* float_of(double value) {
+	return PyFloat_FromDouble(value);
+}
+
+static PyObject* long_of(long value) {
+	return PyLong_FromLong(value);
+}
+
+// Local constraint of i on the k-th neighbor of i, where x holds the
+// normalized mutual weights of i to its neighbors and zero elsewhere.
+static double local_constraint(const BurtTables& t, const std::vector<double>& x, size_t k) {
+	int v = t.nbrs[k];
+	double direct = x[v], indirect = 0;
+	for (size_t l = t.indptr[v]; l < t.indptr[v + 1]; l++) {
+		int w = t.nbrs[l];
+		// nmw(w, v), the weight of the edge (v, w) normalized around w
+		if (x[w] && t.sum_scale[w])
+			indirect += x[w] * t.weights[l] / t.sum_scale[w];
 	}
-	else {
-		float direct = normalized_mutual_weight(G, u, v, weight);
-		float indirect = 0;
-		for (auto& w : G[u]) {
-			indirect += normalized_mutual_weight(G, u, w.first, weight) * normalized_mutual_weight(G, w.first, v, weight);
-		}
-		float result = (direct + indirect) * (direct + indirect);
-		local_constraint_rec[edge.val] = result;
-		return result;
+	return (direct + indirect) * (direct + indirect);
+}
+
+static void load_nmw(const BurtTables& t, int i, std::vector<double>& x) {
+	for (size_t k = t.indptr[i]; k < t.indptr[i + 1]; k++)
+		x[t.nbrs[k]] = t.sum_nmw(i, k);
+}
+
+static void clear_nmw(const BurtTables& t, int i, std::vector<double>& x) {
+	for (size_t k = t.indptr[i]; k < t.indptr[i + 1]; k++)
+		x[t.nbrs[k]] = 0;
+}
+
+static double constraint_of(const BurtTables& t, int i, std::vector<double>& x) {
+	if (t.indptr[i] == t.indptr[i + 1])
+		return Py_NAN;
+	load_nmw(t, i, x);
+	double result = 0;
+	for (size_t k = t.indptr[i]; k < t.indptr[i + 1]; k++)
+		result += local_constraint(t, x, k);
+	clear_nmw(t, i, x);
+	return result;
+}
+
+// Sum of the redundancies 1 - sum(nmw(i, w) * nmw(u, w, norm=max)) of i with
+// its neighbors u.
+static double effective_size_of(const BurtTables& t, int i, std::vector<double>& x) {
+	if (t.indptr[i] == t.indptr[i + 1])
+		return Py_NAN;
+	load_nmw(t, i, x);
+	double result = 0;
+	for (size_t k = t.indptr[i]; k < t.indptr[i + 1]; k++) {
+		int u = t.nbrs[k];
+		double r = 0;
+		for (size_t l = t.indptr[u]; l < t.indptr[u + 1]; l++)
+			r += x[t.nbrs[l]] * t.max_nmw(u, l);
+		result += 1 - r;
+	}
+	clear_nmw(t, i, x);
+	return result;
+}
+
+static double hierarchy_of(const BurtTables& t, int i, std::vector<double>& x) {
+	// n is the number of neighbors other than i itself
+	int n = t.indptr[i + 1] - t.indptr[i];
+	for (size_t k = t.indptr[i]; k < t.indptr[i + 1]; k++)
+		n -= t.nbrs[k] == i;
+	if (n <= 1)
+		return 0;
+	load_nmw(t, i, x);
+	std::vector<double> c;
+	double C = 0;
+	for (size_t k = t.indptr[i]; k < t.indptr[i + 1]; k++) {
+		c.push_back(local_constraint(t, x, k));
+		C += c.back();
 	}
+	clear_nmw(t, i, x);
+	double result = 0;
+	for (double c_w : c)
+		result += c_w / C * n * log(c_w / C * n) / (n * log(n));
+	return result;
 }
 
-std::pair<int, double> compute_constraint_of_v(mimimsf_t& G, int v, std::string weight) {
-	double constraint_of_v = 0;
-	if (G[v].size() == 0) {
-		constraint_of_v = Py_NAN;
+// Number of edges between the neighbors of i other than i, found by marking
+// the neighbors of i in x and counting the marks around each of them.
+static double triangles_of(const BurtTables& t, int i, std::vector<double>& x) {
+	for (size_t k = t.indptr[i]; k < t.indptr[i + 1]; k++)
+		x[t.nbrs[k]] = t.nbrs[k] != i;
+	double result = 0;
+	for (size_t k = t.indptr[i]; k < t.indptr[i + 1]; k++) {
+		int u = t.nbrs[k];
+		if (u == i)
+			continue;
+		for (size_t l = t.indptr[u]; l < t.indptr[u + 1]; l++)
+			result += t.nbrs[l] != u ? x[t.nbrs[l]] : 0;
 	}
-	else {
-		for (auto& n : G[v]) {
-			constraint_of_v += local_constraint(G, v, n.first, weight);
+	for (size_t k = t.indptr[i]; k < t.indptr[i + 1]; k++)
+		x[t.nbrs[k]] = 0;
+	return result / 2;
+}
+
+// Borgatti's simplified effective size n - 2t/n for unweighted graphs, with
+// n the number of neighbors other than i and t the edges between them.
+static double effective_size_borgatti_of(const BurtTables& t, int i, std::vector<double>& x) {
+	if (t.indptr[i] == t.indptr[i + 1])
+		return Py_NAN;
+	int n = t.indptr[i + 1] - t.indptr[i];
+	for (size_t k = t.indptr[i]; k < t.indptr[i + 1]; k++)
+		n -= t.nbrs[k] == i;
+	if (n == 0)
+		return 0;
+	return n - 2 * triangles_of(t, i, x) / n;
+}
+
+typedef double (*burt_kernel_t)(const BurtTables&, int, std::vector<double>&);
+
+struct BurtJob {
+	const BurtTables* tables;
+	burt_kernel_t kernel;
+	const std::vector<int>* targets;
+	std::vector<double>* results;
+	std::atomic<size_t> next;
+	std::atomic<bool> failed;
+};
+
+// Takes the targets by blocks, so that the threads stay busy whatever the
+// degrees. Each result only depends on its node, not on the thread.
+static void run_burt_job(BurtJob* job) {
+	const size_t block = 64;
+	try {
+		std::vector<double> x(job->tables->ids.size(), 0);
+		size_t n = job->targets->size();
+		for (size_t begin; (begin = job->next.fetch_add(block)) < n;) {
+			size_t end = std::min(begin + block, n);
+			for (size_t j = begin; j < end; j++)
+				(*job->results)[j] = job->kernel(*job->tables, (*job->targets)[j], x);
 		}
 	}
-	return std::make_pair(v, constraint_of_v);
+	catch (std::bad_alloc&) {
+		job->failed = true;
+	}
+}
+
+// Computes the kernel on the given nodes, or on every node if nodes is None,
+// in n_workers threads (one if None, all the cores if not positive), and
+// returns the results as a dict.
+static PyObject* run_burt_kernel(Graph* graph, PyObject* nodes, PyObject* weight, PyObject* n_workers, burt_kernel_t kernel) {
+	std::string weight_key;
+	if (!weight_key_of(weight, weight_key))
+		return nullptr;
+	int n_threads = n_threads_of(n_workers);
+	if (n_threads < 0)
+		return nullptr;
+
+	BurtTables tables;
+	std::vector<int> targets;
+	std::vector<double> results;
+	try {
+		build_tables(graph, weight_key, tables);
+		if (nodes == Py_None) {
+			for (size_t i = 0; i < tables.ids.size(); i++)
+				targets.push_back(i);
+		}
+		else if (!indices_of(graph, tables, nodes, targets))
+			return nullptr;
+		results.resize(targets.size());
+	}
+	catch (std::bad_alloc&) {
+		return PyErr_NoMemory();
+	}
+
+	BurtJob job;
+	job.tables = &tables;
+	job.kernel = kernel;
+	job.targets = &targets;
+	job.results = &results;
+	job.next = 0;
+	job.failed = false;
+	if ((size_t)n_threads > targets.size())
+		n_threads = std::max((size_t)1, targets.size());
+	Py_BEGIN_ALLOW_THREADS
+	std::vector<std::thread> workers;
+	try {
+		for (int i = 1; i < n_threads; i++)
+			workers.push_back(std::thread(run_burt_job, &job));
+	}
+	catch (std::exception&) {
+		// Fewer threads then, the remaining ones share the work
+	}
+	run_burt_job(&job);
+	for (auto& worker : workers)
+		worker.join();
+	Py_END_ALLOW_THREADS
+	if (job.failed)
+		return PyErr_NoMemory();
+	return dict_of(graph, tables, targets, results, float_of);
+}
+
+PyObject* effective_size(PyObject* easygraph, PyObject* args, PyObject* kwargs) {
+	PyObject* nodes = Py_None, * weight = Py_None, * n_workers = Py_None;
+	Graph *graph = nullptr;
+	static char* kwlist[] = { (char*)"G", (char*)"nodes", (char*)"weight", (char*)"n_workers", NULL };
+	if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O|OOO", kwlist, &graph, &nodes, &weight, &n_workers))
+		return nullptr;
+	// Use Borgatti's simplified formula for unweighted and undirected graphs
+	if (weight == Py_None)
+		return run_burt_kernel(graph, nodes, weight, n_workers, effective_size_borgatti_of);
+	return run_burt_kernel(graph, nodes, weight, n_workers, effective_size_of);
 }
 
 PyObject* constraint(PyObject* easygraph, PyObject* args, PyObject* kwargs) {
@@ -160,80 +421,402 @@ PyObject* constraint(PyObject* easygraph, PyObject* args, PyObject* kwargs) {
 	static char* kwlist[] = { (char*)"G", (char*)"nodes", (char*)"weight", (char*)"n_workers", NULL };
 	if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O|OOO", kwlist, &graph, &nodes, &weight, &n_workers))
 		return nullptr;
-	sum_nmw_rec.clear();
-	max_nmw_rec.clear();
-	local_constraint_rec.clear();
-	std::vector<std::pair<int, double>> constraints_results;
-	mimimsf_t& G = graph->adj;
-	if (n_workers == Py_None) {
-		if (nodes == Py_None) {
-			for (auto& v : graph->node) {
-				constraints_results.push_back(compute_constraint_of_v(G, v.first, weight == Py_None ? std::string("None") : std::string(PyUnicode_AsUTF8(weight))));
+	return run_burt_kernel(graph, nodes, weight, n_workers, constraint_of);
+}
+
+PyObject* hierarchy(PyObject* easygraph, PyObject* args, PyObject* kwargs) {
+	Graph* graph;
+	PyObject* nodes = Py_None, * weight = Py_None, * n_workers = Py_None;
+	static char* kwlist[] = { (char*)"G", (char*)"nodes", (char*)"weight", (char*)"n_workers", NULL };
+	if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O|OOO", kwlist, &graph, &nodes, &weight, &n_workers))
+		return nullptr;
+	// The local constraints of the hierarchy are unweighted, as in Python
+	return run_burt_kernel(graph, nodes, Py_None, n_workers, hierarchy_of);
+}
+
+PyObject* triangles(PyObject* easygraph, PyObject* args, PyObject* kwargs) {
+	Graph* graph;
+	PyObject* nodes = Py_None, * n_workers = Py_None;
+	static char* kwlist[] = { (char*)"G", (char*)"nodes", (char*)"n_workers", NULL };
+	if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O|OO", kwlist, &graph, &nodes, &n_workers))
+		return nullptr;
+	return run_burt_kernel(graph, nodes, Py_None, n_workers, triangles_of);
+}
+
+// Breadth-first search from sources, recording the level of each node
+// reached, in the order they are reached. With a target, stops once the
+// level of the target has been reached.
+static void bfs_levels(const NativeCSR& t, const std::vector<int>& sources, int target, std::vector<int>& level, std::vector<int>& order) {
+	level.assign(t.ids.size(), -1);
+	for (int s : sources) {
+		if (level[s] < 0) {
+			level[s] = 0;
+			order.push_back(s);
+		}
+	}
+	for (size_t head = 0; head < order.size(); head++) {
+		int v = order[head];
+		if (target >= 0 && level[target] >= 0 && level[v] == level[target])
+			break;
+		for (size_t k = t.indptr[v]; k < t.indptr[v + 1]; k++) {
+			int u = t.nbrs[k];
+			if (level[u] < 0) {
+				level[u] = level[v] + 1;
+				order.push_back(u);
 			}
 		}
-		else {
-			for (Py_ssize_t i = 0;i < PyList_Size(nodes);i++) {
-				int v = PyLong_AsLong(PyDict_GetItem(graph->node_to_id, PyList_GetItem(nodes, i)));
-				constraints_results.push_back(compute_constraint_of_v(G, v, weight == Py_None ? std::string("None") : std::string(PyUnicode_AsUTF8(weight))));
+	}
+}
+
+// Dijkstra's algorithm from sources, recording the distance of each node
+// reached, in the order they are settled. Returns false on a negative cycle
+// of weights.
+static bool dijkstra_distances(const NativeCSR& t, const std::vector<int>& sources, int target, std::vector<double>& dist, std::vector<int>& order) {
+	typedef std::pair<double, std::pair<long, int>> entry_t;
+	std::priority_queue<entry_t, std::vector<entry_t>, std::greater<entry_t>> queue;
+	size_t n = t.ids.size();
+	std::vector<double> seen(n, INFINITY);
+	std::vector<char> settled(n, 0);
+	dist.assign(n, INFINITY);
+	long count = 0;
+	for (int s : sources) {
+		seen[s] = 0;
+		queue.push(entry_t(0, std::make_pair(count++, s)));
+	}
+	while (!queue.empty()) {
+		double d = queue.top().first;
+		int v = queue.top().second.second;
+		queue.pop();
+		if (settled[v])
+			continue;
+		settled[v] = 1;
+		dist[v] = d;
+		order.push_back(v);
+		if (v == target)
+			break;
+		for (size_t k = t.indptr[v]; k < t.indptr[v + 1]; k++) {
+			int u = t.nbrs[k];
+			double vu_dist = d + t.weights[k];
+			if (settled[u]) {
+				if (vu_dist < dist[u])
+					return false;
+			}
+			else if (vu_dist < seen[u]) {
+				seen[u] = vu_dist;
+				queue.push(entry_t(vu_dist, std::make_pair(count++, u)));
 			}
 		}
 	}
-	PyObject* constraint = PyDict_New();
-	for (auto& each : constraints_results) {
-		PyDict_SetItem(constraint, PyDict_GetItem(graph->id_to_node, PyLong_FromLong(each.first)), PyFloat_FromDouble(each.second));
+	return true;
+}
+
+// Parses G, sources and target, and builds the arrays of G.
+static bool parse_search(PyObject* args, PyObject* kwargs, bool weighted, Graph*& graph, NativeCSR& t, std::vector<int>& sources, int& target) {
+	PyObject* py_sources, * py_target = Py_None, * weight = Py_None;
+	static char* kwlist[] = { (char*)"G", (char*)"sources", (char*)"target", NULL };
+	static char* weighted_kwlist[] = { (char*)"G", (char*)"sources", (char*)"weight", (char*)"target", NULL };
+	if (weighted) {
+		static PyObject* default_weight = PyUnicode_InternFromString("weight");
+		weight = default_weight;
+		if (!PyArg_ParseTupleAndKeywords(args, kwargs, "OO|OO", weighted_kwlist, &graph, &py_sources, &weight, &py_target))
+			return false;
 	}
-	return constraint;
+	else if (!PyArg_ParseTupleAndKeywords(args, kwargs, "OO|O", kwlist, &graph, &py_sources, &py_target))
+		return false;
+	std::string weight_key;
+	if (!weight_key_of(weight, weight_key))
+		return false;
+	build_csr(graph, weight_key, t);
+	if (!indices_of(graph, t, py_sources, sources))
+		return false;
+	target = -1;
+	if (py_target != Py_None && (target = index_of(graph, t, py_target)) < 0)
+		return false;
+	return true;
 }
 
-PyObject* hierarchy(PyObject* easygraph, PyObject* args, PyObject* kwargs) {
+PyObject* bfs(PyObject* easygraph, PyObject* args, PyObject* kwargs) {
 	Graph* graph;
-	PyObject* nodes = Py_None, * weight = Py_None;
-	PyObject* hierarchy = PyDict_New();
-	static char* kwlist[] = { (char*)"G", (char*)"nodes", (char*)"weight", NULL };
-	if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O|OO", kwlist, & graph, &nodes, &weight))
+	NativeCSR t;
+	std::vector<int> sources, level, order;
+	int target;
+	try {
+		if (!parse_search(args, kwargs, false, graph, t, sources, target))
+			return nullptr;
+		Py_BEGIN_ALLOW_THREADS
+		bfs_levels(t, sources, target, level, order);
+		Py_END_ALLOW_THREADS
+		std::vector<long> levels;
+		for (int v : order)
+			levels.push_back(level[v]);
+		return dict_of(graph, t, order, levels, long_of);
+	}
+	catch (std::bad_alloc&) {
+		return PyErr_NoMemory();
+	}
+}
+
+PyObject* dijkstra(PyObject* easygraph, PyObject* args, PyObject* kwargs) {
+	Graph* graph;
+	NativeCSR t;
+	std::vector<int> sources, order;
+	std::vector<double> dist;
+	int target;
+	try {
+		if (!parse_search(args, kwargs, true, graph, t, sources, target))
+			return nullptr;
+		bool valid;
+		Py_BEGIN_ALLOW_THREADS
+		valid = dijkstra_distances(t, sources, target, dist, order);
+		Py_END_ALLOW_THREADS
+		if (!valid) {
+			PyErr_SetString(PyExc_ValueError, "Contradictory paths found: negative weights?");
+			return nullptr;
+		}
+		std::vector<double> distances;
+		for (int v : order)
+			distances.push_back(dist[v]);
+		return dict_of(graph, t, order, distances, float_of);
+	}
+	catch (std::bad_alloc&) {
+		return PyErr_NoMemory();
+	}
+}
+
+PyObject* connected_components(PyObject* easygraph, PyObject* args, PyObject* kwargs) {
+	Graph* graph;
+	static char* kwlist[] = { (char*)"G", NULL };
+	if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O", kwlist, &graph))
 		return nullptr;
-	mimimsf_t& G = graph->adj;
-	PyObject* con = PyObject_CallMethod(easygraph, "cpp_constraint", "(O)", graph);
-	if (nodes == Py_None) {
-		for (auto& v : graph->node) {
-			Graph* E = (Graph*)PyObject_CallMethod((PyObject*)graph, "ego_subgraph", "(O)", PyDict_GetItem(graph->id_to_node, PyLong_FromLong(v.first)));
-			int n = E->node.size() - 1;
-			float C = 0;
-			std::unordered_map<int, float> c;
-			for (auto& w : G[v.first]) {
-				C += local_constraint(G, v.first, w.first);
-				c[w.first] = local_constraint(G, v.first, w.first);
-			}
-			if (n > 1) {
-				float value = 0;
-				for (auto w : G[v.first]) {
-					value += c[w.first] / C * n * log(c[w.first] / C * n) / (n * log(n));
+	NativeCSR t;
+	std::vector<int> component;
+	std::vector<size_t> indptr(1, 0);
+	try {
+		build_csr(graph, "", t);
+		size_t n = t.ids.size();
+		// The components one after the other, as indptr and component
+		std::vector<char> seen(n, 0);
+		Py_BEGIN_ALLOW_THREADS
+		for (size_t s = 0; s < n; s++) {
+			if (seen[s])
+				continue;
+			seen[s] = 1;
+			component.push_back(s);
+			for (size_t head = indptr.back(); head < component.size(); head++) {
+				int v = component[head];
+				for (size_t k = t.indptr[v]; k < t.indptr[v + 1]; k++) {
+					int u = t.nbrs[k];
+					if (!seen[u]) {
+						seen[u] = 1;
+						component.push_back(u);
+					}
 				}
-				PyDict_SetItem(hierarchy, PyDict_GetItem(graph->id_to_node, PyLong_FromLong(v.first)), PyFloat_FromDouble(value));
 			}
-			Py_DecRef((PyObject*)E);
-		}
-	}
-	else {
-		for (Py_ssize_t i = 0;i < PyList_Size(nodes);i++) {
-			int v = PyLong_AsLong(PyDict_GetItem(graph->node_to_id, PyList_GetItem(nodes, i)));
-			Graph* E = (Graph*)PyObject_CallMethod((PyObject*)graph, "ego_subgraph", "(O)", PyDict_GetItem(graph->id_to_node, PyLong_FromLong(v)));
-			int n = E->node.size() - 1;
-			float C = 0;
-			std::unordered_map<int, float> c;
-			for (auto& w : G[v]) {
-				C += local_constraint(G, v, w.first);
-				c[w.first] = local_constraint(G, v, w.first);
+			indptr.push_back(component.size());
+		}
+		Py_END_ALLOW_THREADS
+	}
+	catch (std::bad_alloc&) {
+		return PyErr_NoMemory();
+	}
+	PyObject* ret = PyList_New(indptr.size() - 1);
+	if (ret == nullptr)
+		return nullptr;
+	for (size_t c = 0; c + 1 < indptr.size(); c++) {
+		PyObject* nodes = PySet_New(nullptr);
+		if (nodes == nullptr) {
+			Py_DECREF(ret);
+			return nullptr;
+		}
+		PyList_SET_ITEM(ret, c, nodes);
+		for (size_t j = indptr[c]; j < indptr[c + 1]; j++) {
+			if (PySet_Add(nodes, node_of(graph, t, component[j])) < 0) {
+				Py_DECREF(ret);
+				return nullptr;
 			}
-			if (n > 1) {
-				float value = 0;
-				for (auto w : G[v]) {
-					value += c[w.first] / C * n * log(c[w.first] / C * n) / (n * log(n));
-				}
-				PyDict_SetItem(hierarchy, PyDict_GetItem(graph->id_to_node, PyLong_FromLong(v)), PyFloat_FromDouble(value));
+		}
+	}
+	return ret;
+}
+
+// The state of Brandes' algorithm in one thread, reset after each source
+// for the nodes it reached only.
+struct BrandesState {
+	std::vector<int> S;  // nodes in the order they are reached
+	std::vector<std::vector<int>> P;  // predecessors on shortest paths
+	std::vector<double> sigma, delta, D, seen;
+	std::vector<char> reached;
+
+	explicit BrandesState(size_t n) : P(n), sigma(n, 0), delta(n, 0), D(n, -1), seen(n, -1), reached(n, 0) {}
+
+	void reset() {
+		for (int v : S) {
+			P[v].clear();
+			sigma[v] = delta[v] = 0;
+			D[v] = seen[v] = -1;
+			reached[v] = 0;
+		}
+		S.clear();
+	}
+};
+
+static void brandes_bfs(const NativeCSR& t, int s, BrandesState& b) {
+	b.sigma[s] = 1;
+	b.D[s] = 0;
+	b.S.push_back(s);
+	for (size_t head = 0; head < b.S.size(); head++) {
+		int v = b.S[head];
+		for (size_t k = t.indptr[v]; k < t.indptr[v + 1]; k++) {
+			int w = t.nbrs[k];
+			if (b.D[w] < 0) {
+				b.S.push_back(w);
+				b.D[w] = b.D[v] + 1;
+			}
+			if (b.D[w] == b.D[v] + 1) {
+				b.sigma[w] += b.sigma[v];
+				b.P[w].push_back(v);
+			}
+		}
+	}
+}
+
+static void brandes_dijkstra(const NativeCSR& t, int s, BrandesState& b) {
+	// (distance, (count, (predecessor, node))), ties taken in push order
+	typedef std::pair<double, std::pair<long, std::pair<int, int>>> entry_t;
+	std::priority_queue<entry_t, std::vector<entry_t>, std::greater<entry_t>> queue;
+	long count = 0;
+	b.sigma[s] = 1;
+	b.seen[s] = 0;
+	queue.push(entry_t(0, std::make_pair(count++, std::make_pair(s, s))));
+	while (!queue.empty()) {
+		double dist = queue.top().first;
+		int pred = queue.top().second.second.first;
+		int v = queue.top().second.second.second;
+		queue.pop();
+		if (b.reached[v])
+			continue;
+		b.sigma[v] += b.sigma[pred];
+		b.S.push_back(v);
+		b.reached[v] = 1;
+		b.D[v] = dist;
+		for (size_t k = t.indptr[v]; k < t.indptr[v + 1]; k++) {
+			int w = t.nbrs[k];
+			double vw_dist = dist + t.weights[k];
+			if (!b.reached[w] && (b.seen[w] < 0 || vw_dist < b.seen[w])) {
+				b.seen[w] = vw_dist;
+				queue.push(entry_t(vw_dist, std::make_pair(count++, std::make_pair(v, w))));
+				b.sigma[w] = 0;
+				b.P[w].assign(1, v);
+			}
+			else if (vw_dist == b.seen[w]) {
+				b.sigma[w] += b.sigma[v];
+				b.P[w].push_back(v);
 			}
-			Py_DecRef((PyObject*)E);
 		}
 	}
-	return hierarchy;
+}
+
+struct BrandesJob {
+	const NativeCSR* t;
+	const std::vector<int>* sources;
+	bool weighted, endpoints;
+	int n_threads;
+	std::vector<std::vector<double>>* betweenness;  // one array per thread
+	std::atomic<bool> failed;
+};
+
+// Thread i takes the sources i, i + n_threads, ..., so that the sums do not
+// depend on the scheduling.
+static void run_brandes_job(BrandesJob* job, int i) {
+	try {
+		const NativeCSR& t = *job->t;
+		std::vector<double>& betweenness = (*job->betweenness)[i];
+		BrandesState b(t.ids.size());
+		for (size_t j = i; j < job->sources->size(); j += job->n_threads) {
+			int s = (*job->sources)[j];
+			if (job->weighted)
+				brandes_dijkstra(t, s, b);
+			else
+				brandes_bfs(t, s, b);
+			if (job->endpoints)
+				betweenness[s] += b.S.size() - 1;
+			for (size_t k = b.S.size(); k-- > 0;) {
+				int w = b.S[k];
+				double coeff = (1 + b.delta[w]) / b.sigma[w];
+				for (int v : b.P[w])
+					b.delta[v] += b.sigma[v] * coeff;
+				if (w != s)
+					betweenness[w] += job->endpoints ? b.delta[w] + 1 : b.delta[w];
+			}
+			b.reset();
+		}
+	}
+	catch (std::bad_alloc&) {
+		job->failed = true;
+	}
+}
+
+PyObject* betweenness_centrality(PyObject* easygraph, PyObject* args, PyObject* kwargs) {
+	Graph* graph;
+	PyObject* weight = Py_None, * endpoints = Py_False, * py_sources = Py_None, * n_workers = Py_None;
+	static char* kwlist[] = { (char*)"G", (char*)"weight", (char*)"endpoints", (char*)"sources", (char*)"n_workers", NULL };
+	if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O|OOOO", kwlist, &graph, &weight, &endpoints, &py_sources, &n_workers))
+		return nullptr;
+	std::string weight_key;
+	if (!weight_key_of(weight, weight_key))
+		return nullptr;
+	int n_threads = n_threads_of(n_workers);
+	int with_endpoints = PyObject_IsTrue(endpoints);
+	if (n_threads < 0 || with_endpoints < 0)
+		return nullptr;
+
+	NativeCSR t;
+	std::vector<int> sources, nodes;
+	std::vector<std::vector<double>> betweenness;
+	try {
+		build_csr(graph, weight_key, t);
+		for (size_t i = 0; i < t.ids.size(); i++)
+			nodes.push_back(i);
+		if (py_sources == Py_None)
+			sources = nodes;
+		else if (!indices_of(graph, t, py_sources, sources))
+			return nullptr;
+		if ((size_t)n_threads > sources.size())
+			n_threads = std::max((size_t)1, sources.size());
+		betweenness.assign(n_threads, std::vector<double>(t.ids.size(), 0));
+	}
+	catch (std::bad_alloc&) {
+		return PyErr_NoMemory();
+	}
+
+	BrandesJob job;
+	job.t = &t;
+	job.sources = &sources;
+	job.weighted = weight != Py_None;
+	job.endpoints = with_endpoints;
+	job.n_threads = n_threads;
+	job.betweenness = &betweenness;
+	job.failed = false;
+	Py_BEGIN_ALLOW_THREADS
+	std::vector<std::thread> workers;
+	int started = 1;
+	try {
+		for (; started < n_threads; started++)
+			workers.push_back(std::thread(run_brandes_job, &job, started));
+	}
+	catch (std::exception&) {
+	}
+	run_brandes_job(&job, 0);
+	for (auto& worker : workers)
+		worker.join();
+	// The sources of the threads that could not be started
+	for (int i = started; i < n_threads; i++)
+		run_brandes_job(&job, i);
+	for (int i = 1; i < n_threads; i++)
+		for (size_t v = 0; v < t.ids.size(); v++)
+			betweenness[0][v] += betweenness[i][v];
+	Py_END_ALLOW_THREADS
+	if (job.failed)
+		return PyErr_NoMemory();
+	return dict_of(graph, t, nodes, betweenness[0], float_of);
 }
@@ -7,3 +7,13 @@ PyObject* effective_size(PyObject* easygraph, PyObject* args, PyObject* kwargs);
 PyObject* constraint(PyObject* easygraph, PyObject* args, PyObject* kwargs);
 
 PyObject* hierarchy(PyObject* easygraph, PyObject* args, PyObject* kwargs);
+
+PyObject* triangles(PyObject* easygraph, PyObject* args, PyObject* kwargs);
+
+PyObject* bfs(PyObject* easygraph, PyObject* args, PyObject* kwargs);
+
+PyObject* dijkstra(PyObject* easygraph, PyObject* args, PyObject* kwargs);
+
+PyObject* connected_components(PyObject* easygraph, PyObject* args, PyObject* kwargs);
+
+PyObject* betweenness_centrality(PyObject* easygraph, PyObject* args, PyObject* kwargs);
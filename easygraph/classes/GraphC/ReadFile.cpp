@@ -0,0 +1,283 @@
+#include <algorithm>
+#include <cstdlib>
+#include <cstring>
+#include <fstream>
+#include <new>
+#include <thread>
+#include <unordered_map>
+#include "ReadFile.h"
+#ifdef _WIN32
+#include <sstream>
+#else
+#include <fcntl.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <unistd.h>
+#endif
+
+bool MappedFile::open(const char* path) {
+    close();
+#ifdef _WIN32
+    std::ifstream in(path, std::ios::in | std::ios::binary);
+    if (!in)
+        return false;
+    std::ostringstream content;
+    content << in.rdbuf();
+    buffer = content.str();
+    data = buffer.data();
+    size = buffer.size();
+    return true;
+#else
+    int fd = ::open(path, O_RDONLY);
+    if (fd < 0)
+        return false;
+    struct stat st;
+    if (fstat(fd, &st) < 0) {
+        ::close(fd);
+        return false;
+    }
+    size = st.st_size;
+    if (size) {
+        void* pointer = mmap(nullptr, size, PROT_READ, MAP_PRIVATE, fd, 0);
+        if (pointer == MAP_FAILED) {
+            ::close(fd);
+            size = 0;
+            return false;
+        }
+        madvise(pointer, size, MADV_SEQUENTIAL);
+        data = (const char*)pointer;
+        mapped = true;
+    }
+    ::close(fd);
+    return true;
+#endif
+}
+
+void MappedFile::close() {
+#ifndef _WIN32
+    if (mapped)
+        munmap((void*)data, size);
+#endif
+    buffer.clear();
+    data = nullptr;
+    size = 0;
+    mapped = false;
+}
+
+struct EdgeListTokenHash {
+    size_t operator()(const EdgeListToken& token) const {
+        unsigned long long hash = 14695981039346656037ULL;  // FNV-1a
+        for (size_t i = 0; i < token.size; i++)
+            hash = (hash ^ (unsigned char)token.data[i]) * 1099511628211ULL;
+        return (size_t)hash;
+    }
+};
+
+struct EdgeListTokenEqual {
+    bool operator()(const EdgeListToken& a, const EdgeListToken& b) const {
+        return a.size == b.size && memcmp(a.data, b.data, a.size) == 0;
+    }
+};
+
+// Reads the token as an integer if it is written the way the integer prints,
+// i.e. without sign '+' or leading zeros, so equal values mean equal names.
+static bool as_integer(const EdgeListToken& token, long long& value) {
+    const char* p = token.data;
+    size_t n = token.size;
+    bool negative = n > 1 && *p == '-';
+    if (negative) {
+        p++;
+        n--;
+    }
+    if (n == 0 || n > 18 || (*p == '0' && (n > 1 || negative)))
+        return false;
+    long long result = 0;
+    for (size_t i = 0; i < n; i++) {
+        unsigned digit = (unsigned char)p[i] - '0';
+        if (digit > 9)
+            return false;
+        result = result * 10 + digit;
+    }
+    value = negative ? -result : result;
+    return true;
+}
+
+// Numbers the distinct tokens in the order they are first seen. Small
+// non-negative integers index an array, other integers are hashed as such
+// and the remaining tokens byte by byte.
+class EdgeListTokenTable {
+public:
+    int index(const EdgeListToken& token) {
+        const long long max_dense = 1 << 24;
+        long long value;
+        int next = (int)tokens.size();
+        if (as_integer(token, value)) {
+            if (value >= 0 && value < max_dense) {
+                if ((size_t)value >= dense.size())
+                    dense.resize(std::min(std::max(2 * dense.size(), (size_t)value + 1), (size_t)max_dense), -1);
+                if (dense[value] < 0) {
+                    dense[value] = next;
+                    tokens.push_back(token);
+                }
+                return dense[value];
+            }
+            auto result = integers.emplace(value, next);
+            if (result.second)
+                tokens.push_back(token);
+            return result.first->second;
+        }
+        auto result = strings.emplace(token, next);
+        if (result.second)
+            tokens.push_back(token);
+        return result.first->second;
+    }
+    std::vector<EdgeListToken> tokens;
+private:
+    std::vector<int> dense;
+    std::unordered_map<long long, int> integers;
+    std::unordered_map<EdgeListToken, int, EdgeListTokenHash, EdgeListTokenEqual> strings;
+};
+
+struct EdgeListChunk {
+    EdgeListTokenTable table;
+    std::vector<int> src, dst;
+    std::vector<float> weights;
+    const char* bad = nullptr;
+    bool failed = false;
+};
+
+static inline bool is_separator(char c) {
+    return c == ' ' || c == '\t' || c == ',' || c == '\r';
+}
+
+static bool parse_weight(const EdgeListToken& token, float& weight) {
+    char text[64];
+    if (token.size >= sizeof(text))
+        return false;
+    memcpy(text, token.data, token.size);
+    text[token.size] = '\0';
+    char* end;
+    weight = strtof(text, &end);
+    return end == text + token.size;
+}
+
+static void parse_chunk(const char* begin, const char* end, bool weighted, EdgeListChunk& chunk) {
+    int wanted = weighted ? 3 : 2;
+    EdgeListToken columns[3];
+    float weight = 0;
+    const char* p = begin;
+    while (p < end) {
+        const char* line_end = (const char*)memchr(p, '\n', end - p);
+        if (line_end == nullptr)
+            line_end = end;
+        int n_columns = 0;
+        const char* q = p;
+        while (n_columns < wanted) {
+            while (q < line_end && is_separator(*q))
+                q++;
+            if (q == line_end)
+                break;
+            const char* start = q;
+            while (q < line_end && !is_separator(*q))
+                q++;
+            columns[n_columns].data = start;
+            columns[n_columns].size = q - start;
+            n_columns++;
+        }
+        if (n_columns > 0 && *columns[0].data != '#') {
+            if (n_columns < wanted || (weighted && !parse_weight(columns[2], weight))) {
+                chunk.bad = p;
+                return;
+            }
+            chunk.src.push_back(chunk.table.index(columns[0]));
+            chunk.dst.push_back(chunk.table.index(columns[1]));
+            if (weighted)
+                chunk.weights.push_back(weight);
+        }
+        p = line_end + 1;
+    }
+}
+
+static void parse_chunk_safe(const char* begin, const char* end, bool weighted, EdgeListChunk* chunk) {
+    try {
+        parse_chunk(begin, end, weighted, *chunk);
+    }
+    catch (std::bad_alloc&) {
+        chunk->failed = true;
+    }
+}
+
+void read_edge_list(const char* data, size_t size, bool weighted, int n_workers, EdgeListData& out) {
+    const size_t min_chunk_size = 1 << 20;
+    if (n_workers <= 0)
+        n_workers = std::thread::hardware_concurrency();
+    size_t n_chunks = size / min_chunk_size + 1;
+    if (n_workers > 0 && (size_t)n_workers < n_chunks)
+        n_chunks = n_workers;
+    if (n_chunks == 0)
+        n_chunks = 1;
+
+    // Chunk i holds the lines starting in [bounds[i], bounds[i + 1])
+    const char* end = data + size;
+    std::vector<const char*> bounds(n_chunks + 1, end);
+    bounds[0] = data;
+    for (size_t i = 1; i < n_chunks; i++) {
+        const char* p = data + size / n_chunks * i;
+        if (p < bounds[i - 1])
+            p = bounds[i - 1];
+        const char* line_end = (const char*)memchr(p, '\n', end - p);
+        bounds[i] = line_end ? line_end + 1 : end;
+    }
+
+    std::vector<EdgeListChunk> chunks(n_chunks);
+    std::vector<std::thread> workers;
+    for (size_t i = 1; i < n_chunks; i++)
+        workers.push_back(std::thread(parse_chunk_safe, bounds[i], bounds[i + 1], weighted, &chunks[i]));
+    parse_chunk_safe(bounds[0], bounds[1], weighted, &chunks[0]);
+    for (auto& worker : workers)
+        worker.join();
+    for (auto& chunk : chunks) {
+        if (chunk.failed)
+            throw std::bad_alloc();
+    }
+
+    for (auto& chunk : chunks) {
+        if (chunk.bad) {
+            out.bad_line = 1;
+            for (const char* p = data; (p = (const char*)memchr(p, '\n', chunk.bad - p)); p++)
+                out.bad_line++;
+            return;
+        }
+    }
+
+    // Renumber the tokens of every chunk in the order of the whole file
+    if (n_chunks == 1) {
+        out.tokens.swap(chunks[0].table.tokens);
+        out.src.swap(chunks[0].src);
+        out.dst.swap(chunks[0].dst);
+        out.weights.swap(chunks[0].weights);
+        return;
+    }
+    size_t n_edges = 0;
+    for (auto& chunk : chunks)
+        n_edges += chunk.src.size();
+    out.src.reserve(n_edges);
+    out.dst.reserve(n_edges);
+    if (weighted)
+        out.weights.reserve(n_edges);
+    EdgeListTokenTable table;
+    std::vector<int> index;
+    for (auto& chunk : chunks) {
+        std::vector<EdgeListToken>& tokens = chunk.table.tokens;
+        index.resize(tokens.size());
+        for (size_t i = 0; i < tokens.size(); i++)
+            index[i] = table.index(tokens[i]);
+        for (size_t j = 0; j < chunk.src.size(); j++) {
+            out.src.push_back(index[chunk.src[j]]);
+            out.dst.push_back(index[chunk.dst[j]]);
+        }
+        out.weights.insert(out.weights.end(), chunk.weights.begin(), chunk.weights.end());
+        chunk = EdgeListChunk();
+    }
+    out.tokens.swap(table.tokens);
+}
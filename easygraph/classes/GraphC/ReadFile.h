@@ -1,4 +1,7 @@
+#pragma once
 #include <iostream>
+#include <string>
+#include <vector>
 struct commactype : std::ctype<char> {
     commactype() : std::ctype<char>(get_table()) {}
     std::ctype_base::mask const* get_table(){
@@ -14,4 +17,41 @@ struct commactype : std::ctype<char> {
         }
         return rc;
     }
-};
\ No newline at end of file
+};
+
+// A node name, pointing into the mapped file.
+struct EdgeListToken {
+    const char* data;
+    size_t size;
+};
+
+// The edges of an edge list file, with the endpoints numbered by the order
+// in which they first appear in the file.
+struct EdgeListData {
+    std::vector<EdgeListToken> tokens;
+    std::vector<int> src, dst;
+    std::vector<float> weights;
+    size_t bad_line = 0;  // the first malformed line (1-based), 0 if none
+};
+
+// The content of a file, memory-mapped where the platform allows it.
+class MappedFile {
+public:
+    MappedFile() : data(nullptr), size(0), mapped(false) {}
+    ~MappedFile() { close(); }
+    bool open(const char* path);
+    void close();
+    const char* data;
+    size_t size;
+private:
+    MappedFile(const MappedFile&);
+    MappedFile& operator=(const MappedFile&);
+    bool mapped;
+    std::string buffer;
+};
+
+// Parses the lines "u v" (or "u v weight" if weighted) of an edge list in
+// n_workers threads. Columns are separated by spaces, tabs or commas, and
+// empty lines and lines starting with '#' are skipped. The tokens of out
+// point into data, which must outlive them.
+void read_edge_list(const char* data, size_t size, bool weighted, int n_workers, EdgeListData& out);
@@ -3,5 +3,6 @@ from .graph import GraphC
 from .directed_graph import DiGraph
 from .directed_multigraph import MultiDiGraph
 from .multigraph import MultiGraph
+from .csr_graph import CSRGraph
 from .graphviews import *
 from .operation import *
\ No newline at end of file
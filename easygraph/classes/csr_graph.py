@@ -0,0 +1,628 @@
+import os
+
+import numpy as np
+
+from easygraph.utils.exception import EasyGraphError
+from easygraph.utils.exception import EasyGraphNotImplemented
+
+__all__ = ["CSRGraph"]
+
+
+class CSRGraph:
+    """
+    Immutable compressed-sparse-row snapshot of a Graph or DiGraph.
+
+    The adjacency of the original graph is flattened into three NumPy arrays:
+    *indptr*, *indices* and *weights*. The out-neighbors of the node with index
+    ``i`` are ``indices[indptr[i]:indptr[i + 1]]`` and the weights of the
+    corresponding edges are ``weights[indptr[i]:indptr[i + 1]]``.
+    Undirected edges are stored in both directions, as in ``G.adj``.
+
+    The snapshot is read-only: later changes of the original graph are not
+    reflected, and the arrays themselves are not writeable.
+    Traversal-heavy algorithms, e.g. `single_source_bfs`,
+    `single_source_dijkstra` and `betweenness_centrality`, accept a CSRGraph
+    directly in place of the graph and run on the arrays.
+
+    Parameters
+    ----------
+    indptr : array_like of int, shape (n + 1,)
+        Offsets of each node's neighbors in *indices*.
+
+    indices : array_like of int, shape (m,)
+        Neighbor indices.
+
+    weights : array_like of float, shape (m,), optional (default : None)
+        Edge weights. If None, all the weights will be regarded as 1.
+
+    node_list : list, optional (default : None)
+        The node of each index. If None, nodes are ``0, 1, ..., n-1``.
+
+    directed : bool, optional (default : False)
+        Whether the snapshot represents a directed graph.
+
+    Attributes
+    ----------
+    node_attrs, edge_attrs : dict
+        Attribute columns, e.g. those read by `read_binary`: each maps an
+        attribute name to a sequence aligned with the nodes, respectively
+        with *indices*. Empty for snapshots of a graph.
+
+    See Also
+    --------
+    Graph.freeze_csr, CSRGraph.from_edge_arrays
+
+    Examples
+    --------
+    >>> G = eg.Graph()
+    >>> G.add_edges([(1, 2), (2, 3)], edges_attr=[{'weight': 2}, {'weight': 5}])
+    >>> csr = G.freeze_csr()  # or eg.CSRGraph.from_graph(G)
+    >>> csr.indptr
+    array([0, 1, 3, 4])
+    >>> eg.single_source_dijkstra(csr, 1)
+    {1: 0, 2: 2.0, 3: 7.0}
+
+    """
+    cflag = 0
+
+    def __init__(self,
+                 indptr,
+                 indices,
+                 weights=None,
+                 node_list=None,
+                 directed=False,
+                 weight="weight"):
+        indptr = np.asarray(indptr, dtype=np.int64)
+        n = len(indptr) - 1
+        if n < 0:
+            raise EasyGraphError("indptr must contain at least one element.")
+        indices = np.asarray(indices, dtype=_index_dtype(n))
+        if weights is None:
+            weights = np.ones(len(indices), dtype=np.float64)
+        else:
+            weights = np.asarray(weights, dtype=np.float64)
+        if indptr[-1] != len(indices) or len(weights) != len(indices):
+            raise EasyGraphError(
+                "indptr, indices and weights describe different edge counts.")
+        if node_list is None:
+            node_list = range(n)
+        elif len(node_list) != n:
+            raise EasyGraphError(
+                "node_list must have exactly one node per row of indptr.")
+
+        for array in (indptr, indices, weights):
+            array.setflags(write=False)
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.weight = weight
+        self.graph = {}
+        self.node_attrs = {}
+        self.edge_attrs = {}
+        if isinstance(node_list, range):
+            self._node_list = node_list
+        else:
+            self._node_list = list(node_list)
+        self._node_index = None
+        self._directed = bool(directed)
+        self._reverse = None
+        self._lists = None
+        self._buffers = None
+
+    @classmethod
+    def from_graph(cls, G, weight="weight"):
+        """Build a CSR snapshot of *G*.
+
+        Parameters
+        ----------
+        G : easygraph.Graph or easygraph.DiGraph
+            The graph to freeze.
+
+        weight : string or None, optional (default : 'weight')
+            Weight key of the edges. Edges without this attribute, or every
+            edge if *weight* is None, get weight 1.
+
+        Returns
+        -------
+        csr : easygraph.CSRGraph
+            The snapshot, with nodes indexed in the iteration order of *G*.
+
+        """
+        if isinstance(G, CSRGraph):
+            return G
+        if G.is_multigraph():
+            raise EasyGraphNotImplemented(
+                "not implemented for multigraph type")
+        node_list = list(G.nodes)
+        node_index = {node: i for i, node in enumerate(node_list)}
+        adj = G.adj
+        n = len(node_list)
+        degrees = np.fromiter((len(adj[u]) for u in node_list),
+                              dtype=np.int64,
+                              count=n)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(degrees, out=indptr[1:])
+        m = int(indptr[-1])
+        indices = np.fromiter(
+            (node_index[v] for u in node_list for v in adj[u]),
+            dtype=_index_dtype(n),
+            count=m)
+        if weight is None:
+            weights = np.ones(m, dtype=np.float64)
+        else:
+            weights = np.fromiter(
+                (d.get(weight, 1) for u in node_list for d in adj[u].values()),
+                dtype=np.float64,
+                count=m)
+        csr = cls(indptr,
+                  indices,
+                  weights,
+                  node_list=node_list,
+                  directed=G.is_directed(),
+                  weight=weight)
+        csr.graph.update(G.graph)
+        return csr
+
+    @classmethod
+    def from_edge_arrays(cls,
+                         sources,
+                         targets,
+                         weights=None,
+                         directed=False,
+                         weight="weight",
+                         edge_attrs=None):
+        """Build a CSR snapshot from aligned columns of edges.
+
+        Node labels are factorized with NumPy, so no Python object is
+        created per edge. Nodes are indexed in order of first appearance,
+        and an edge given more than once keeps the values of its last row.
+
+        Parameters
+        ----------
+        sources, targets : array_like
+            The endpoints of each edge, e.g. two columns of a DataFrame or
+            an Arrow table.
+
+        weights : array_like of float, optional (default : None)
+            The weight of each edge. If None, all the weights are 1.
+
+        directed : bool, optional (default : False)
+            Whether the snapshot represents a directed graph.
+
+        weight : string, optional (default : 'weight')
+            Name of the weight attribute, see `CSRGraph`.
+
+        edge_attrs : dict, optional (default : None)
+            Further attribute columns, aligned with *sources*. They are
+            reordered into the `edge_attrs` of the snapshot.
+
+        Returns
+        -------
+        csr : easygraph.CSRGraph
+
+        See Also
+        --------
+        from_pandas_edgelist, from_arrow
+
+        Examples
+        --------
+        >>> csr = eg.CSRGraph.from_edge_arrays(["a", "b"], ["b", "c"], [2, 5])
+        >>> csr.nodes
+        ['a', 'b', 'c']
+        >>> csr.indices
+        array([1, 0, 2, 1], dtype=int32)
+
+        """
+        sources = _label_column(sources)
+        targets = _label_column(targets)
+        if len(sources) != len(targets):
+            raise EasyGraphError(
+                "sources and targets must be columns of the same length.")
+        m = len(sources)
+        if sources.dtype.kind == targets.dtype.kind:
+            dtype = np.result_type(sources, targets)
+        else:
+            # e.g. ints and strings, which result_type would turn into strings
+            dtype = object
+        labels = np.empty(2 * m, dtype=dtype)
+        labels[0::2] = sources
+        labels[1::2] = targets
+        codes, node_list = _factorize(labels)
+        n = len(node_list)
+        u = codes[0::2]
+        v = codes[1::2]
+        if not directed:
+            u, v = np.minimum(u, v), np.maximum(u, v)
+        # the last row of every (u, v), sorted by u then v
+        _, last = np.unique((u * n + v)[::-1], return_index=True)
+        rows = m - 1 - last
+        u = u[rows]
+        v = v[rows]
+        if not directed:
+            loops = u == v
+            u, v = np.concatenate((u, v[~loops])), np.concatenate(
+                (v, u[~loops]))
+            rows = np.concatenate((rows, rows[~loops]))
+            order = np.lexsort((v, u))
+            u, v, rows = u[order], v[order], rows[order]
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(u, minlength=n), out=indptr[1:])
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)[rows]
+        csr = cls(indptr,
+                  v,
+                  weights,
+                  node_list=node_list,
+                  directed=directed,
+                  weight=weight)
+        if edge_attrs:
+            csr.edge_attrs = {
+                key: np.asarray(column)[rows]
+                for key, column in edge_attrs.items()
+            }
+        return csr
+
+    def __iter__(self):
+        return iter(self._node_list)
+
+    def __len__(self):
+        return len(self._node_list)
+
+    def __contains__(self, node):
+        try:
+            return node in self.node_index
+        except TypeError:
+            return False
+
+    @property
+    def nodes(self):
+        return self._node_list
+
+    @property
+    def node_index(self):
+        if self._node_index is None:
+            self._node_index = {
+                node: i
+                for i, node in enumerate(self._node_list)
+            }
+        return self._node_index
+
+    @property
+    def edges(self):
+        edges = list()
+        sources = np.repeat(np.arange(len(self)), np.diff(self.indptr))
+        for u, v, w in zip(sources.tolist(), self.indices.tolist(),
+                           self.weights.tolist()):
+            if self._directed or u <= v:
+                edges.append(
+                    (self._node_list[u], self._node_list[v], {
+                        self.weight or "weight": w
+                    }))
+        return edges
+
+    def index_of(self, node):
+        """Returns the index of *node* in the snapshot."""
+        try:
+            return self.node_index[node]
+        except KeyError:
+            raise EasyGraphError("No node {} in graph.".format(node))
+
+    def node_of(self, index):
+        """Returns the node with index *index*."""
+        return self._node_list[index]
+
+    def neighbors(self, node):
+        """Returns an iterator of a node's (out-)neighbors."""
+        i = self.index_of(node)
+        nbrs = self.indices[self.indptr[i]:self.indptr[i + 1]]
+        return (self._node_list[j] for j in nbrs.tolist())
+
+    def degree_array(self):
+        """Returns the (out-)degree of every node as an array aligned with
+        the node indices."""
+        return np.diff(self.indptr)
+
+    def number_of_nodes(self):
+        return len(self._node_list)
+
+    def number_of_edges(self):
+        m = len(self.indices)
+        if self._directed:
+            return m
+        sources = np.repeat(np.arange(len(self)), np.diff(self.indptr))
+        selfloops = int(np.count_nonzero(sources == self.indices))
+        return (m + selfloops) // 2
+
+    def is_directed(self):
+        return self._directed
+
+    def is_multigraph(self):
+        return False
+
+    def frontier_edges(self, frontier):
+        """Returns all the edges leaving the nodes in *frontier*.
+
+        Parameters
+        ----------
+        frontier : array of int
+            Node indices.
+
+        Returns
+        -------
+        sources : array of int
+            Tail of each edge, repeated once per out-edge.
+
+        targets : array of int
+            Head of each edge.
+
+        positions : array of int
+            Position of each edge in *indices* and *weights*.
+
+        """
+        frontier = np.asarray(frontier, dtype=np.int64)
+        starts = self.indptr[frontier]
+        counts = self.indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty
+        first = np.cumsum(counts) - counts
+        positions = np.repeat(starts - first, counts) + np.arange(total)
+        sources = np.repeat(frontier, counts)
+        return sources, self.indices[positions].astype(np.int64), positions
+
+    def reverse(self):
+        """Returns the CSR snapshot with every edge reversed.
+
+        For undirected graphs this is the snapshot itself. For directed
+        graphs the rows of the result are the predecessors of each node.
+        The result is computed once and cached.
+        """
+        if not self._directed:
+            return self
+        if self._reverse is None:
+            n = len(self)
+            sources = np.repeat(np.arange(n, dtype=_index_dtype(n)),
+                                np.diff(self.indptr))
+            order = np.argsort(self.indices, kind="stable")
+            indptr = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.indices, minlength=n),
+                      out=indptr[1:])
+            rev = CSRGraph(indptr,
+                           sources[order],
+                           self.weights[order],
+                           node_list=self._node_list,
+                           directed=True,
+                           weight=self.weight)
+            rev._reverse = self
+            self._reverse = rev
+        return self._reverse
+
+    def to_scipy_sparse(self):
+        """Returns the weighted adjacency matrix as a ``scipy.sparse.csr_matrix``
+        sharing the arrays of the snapshot."""
+        import scipy.sparse as sp
+        n = len(self)
+        return sp.csr_matrix((self.weights, self.indices, self.indptr),
+                             shape=(n, n))
+
+    def share(self):
+        """Publishes the arrays of the snapshot to shared memory.
+
+        Worker processes attach to the published arrays with
+        `CSRGraph.attach` without copying or unpickling them, so a large
+        graph is serialized once instead of once per worker.
+        Falls back to memory-mapped temporary files where
+        ``multiprocessing.shared_memory`` is unavailable (Python < 3.8).
+
+        Returns
+        -------
+        shared : SharedCSR
+            Owner of the shared blocks. Use it as a context manager, or call
+            its `close` method, to release them. ``shared.handle`` is a small
+            picklable object to pass to the workers.
+
+        Examples
+        --------
+        >>> with csr.share() as shared:
+        ...     with Pool(4, initializer=init, initargs=(shared.handle, )) as p:
+        ...         ...
+
+        """
+        return SharedCSR(self)
+
+    def map_sources(self, function, sources, n_workers):
+        """Runs *function* over chunks of *sources* in worker processes.
+
+        The snapshot is published once with `share`, every worker attaches to
+        it, and ``function(csr, chunk)`` is called for chunks of the shuffled
+        *sources*, where *csr* is the attached snapshot (nodes are indices).
+
+        Parameters
+        ----------
+        function : callable
+            A picklable function of ``(csr, chunk)``.
+
+        sources : list of int
+            Node indices to distribute among the workers.
+
+        n_workers : int
+            The number of worker processes.
+
+        Returns
+        -------
+        results : generator
+            The return value of *function* for every chunk.
+
+        """
+        from functools import partial
+        from multiprocessing import Pool
+        import random
+        from easygraph.utils.misc import split, split_len
+
+        sources = list(sources)
+        random.shuffle(sources)
+        if len(sources) > n_workers * 30000:
+            chunks = split_len(sources, step=30000)
+        else:
+            chunks = split(sources, n_workers)
+        with self.share() as shared:
+            with Pool(n_workers,
+                      initializer=_attach_worker,
+                      initargs=(shared.handle, )) as p:
+                yield from p.imap(partial(_call_worker, function=function),
+                                  chunks)
+
+    @classmethod
+    def attach(cls, handle):
+        """Returns a snapshot backed by the arrays published with `share`.
+
+        The nodes of the attached snapshot are the indices ``0, ..., n-1``.
+        """
+        specs, directed, weight = handle
+        buffers = []
+        arrays = []
+        for spec in specs:
+            buffer, array = _attach_array(*spec)
+            buffers.append(buffer)
+            arrays.append(array)
+        csr = cls(*arrays, directed=directed, weight=weight)
+        csr._buffers = buffers
+        return csr
+
+    def adjacency_lists(self):
+        """Returns (indptr, indices, weights) as cached Python lists.
+
+        Pure-Python loops such as heap-based Dijkstra index lists much faster
+        than NumPy arrays, so kernels that cannot be vectorized use these.
+        """
+        if self._lists is None:
+            self._lists = (self.indptr.tolist(), self.indices.tolist(),
+                           self.weights.tolist())
+        return self._lists
+
+
+# The snapshot attached by each worker process of `CSRGraph.map_sources`.
+_worker_csr = None
+
+
+def _attach_worker(handle):
+    global _worker_csr
+    _worker_csr = CSRGraph.attach(handle)
+
+
+def _call_worker(chunk, function):
+    return function(_worker_csr, chunk)
+
+
+class SharedCSR:
+    """Shared-memory copy of the arrays of a CSRGraph, see `CSRGraph.share`."""
+
+    def __init__(self, csr):
+        self._blocks = []
+        specs = []
+        try:
+            for array in (csr.indptr, csr.indices, csr.weights):
+                block, spec = _publish_array(array)
+                self._blocks.append(block)
+                specs.append(spec)
+        except BaseException:
+            self.close()
+            raise
+        self.handle = (tuple(specs), csr.is_directed(), csr.weight)
+
+    def close(self):
+        for block in self._blocks:
+            _release_block(block)
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # Python < 3.8
+    shared_memory = None
+
+
+def _publish_array(array):
+    nbytes = max(array.nbytes, 1)
+    if shared_memory is not None:
+        block = shared_memory.SharedMemory(create=True, size=nbytes)
+        name = block.name
+        buf = block.buf
+    else:
+        import tempfile
+        fd, name = tempfile.mkstemp(suffix=".csr")
+        os.close(fd)
+        block = buf = np.memmap(name, dtype=np.uint8, mode="w+", shape=nbytes)
+    target = np.ndarray(array.shape, dtype=array.dtype, buffer=buf)
+    target[...] = array
+    if shared_memory is None:
+        block.flush()
+    del target, buf
+    return block, (name, array.dtype.str, array.shape)
+
+
+def _attach_array(name, dtype, shape):
+    if shared_memory is not None:
+        # Workers share the resource tracker of the publishing process, so
+        # attaching does not hand the block's lifetime over to them.
+        block = shared_memory.SharedMemory(name=name)
+        buf = block.buf
+    else:
+        block = buf = np.memmap(name, dtype=np.uint8, mode="r")
+    return block, np.ndarray(shape, dtype=dtype, buffer=buf)
+
+
+def _release_block(block):
+    if shared_memory is not None:
+        block.close()
+        block.unlink()
+    else:
+        name = block.filename
+        del block
+        os.remove(name)
+
+
+def _label_column(labels):
+    # 1-d array of node labels, of objects if they are e.g. tuples
+    try:
+        column = np.asarray(labels)
+    except ValueError:
+        column = None
+    if column is None or column.ndim != 1:
+        labels = list(labels)
+        column = np.empty(len(labels), dtype=object)
+        for i, label in enumerate(labels):
+            column[i] = label
+    return column
+
+
+def _factorize(values):
+    # Codes of the values, numbered in order of first appearance, and the
+    # distinct values in that order.
+    try:
+        uniques, first, inverse = np.unique(values,
+                                            return_index=True,
+                                            return_inverse=True)
+    except TypeError:
+        # objects that cannot be sorted
+        index = {}
+        codes = np.fromiter(
+            (index.setdefault(value, len(index)) for value in values.tolist()),
+            dtype=np.int64,
+            count=len(values))
+        return codes, list(index)
+    order = np.argsort(first)
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    return rank[inverse.ravel()], uniques[order].tolist()
+
+
+def _index_dtype(n):
+    return np.int32 if n < np.iinfo(np.int32).max else np.int64
@@ -1,5 +1,7 @@
 from copy import deepcopy
+from itertools import repeat
 from typing import Dict, List
+from easygraph.classes.graph import EMPTY_EDGE_ATTR
 from easygraph.classes.graph import Graph
 from easygraph.utils.exception import EasyGraphError
 import easygraph.convert as convert
@@ -62,6 +64,7 @@ class DiGraph(Graph):
         self._node = self.node_dict_factory()
         self._adj = self.adjlist_outer_dict_factory()
         self._pred = self.adjlist_outer_dict_factory()
+        self.cflag = 0
         if incoming_graph_data is not None:
             convert.to_easygraph_graph(incoming_graph_data, create_using=self)
         self.graph.update(graph_attr)
@@ -497,6 +500,8 @@ class DiGraph(Graph):
                 self._adj[n] = self.adjlist_inner_dict_factory()
                 self._pred[n] = self.adjlist_inner_dict_factory()
                 self._node[n] = self.node_attr_dict_factory()
+                if self._listeners:
+                    self._notify("add_node", n)
             self._node[n].update(newdict)
 
     def _add_one_node(self, one_node_for_adding, node_attr: dict = {}):
@@ -507,6 +512,8 @@ class DiGraph(Graph):
 
             attr_dict = self._node[node] = self.node_attr_dict_factory()
             attr_dict.update(node_attr)
+            if self._listeners:
+                self._notify("add_node", node)
         else:  # If already exists, there is no complain and still updating the node attribute
             self._node[node].update(node_attr)
 
@@ -588,16 +595,15 @@ class DiGraph(Graph):
             assert len(edges_for_adding) == len(
                 edges_attr
             ), "Edges and Attributes lists must have same length."
-        else:  # Set empty attribute for each edge
-            edges_attr = [dict() for i in range(len(edges_for_adding))]
+        else:  # Set empty attribute for each edge, it is only read
+            edges_attr = repeat({})
 
-        for i in range(len(edges_for_adding)):
+        add_one_edge = self._add_one_edge
+        for edge, attr in zip(edges_for_adding, edges_attr):
             try:
-                edge = edges_for_adding[i]
-                attr = edges_attr[i]
                 assert len(edge) == 2, "Edge tuple {} must be 2-tuple.".format(
                     edge)
-                self._add_one_edge(edge[0], edge[1], attr)
+                add_one_edge(edge[0], edge[1], attr)
             except Exception as err:
                 print(err)
 
@@ -655,17 +661,52 @@ class DiGraph(Graph):
                 self._adj[u] = self.adjlist_inner_dict_factory()
                 self._pred[u] = self.adjlist_inner_dict_factory()
                 self._node[u] = self.node_attr_dict_factory()
+                if self._listeners:
+                    self._notify("add_node", u)
             if v not in self._adj:
                 if v is None:
                     raise ValueError("None cannot be a node")
                 self._adj[v] = self.adjlist_inner_dict_factory()
                 self._pred[v] = self.adjlist_inner_dict_factory()
                 self._node[v] = self.node_attr_dict_factory()
-            datadict = self._adj[u].get(v, self.edge_attr_dict_factory())
-            datadict.update(attr)
-            datadict.update(dd)
+                if self._listeners:
+                    self._notify("add_node", v)
+            new_edge = v not in self._adj[u]
+            datadict = self._edge_datadict(self._adj[u].get(v), attr, dd)
             self._adj[u][v] = datadict
             self._pred[v][u] = datadict
+            if new_edge and self._listeners:
+                self._notify("add_edge", u, v)
+
+    def _add_edge_arrays(self, sources, targets, names, columns):
+        # Add the edges between nodes already in the graph
+        adj, pred = self._adj, self._pred
+        notify = self._notify if self._listeners else None
+        if not names:
+            new_datadict = self._new_empty_datadict()
+            for u, v in zip(sources, targets):
+                nbrs = adj[u]
+                if v not in nbrs:
+                    nbrs[v] = pred[v][u] = new_datadict()
+                    if notify:
+                        notify("add_edge", u, v)
+            return
+        records = map(self.edge_attr_dict_factory,
+                      map(zip, repeat(names), zip(*columns)))
+        for u, v, data in zip(sources, targets, records):
+            nbrs = adj[u]
+            datadict = nbrs.get(v)
+            if datadict is None:
+                nbrs[v] = pred[v][u] = data
+                if notify:
+                    notify("add_edge", u, v)
+            elif datadict is EMPTY_EDGE_ATTR:
+                nbrs[v] = pred[v][u] = data
+            else:
+                datadict.update(data)
+
+    def _adjacency_dicts(self):
+        return (self._adj, self._pred)
 
     def add_edges_from_file(self, file, weighted=False):
         """Added edges from file
@@ -729,10 +770,23 @@ class DiGraph(Graph):
         if v not in self._node:
             self._add_one_node(v)
         # add the edge
-        datadict = self._adj[u].get(v, self.edge_attr_dict_factory())
-        datadict.update(edge_attr)
-        self._adj[u][v] = datadict
-        self._pred[v][u] = datadict
+        datadict = self._adj[u].get(v)
+        if datadict is None:
+            if edge_attr or not self._compact:
+                datadict = self.edge_attr_dict_factory()
+                datadict.update(edge_attr)
+            else:
+                datadict = EMPTY_EDGE_ATTR
+            self._adj[u][v] = datadict
+            self._pred[v][u] = datadict
+            if self._listeners:
+                self._notify("add_edge", u, v)
+        elif edge_attr:
+            if datadict is EMPTY_EDGE_ATTR:
+                datadict = self.edge_attr_dict_factory()
+                self._adj[u][v] = datadict
+                self._pred[v][u] = datadict
+            datadict.update(edge_attr)
 
     def remove_node(self, node_to_remove):
         """Remove one node from your graph.
@@ -767,6 +821,13 @@ class DiGraph(Graph):
         # Remove this node
         del self._adj[node_to_remove]
         del self._pred[node_to_remove]
+        if self._listeners:
+            for succ in succs:
+                self._notify("remove_edge", node_to_remove, succ)
+            for pred in preds:
+                if pred != node_to_remove:  # self-loop already reported
+                    self._notify("remove_edge", pred, node_to_remove)
+            self._notify("remove_node", node_to_remove)
 
     def remove_nodes(self, nodes_to_remove: list):
         """Remove nodes from your graph.
@@ -820,6 +881,8 @@ class DiGraph(Graph):
             del self._pred[v][u]
         except KeyError:
             raise KeyError("No edge {}-{} in graph.".format(u, v))
+        if self._listeners:
+            self._notify("remove_edge", u, v)
 
     def remove_edges(self, edges_to_remove: [tuple]):
         """Remove a list of edges from your graph.
@@ -880,6 +943,8 @@ class DiGraph(Graph):
             if u in self._adj and v in self._adj[u]:
                 del self._adj[u][v]
                 del self._pred[v][u]
+                if self._listeners:
+                    self._notify("remove_edge", u, v)
 
     def has_node(self, node):
         return node in self._node
@@ -933,6 +998,8 @@ class DiGraph(Graph):
 
         """
         G = self.__class__()
+        if self._compact:
+            G.compact()
         G.graph.update(self.graph)
         for node, node_attr in self._node.items():
             G.add_node(node, **node_attr)
@@ -1,9 +1,37 @@
+import gc
 from copy import deepcopy
+from itertools import chain, repeat
 from typing import Dict, List
 
 import easygraph as eg
 import easygraph.convert as convert
 from easygraph.utils.exception import EasyGraphError
+from easygraph.utils.exception import EasyGraphNotImplemented
+
+
+class _EmptyEdgeAttr(dict):
+    """The read-only empty attributes shared by the edges of compact graphs."""
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise EasyGraphError(
+            "The edges of a compact graph share their empty attributes, "
+            "set them with add_edge(u, v, **attr) instead.")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return "EMPTY_EDGE_ATTR"
+
+
+EMPTY_EDGE_ATTR = _EmptyEdgeAttr()
 
 
 class Graph:
@@ -57,6 +85,8 @@ class Graph:
     adjlist_outer_dict_factory = dict
     adjlist_inner_dict_factory = dict
     edge_attr_dict_factory = dict
+    _listeners = ()
+    _compact = False
 
     def __init__(self, incoming_graph_data=None, **graph_attr):
         self.graph = self.graph_attr_dict_factory()
@@ -387,6 +417,8 @@ class Graph:
                     raise ValueError("None cannot be a node")
                 self._adj[n] = self.adjlist_inner_dict_factory()
                 self._node[n] = self.node_attr_dict_factory()
+                if self._listeners:
+                    self._notify("add_node", n)
             self._node[n].update(newdict)
 
     def _add_one_node(self, one_node_for_adding, node_attr: dict = {}):
@@ -395,6 +427,8 @@ class Graph:
             self._adj[node] = self.adjlist_inner_dict_factory()
             attr_dict = self._node[node] = self.node_attr_dict_factory()
             attr_dict.update(node_attr)
+            if self._listeners:
+                self._notify("add_node", node)
         else:  # If already exists, there is no complain and still updating the node attribute
             self._node[node].update(node_attr)
 
@@ -476,16 +510,15 @@ class Graph:
             assert len(edges_for_adding) == len(
                 edges_attr
             ), "Edges and Attributes lists must have same length."
-        else:  # Set empty attribute for each edge
-            edges_attr = [dict() for i in range(len(edges_for_adding))]
+        else:  # Set empty attribute for each edge, it is only read
+            edges_attr = repeat({})
 
-        for i in range(len(edges_for_adding)):
+        add_one_edge = self._add_one_edge
+        for edge, attr in zip(edges_for_adding, edges_attr):
             try:
-                edge = edges_for_adding[i]
-                attr = edges_attr[i]
                 assert len(edge) == 2, "Edge tuple {} must be 2-tuple.".format(
                     edge)
-                self._add_one_edge(edge[0], edge[1], attr)
+                add_one_edge(edge[0], edge[1], attr)
             except Exception as err:
                 print(err)
 
@@ -542,16 +575,112 @@ class Graph:
                     raise ValueError("None cannot be a node")
                 self._adj[u] = self.adjlist_inner_dict_factory()
                 self._node[u] = self.node_attr_dict_factory()
+                if self._listeners:
+                    self._notify("add_node", u)
             if v not in self._node:
                 if v is None:
                     raise ValueError("None cannot be a node")
                 self._adj[v] = self.adjlist_inner_dict_factory()
                 self._node[v] = self.node_attr_dict_factory()
-            datadict = self._adj[u].get(v, self.edge_attr_dict_factory())
-            datadict.update(attr)
-            datadict.update(dd)
+                if self._listeners:
+                    self._notify("add_node", v)
+            new_edge = v not in self._adj[u]
+            datadict = self._edge_datadict(self._adj[u].get(v), attr, dd)
             self._adj[u][v] = datadict
             self._adj[v][u] = datadict
+            if new_edge and self._listeners:
+                self._notify("add_edge", u, v)
+
+    def add_edges_from_arrays(self, src, dst, weights=None, **attr_columns):
+        """Add the edges given as arrays of their two ends.
+
+        This is the fast way to build a large graph from NumPy arrays, as no
+        edge tuples are created and the nodes are added in bulk.
+
+        Parameters
+        ----------
+        src : array_like
+            One end of each edge.
+
+        dst : array_like
+            The other end of each edge, aligned with *src*.
+
+        weights : array_like, optional (default : None)
+            The 'weight' attribute of each edge.
+
+        attr_columns : keyword arguments, optional
+            Further attributes, each given as an array aligned with *src*.
+
+        Notes
+        -----
+        Nodes are added in the order in which they first appear, as in
+        `add_edges`. NumPy arrays are converted with ``tolist``, so that the
+        nodes and attribute values are Python objects. Each new edge gets its
+        own attribute dict, only built if attribute columns are given. An
+        edge that is already in the graph gets its attributes updated, except
+        in multigraphs, where every pair of ends adds a new edge.
+
+        See Also
+        --------
+        add_edges
+
+        Examples
+        --------
+        >>> import numpy as np
+        >>> G = eg.Graph()
+        >>> G.add_edges_from_arrays(np.array([0, 1, 2]),
+        ...                         np.array([1, 2, 0]),
+        ...                         weights=np.array([0.5, 1.0, 2.0]))
+        >>> G[1][2]
+        {'weight': 1.0}
+
+        """
+        sources, targets, names, columns = _edge_array_columns(
+            src, dst, weights, attr_columns)
+        # Paused as in parse_edgelist, the collector would otherwise walk
+        # the growing graph again and again.
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self._add_new_nodes(chain.from_iterable(zip(sources, targets)))
+            self._add_edge_arrays(sources, targets, names, columns)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def _add_new_nodes(self, nodes):
+        # Add the nodes not in the graph yet, in order of first appearance
+        node = self._node
+        for n in dict.fromkeys(nodes):
+            if n not in node:
+                self._add_one_node(n)
+
+    def _add_edge_arrays(self, sources, targets, names, columns):
+        # Add the edges between nodes already in the graph
+        adj = self._adj
+        notify = self._notify if self._listeners else None
+        if not names:
+            new_datadict = self._new_empty_datadict()
+            for u, v in zip(sources, targets):
+                nbrs = adj[u]
+                if v not in nbrs:
+                    nbrs[v] = adj[v][u] = new_datadict()
+                    if notify:
+                        notify("add_edge", u, v)
+            return
+        records = map(self.edge_attr_dict_factory,
+                      map(zip, repeat(names), zip(*columns)))
+        for u, v, data in zip(sources, targets, records):
+            nbrs = adj[u]
+            datadict = nbrs.get(v)
+            if datadict is None:
+                nbrs[v] = adj[v][u] = data
+                if notify:
+                    notify("add_edge", u, v)
+            elif datadict is EMPTY_EDGE_ATTR:
+                nbrs[v] = adj[v][u] = data
+            else:
+                datadict.update(data)
 
     def add_edges_from_file(self, file, weighted=False):
         """Added edges from file
@@ -615,10 +744,23 @@ class Graph:
         if v not in self._node:
             self._add_one_node(v)
         # add the edge
-        datadict = self._adj[u].get(v, self.edge_attr_dict_factory())
-        datadict.update(edge_attr)
-        self._adj[u][v] = datadict
-        self._adj[v][u] = datadict
+        datadict = self._adj[u].get(v)
+        if datadict is None:
+            if edge_attr or not self._compact:
+                datadict = self.edge_attr_dict_factory()
+                datadict.update(edge_attr)
+            else:
+                datadict = EMPTY_EDGE_ATTR
+            self._adj[u][v] = datadict
+            self._adj[v][u] = datadict
+            if self._listeners:
+                self._notify("add_edge", u, v)
+        elif edge_attr:
+            if datadict is EMPTY_EDGE_ATTR:
+                datadict = self.edge_attr_dict_factory()
+                self._adj[u][v] = datadict
+                self._adj[v][u] = datadict
+            datadict.update(edge_attr)
 
     def remove_node(self, node_to_remove):
         """Remove one node from your graph.
@@ -647,6 +789,10 @@ class Graph:
         for neighbor in neighbors:  # Remove edges with other nodes
             del self._adj[neighbor][node_to_remove]
         del self._adj[node_to_remove]  # Remove this node
+        if self._listeners:
+            for neighbor in neighbors:
+                self._notify("remove_edge", node_to_remove, neighbor)
+            self._notify("remove_node", node_to_remove)
 
     def remove_nodes(self, nodes_to_remove: list):
         """Remove nodes from your graph.
@@ -701,6 +847,8 @@ class Graph:
                 del self._adj[v][u]
         except KeyError:
             raise KeyError("No edge {}-{} in graph.".format(u, v))
+        if self._listeners:
+            self._notify("remove_edge", u, v)
 
     def remove_edges(self, edges_to_remove: [tuple]):
         """Remove a list of edges from your graph.
@@ -781,6 +929,8 @@ class Graph:
 
         """
         G = self.__class__()
+        if self._compact:
+            G.compact()
         G.graph.update(self.graph)
         for node, node_attr in self._node.items():
             G.add_node(node, **node_attr)
@@ -904,12 +1054,203 @@ class Graph:
 
         return G, index_of_node, node_of_index
 
+    def subscribe(self, listener):
+        """Registers a callable notified of the structural changes of the graph.
+
+        After each change, ``listener(event, u, v)`` is called, where *event* is
+        one of 'add_node', 'remove_node' (with *v* None), 'add_edge' and
+        'remove_edge'. Updating the attributes of an existing node or edge is
+        not a structural change. Removing a node first reports the removal of
+        each of its edges. For undirected graphs an edge is reported once.
+
+        Parameters
+        ----------
+        listener : callable
+            Called as ``listener(event, u, v)``.
+
+        See Also
+        --------
+        unsubscribe
+
+        Examples
+        --------
+        >>> G = eg.Graph()
+        >>> G.subscribe(lambda event, u, v: print(event, u, v))
+        >>> G.add_edge(1, 2)
+        add_node 1 None
+        add_node 2 None
+        add_edge 1 2
+
+        """
+        if not self._listeners:
+            self._listeners = []
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        """Removes a listener registered by `subscribe`.
+
+        Parameters
+        ----------
+        listener : callable
+            The listener to remove.
+
+        """
+        try:
+            self._listeners.remove(listener)
+        except ValueError:
+            raise EasyGraphError("The listener is not subscribed to the graph.")
+
+    def _notify(self, event, u, v=None):
+        for listener in list(self._listeners):
+            listener(event, u, v)
+
+    def __getstate__(self):
+        # Listeners belong to this graph and may not pickle, e.g. lambdas,
+        # so pickled copies sent to worker processes have none
+        state = self.__dict__.copy()
+        state.pop("_listeners", None)
+        return state
+
+    def compact(self):
+        """Lets the edges without attributes share one empty mapping.
+
+        Every edge normally owns an attribute dict, even an empty one. In
+        compact mode the edges without attributes share a read-only empty
+        mapping instead, which saves the size of an empty dict (64 bytes on
+        CPython) per edge on large unattributed graphs. The empty dicts of
+        the edges already in the graph are replaced as well, and copies of
+        the graph are compact too.
+
+        An edge gets a dict of its own again when attributes are given to it
+        through the graph or the library, e.g. by `add_edge`,
+        `add_edges_from` or `set_edge_attributes`. Writing into the shared
+        mapping directly, as ``G[u][v]['weight'] = 1`` does, raises
+        EasyGraphError.
+
+        Raises
+        ------
+        EasyGraphNotImplemented
+            If the graph is a multigraph.
+
+        Examples
+        --------
+        >>> G = eg.Graph()
+        >>> G.compact()
+        >>> G.add_edges([(1, 2), (2, 3)])
+        >>> G[1][2] is G[2][3]
+        True
+        >>> G.add_edge(1, 2, weight=3)
+        >>> G[1][2], G[2][3]
+        ({'weight': 3}, {})
+
+        """
+        if self.is_multigraph():
+            raise EasyGraphNotImplemented(
+                "not implemented for multigraph type")
+        self._compact = True
+        for adj in self._adjacency_dicts():
+            for nbrs in adj.values():
+                for v, datadict in nbrs.items():
+                    if not datadict:
+                        nbrs[v] = EMPTY_EDGE_ATTR
+
+    def _adjacency_dicts(self):
+        # The dicts holding the edge data, _pred as well for digraphs
+        return (self._adj,)
+
+    def _new_empty_datadict(self):
+        # Factory of the data of new edges without attributes
+        if self._compact:
+            return lambda: EMPTY_EDGE_ATTR
+        return self.edge_attr_dict_factory
+
+    def _edge_datadict(self, datadict, *attrs):
+        # The data of an edge, currently datadict (None for a new edge),
+        # updated with attrs. Shared empty data is replaced when written.
+        if datadict is None or datadict is EMPTY_EDGE_ATTR:
+            if self._compact and not any(attrs):
+                return EMPTY_EDGE_ATTR
+            datadict = self.edge_attr_dict_factory()
+        for attr in attrs:
+            datadict.update(attr)
+        return datadict
+
+    def _update_edge_data(self, u, v, attr):
+        # Updates the data of the edge (u, v) with attr, giving the edge a
+        # dict of its own if it shares the empty attributes
+        datadict = self._adj[u][v]
+        if datadict is EMPTY_EDGE_ATTR:
+            datadict = self._edge_datadict(datadict, attr)
+            adjs = self._adjacency_dicts()
+            adjs[0][u][v] = adjs[-1][v][u] = datadict
+        else:
+            datadict.update(attr)
+
+    def freeze_csr(self, weight="weight"):
+        """Returns an immutable compressed-sparse-row snapshot of the graph.
+
+        The snapshot stores the adjacency as NumPy arrays, which costs much less
+        memory than nested dicts and lets traversal algorithms run as array loops.
+        Later changes of the graph are not reflected in the snapshot.
+
+        Parameters
+        ----------
+        weight : string or None, optional (default : 'weight')
+            Weight key of the edges. If None, all the weights will be regarded as 1.
+
+        Returns
+        -------
+        csr : easygraph.CSRGraph
+            The CSR snapshot of the graph.
+
+        See Also
+        --------
+        CSRGraph
+
+        Examples
+        --------
+        >>> G = eg.Graph()
+        >>> G.add_edges([(1, 2), (2, 3), (2, 4)])
+        >>> csr = G.freeze_csr()
+        >>> eg.betweenness_centrality(csr)
+
+        """
+        from easygraph.classes.csr_graph import CSRGraph
+        return CSRGraph.from_graph(self, weight=weight)
+
+
+def _edge_array_columns(src, dst, weights, attr_columns):
+    # The ends of the edges and the attribute columns as lists, checked to
+    # be aligned, with the names of the attributes
+    if weights is not None:
+        if "weight" in attr_columns:
+            raise EasyGraphError("The weights are given twice.")
+        attr_columns = dict(weight=weights, **attr_columns)
+    sources, targets = _as_list(src), _as_list(dst)
+    columns = [_as_list(column) for column in attr_columns.values()]
+    if any(len(column) != len(sources) for column in [targets] + columns):
+        raise EasyGraphError(
+            "The edge arrays and attribute columns must have the same length.")
+    return sources, targets, list(attr_columns), columns
+
+
+def _as_list(values):
+    # Python objects from NumPy arrays and pandas Series, in a single call
+    return values.tolist() if hasattr(values, "tolist") else list(values)
+
 
 try:
     import cpp_easygraph
 
     class GraphC(cpp_easygraph.Graph):
         cflag = 1
+
+        def add_edges_from_arrays(self, src, dst, weights=None, **attr_columns):
+            # Checked as in Graph, the attribute values must then be numbers
+            sources, targets, names, columns = _edge_array_columns(
+                src, dst, weights, attr_columns)
+            super().add_edges_from_arrays(sources, targets,
+                                          **dict(zip(names, columns)))
 except ImportError:
 
     class GraphC():
@@ -1,5 +1,6 @@
 """Base class for MultiGraph."""
 from copy import deepcopy
+from itertools import repeat
 
 import easygraph as eg
 from typing import Dict, List
@@ -283,6 +284,14 @@ class MultiGraph(Graph):
             keylist.append(key)
         return keylist
 
+    def _add_edge_arrays(self, sources, targets, names, columns):
+        # Every pair of ends adds a new parallel edge
+        if names:
+            records = map(dict, map(zip, repeat(names), zip(*columns)))
+            self.add_edges_from(zip(sources, targets, records))
+        else:
+            self.add_edges_from(zip(sources, targets))
+
     def remove_edge(self, u, v, key=None):
         """Remove an edge between u and v.
 
@@ -96,15 +96,20 @@ def set_edge_attributes(G, values, name=None):
                     except KeyError:
                         pass
             else:
+                update = _edge_data_updater(G)
                 for (u, v), value in values.items():
                     try:
-                        G[u][v][name] = value
+                        update(u, v, {name: value})
                     except KeyError:
                         pass
         except AttributeError:
             # treat `values` as a constant
-            for u, v, data in G.edges:
-                data[name] = values
+            if getattr(G, "_compact", False):
+                for u, v, _ in G.edges:
+                    G._update_edge_data(u, v, {name: values})
+            else:
+                for u, v, data in G.edges:
+                    data[name] = values
     else:
         # `values` consists of doct-of-dict {edge: {attr: value}} shape
         if G.is_multigraph():
@@ -114,13 +119,22 @@ def set_edge_attributes(G, values, name=None):
                 except KeyError:
                     pass
         else:
+            update = _edge_data_updater(G)
             for (u, v), d in values.items():
                 try:
-                    G[u][v].update(d)
+                    update(u, v, d)
                 except KeyError:
                     pass
 
 
+def _edge_data_updater(G):
+    # The edges of compact graphs may share their empty attributes, they are
+    # written through the graph
+    if getattr(G, "_compact", False):
+        return G._update_edge_data
+    return lambda u, v, attr: G[u][v].update(attr)
+
+
 def add_path(G_to_add_to, nodes_for_path, **attr):
     """Add a path to the Graph G_to_add_to.
 
@@ -0,0 +1,93 @@
+import pytest
+import easygraph as eg
+
+np = pytest.importorskip("numpy")
+
+
+class TestCSRGraph:
+
+    def setup_method(self):
+        self.G = eg.Graph()
+        self.G.add_edges([(1, 2), (2, 3), (3, 4), (4, 1), (2, 5)],
+                         edges_attr=[{
+                             "weight": 1
+                         }, {
+                             "weight": 4
+                         }, {
+                             "weight": 1
+                         }, {
+                             "weight": 1
+                         }, {
+                             "weight": 2
+                         }])
+        self.G.add_node(6)
+        self.DG = eg.DiGraph()
+        self.DG.add_edges([(1, 2), (2, 3), (3, 1), (3, 4), (4, 4)])
+
+    def test_arrays(self):
+        csr = self.G.freeze_csr()
+        assert len(csr) == 6
+        assert list(csr.nodes) == list(self.G.nodes)
+        assert csr.indptr.tolist() == [0, 2, 5, 7, 9, 10, 10]
+        assert csr.number_of_edges() == self.G.number_of_edges()
+        assert sorted(csr.neighbors(2)) == [1, 3, 5]
+        assert not csr.indices.flags.writeable
+        assert eg.CSRGraph.from_graph(csr) is csr
+
+    def test_from_edge_arrays_mixed_labels(self):
+        csr = eg.CSRGraph.from_edge_arrays([1, 2], ["a", "b"])
+        assert csr.nodes == [1, "a", 2, "b"]
+        assert sorted(csr.neighbors(1)) == ["a"]
+        csr = eg.CSRGraph.from_edge_arrays([(0, 1), (1, 2)], [3, 4])
+        assert csr.nodes == [(0, 1), 3, (1, 2), 4]
+
+    def test_directed_reverse(self):
+        csr = self.DG.freeze_csr()
+        assert csr.is_directed()
+        assert csr.number_of_edges() == 5
+        rev = csr.reverse()
+        assert sorted(rev.neighbors(1)) == [3]
+        assert sorted(rev.neighbors(4)) == [3, 4]
+        assert rev.reverse() is csr
+
+    def test_multigraph_raises(self):
+        with pytest.raises(eg.EasyGraphNotImplemented):
+            eg.MultiGraph().freeze_csr()
+
+    def test_paths(self):
+        csr = self.G.freeze_csr()
+        assert eg.single_source_bfs(csr, 1) == eg.single_source_bfs(self.G, 1)
+        assert eg.single_source_dijkstra(csr,
+                                         1) == eg.single_source_dijkstra(
+                                             self.G, 1)
+
+    @pytest.mark.parametrize("weight", [None, "weight"])
+    @pytest.mark.parametrize("endpoints", [False, True])
+    def test_betweenness(self, weight, endpoints):
+        for G in (self.G, self.DG):
+            expected = eg.betweenness_centrality(G,
+                                                 weight=weight,
+                                                 endpoints=endpoints)
+            result = eg.betweenness_centrality(G.freeze_csr(),
+                                               weight=weight,
+                                               endpoints=endpoints)
+            for node in G:
+                assert result[node] == pytest.approx(expected[node])
+
+    def test_share_attach(self):
+        csr = self.DG.freeze_csr()
+        with csr.share() as shared:
+            attached = eg.CSRGraph.attach(shared.handle)
+            assert attached.is_directed()
+            assert attached.indptr.tolist() == csr.indptr.tolist()
+            assert attached.indices.tolist() == csr.indices.tolist()
+            assert list(attached.nodes) == [0, 1, 2, 3]
+            del attached
+
+    def test_parallel_betweenness(self):
+        expected = eg.betweenness_centrality(self.G, weight="weight")
+        result = eg.betweenness_centrality(self.G,
+                                           weight="weight",
+                                           n_workers=2)
+        for node in self.G:
+            assert result[node] == pytest.approx(expected[node])
@@ -0,0 +1,163 @@
+import pytest
+import easygraph as eg
+
+
+class TestGraphListeners:
+
+    def setup_method(self):
+        self.events = []
+        self.listener = lambda event, u, v: self.events.append((event, u, v))
+
+    def test_graph_events(self):
+        G = eg.Graph()
+        G.subscribe(self.listener)
+        G.add_edge(1, 2)
+        G.add_edge(1, 2, weight=3)  # attribute update only
+        G.add_edges_from([(2, 3)])
+        G.remove_node(2)
+        assert self.events == [("add_node", 1, None), ("add_node", 2, None),
+                               ("add_edge", 1, 2), ("add_node", 3, None),
+                               ("add_edge", 2, 3), ("remove_edge", 2, 1),
+                               ("remove_edge", 2, 3),
+                               ("remove_node", 2, None)]
+        G.unsubscribe(self.listener)
+        G.add_node(4)
+        assert len(self.events) == 8
+        with pytest.raises(eg.EasyGraphError):
+            G.unsubscribe(self.listener)
+
+    def test_digraph_events(self):
+        G = eg.DiGraph()
+        G.add_edges([(1, 2), (2, 2), (3, 2)])
+        G.subscribe(self.listener)
+        G.remove_edges_from([(1, 2), (1, 3)])
+        G.remove_node(2)
+        assert self.events == [("remove_edge", 1, 2), ("remove_edge", 2, 2),
+                               ("remove_edge", 3, 2),
+                               ("remove_node", 2, None)]
+
+    @pytest.mark.parametrize("graph_type", [eg.Graph, eg.DiGraph])
+    def test_pickle(self, graph_type):
+        import pickle
+        G = graph_type([(1, 2)])
+        G.subscribe(self.listener)
+        H = pickle.loads(pickle.dumps(G))
+        assert sorted(H.edges) == sorted(G.edges)
+        H.add_edge(2, 3)
+        assert self.events == []
+        G.add_edge(2, 3)
+        assert self.events == [("add_node", 3, None), ("add_edge", 2, 3)]
+
+
+class TestAddEdgesFromArrays:
+
+    def setup_method(self):
+        np = pytest.importorskip("numpy")
+        self.src = np.array([1, 2, 3, 2])
+        self.dst = np.array([2, 3, 1, 1])
+        self.weights = np.array([0.5, 1.5, 2.5, 3.5])
+
+    def test_graph(self):
+        G = eg.Graph()
+        G.add_edges_from_arrays(self.src,
+                                self.dst,
+                                weights=self.weights,
+                                color=["r", "g", "b", "k"])
+        H = eg.Graph()
+        H.add_edges([(1, 2), (2, 3), (3, 1), (2, 1)],
+                    edges_attr=[{
+                        "weight": w,
+                        "color": c
+                    } for w, c in zip([0.5, 1.5, 2.5, 3.5], "rgbk")])
+        assert list(G.nodes) == list(H.nodes)
+        assert G.edges == H.edges
+        assert type(G[1][2]["weight"]) is float
+        assert all(type(n) is int for n in G)
+
+    def test_unattributed_edges_own_their_dicts(self):
+        G = eg.DiGraph()
+        G.add_edges_from_arrays(self.src, self.dst)
+        assert sorted((u, v) for u, v, _ in G.edges) == [(1, 2), (2, 1),
+                                                        (2, 3), (3, 1)]
+        assert G._pred[1] == {3: {}, 2: {}}
+        G[1][2]["weight"] = 3
+        assert G[2][3] == {}
+        assert G._pred[2][1] == {"weight": 3}
+
+    def test_multigraph(self):
+        G = eg.MultiGraph()
+        G.add_edges_from_arrays([1, 1], [2, 2], weights=[3, 4])
+        assert G.edges == [(1, 2, 0, {"weight": 3}), (1, 2, 1, {"weight": 4})]
+
+    def test_events_and_errors(self):
+        G = eg.Graph()
+        events = []
+        G.subscribe(lambda event, u, v: events.append((event, u, v)))
+        G.add_edges_from_arrays([1, 1], [2, 2])
+        assert events == [("add_node", 1, None), ("add_node", 2, None),
+                          ("add_edge", 1, 2)]
+        with pytest.raises(eg.EasyGraphError):
+            G.add_edges_from_arrays([1, 2], [3])
+        with pytest.raises(eg.EasyGraphError):
+            G.add_edges_from_arrays([1], [3], weights=[1], weight=[2])
+        assert len(G) == 2
+
+
+class TestCompactGraph:
+
+    def setup_method(self):
+        from easygraph.classes.graph import EMPTY_EDGE_ATTR
+        self.empty = EMPTY_EDGE_ATTR
+
+    @pytest.mark.parametrize("graph_type", [eg.Graph, eg.DiGraph])
+    def test_shared_until_written(self, graph_type):
+        G = graph_type()
+        G.add_edges([(1, 2)], edges_attr=[{"weight": 2}])
+        G.add_edge(2, 3)
+        G.compact()
+        G.add_edges_from([(3, 4)])
+        G.add_edges_from_arrays([4], [5])
+        assert G[1][2] == {"weight": 2}
+        assert all(G[u][u + 1] is self.empty for u in range(2, 5))
+        with pytest.raises(eg.EasyGraphError):
+            G[2][3]["weight"] = 1
+        G.add_edge(2, 3, weight=1)
+        G.add_edges_from([(3, 4, {"weight": 3})])
+        G.add_edges_from_arrays([4], [5], weights=[4])
+        assert [G[u][u + 1] for u in range(1, 5)] == [{
+            "weight": w
+        } for w in [2, 1, 3, 4]]
+        assert G[3][4] is not self.empty
+
+    @pytest.mark.parametrize("graph_type", [eg.Graph, eg.DiGraph])
+    def test_set_edge_attributes(self, graph_type):
+        G = graph_type()
+        G.compact()
+        G.add_edges([(1, 2), (2, 3), (3, 4)])
+        eg.set_edge_attributes(G, {(1, 2): 5, (4, 5): 6}, "weight")
+        eg.set_edge_attributes(G, {(2, 3): {"color": "r"}})
+        assert G[1][2] == {"weight": 5}
+        assert G[2][3] == {"color": "r"}
+        assert G[3][4] is self.empty
+        if G.is_directed():
+            assert G._pred[2][1] is G[1][2]
+        else:
+            assert G[2][1] is G[1][2]
+        eg.set_edge_attributes(G, 1, "cost")
+        assert [G[u][u + 1]["cost"] for u in range(1, 4)] == [1, 1, 1]
+        assert G[1][2] == {"weight": 5, "cost": 1}
+
+    def test_copy_and_pickle(self):
+        import pickle
+        G = eg.Graph()
+        G.compact()
+        G.add_edges([(1, 2), (2, 3)])
+        for H in [G.copy(), pickle.loads(pickle.dumps(G))]:
+            assert H.edges == G.edges
+            assert H[1][2] is self.empty
+            H.add_edge(3, 4)
+            assert H[3][4] is self.empty
+
+    def test_multigraph(self):
+        with pytest.raises(eg.EasyGraphNotImplemented):
+            eg.MultiGraph().compact()
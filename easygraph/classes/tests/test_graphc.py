@@ -0,0 +1,248 @@
+import random
+
+import pytest
+
+pytest.importorskip("cpp_easygraph")
+
+import easygraph as eg
+
+
+class TestGraphCKernels:
+    def setup_method(self):
+        edges = [(0, 1), (1, 2), (2, 0), (2, 3), (3, 4), (5, 6)]
+        weights = [{"weight": w} for w in [1, 5, 2, 1, 3, 1]]
+        self.G = eg.GraphC()
+        self.G.add_edges(edges, weights)
+        self.H = eg.Graph()
+        self.H.add_edges(edges, weights)
+
+    def test_bfs_and_dijkstra(self):
+        assert eg.single_source_bfs(self.G, 0) == eg.single_source_bfs(
+            self.H, 0)
+        assert eg.single_source_dijkstra(self.G, 1) == {
+            1: 0,
+            0: 1,
+            2: 3,
+            3: 4,
+            4: 7
+        }
+        assert eg.multi_source_dijkstra(self.G, {0, 5}, weight=None,
+                                        target=3) == {
+                                            0: 0,
+                                            5: 0,
+                                            1: 1,
+                                            2: 1,
+                                            6: 1,
+                                            3: 2
+                                        }
+        with pytest.raises(KeyError):
+            eg.single_source_bfs(self.G, 10)
+
+    def test_connected_components(self):
+        assert eg.connected_components(self.G) == [{5, 6}, {0, 1, 2, 3, 4}]
+        assert eg.number_connected_components(self.G) == 2
+        assert not eg.is_connected(self.G)
+        assert eg.connected_component_of_node(self.G, 6) == {5, 6}
+
+    @pytest.mark.parametrize("weight", [None, "weight"])
+    def test_betweenness_centrality(self, weight):
+        expected = eg.betweenness_centrality(self.H, weight=weight)
+        assert eg.betweenness_centrality(
+            self.G, weight=weight) == pytest.approx(expected)
+        assert eg.betweenness_centrality(
+            self.G, weight=weight, n_workers=2) == pytest.approx(expected)
+
+    def test_triangles(self):
+        assert eg.triangles(self.G) == eg.triangles(self.H)
+        assert eg.effective_size(self.G) == pytest.approx(
+            eg.effective_size(self.H))
+
+    def test_freeze(self):
+        expected = {
+            "bfs": eg.single_source_bfs(self.G, 0),
+            "dijkstra": eg.single_source_dijkstra(self.G, 1),
+            "betweenness": eg.betweenness_centrality(self.G, weight="weight"),
+            "effective_size": eg.effective_size(self.G, weight="weight"),
+        }
+        assert not self.G.is_frozen()
+        assert self.G.freeze() is self.G
+        assert self.G.is_frozen()
+        assert eg.single_source_bfs(self.G, 0) == expected["bfs"]
+        assert eg.single_source_dijkstra(self.G, 1) == expected["dijkstra"]
+        assert eg.betweenness_centrality(
+            self.G, weight="weight") == pytest.approx(expected["betweenness"])
+        assert eg.effective_size(self.G, weight="weight") == pytest.approx(
+            expected["effective_size"])
+        # Edges without the attribute weigh 1
+        assert eg.single_source_dijkstra(
+            self.G, 1, weight="cost") == eg.single_source_dijkstra(
+                self.H, 1, weight=None)
+        with pytest.raises(RuntimeError):
+            self.G.add_edge(0, 4)
+        with pytest.raises(RuntimeError):
+            self.G.remove_node(0)
+        H = self.G.copy()
+        assert not H.is_frozen()
+        H.add_edge(0, 4)
+        assert H.has_edge(0, 4)
+
+
+class TestGraphCBurtKernels:
+    def setup_method(self):
+        pytest.importorskip("scipy")
+        rng = random.Random(7)
+        edges = sorted({
+            tuple(sorted(rng.sample(range(40), 2)))
+            for _ in range(120)
+        })
+        weights = [{"weight": rng.randint(1, 5)} for _ in edges]
+        self.G = eg.GraphC()
+        self.G.add_edges(edges, weights)
+        self.G.add_node(40)
+        self.H = eg.Graph()
+        self.H.add_edges(edges, weights)
+        self.H.add_node(40)
+
+    @pytest.mark.parametrize("weight", [None, "weight"])
+    @pytest.mark.parametrize(
+        "metric", [eg.constraint, eg.effective_size, eg.hierarchy])
+    def test_threads(self, metric, weight):
+        expected = metric(self.H, weight=weight)
+        serial = metric(self.G, weight=weight)
+        assert serial == pytest.approx(expected, nan_ok=True)
+        for n_workers in [2, 3, 0]:
+            assert metric(self.G, weight=weight,
+                          n_workers=n_workers) == pytest.approx(serial,
+                                                                nan_ok=True)
+        nodes = [40, 3, 17, 3]
+        assert metric(self.G, nodes=nodes, weight=weight,
+                      n_workers=2) == pytest.approx(
+                          {v: expected[v]
+                           for v in nodes}, nan_ok=True)
+
+
+class TestGraphCFileLoader:
+    # The file is split into a chunk per worker, at most one per MiB
+    @pytest.fixture(scope="class")
+    def edge_list(self, tmp_path_factory):
+        rng = random.Random(12)
+        lines, edges = [], {}
+        while len(lines) < 25000:
+            u, v = rng.randrange(3000), rng.randrange(3000)
+            w = round(rng.uniform(-5, 5), 3)
+            sep = rng.choice([" ", "\t", ",", " , "])
+            lines.append(f"n{u}{sep}n{v}{sep}{w}\n")
+            edges[f"n{u}", f"n{v}"] = edges[f"n{v}", f"n{u}"] = w
+            if rng.random() < 0.1:
+                lines.append("#" + "x" * rng.randrange(2000) + "\n")
+            if rng.random() < 0.05:
+                lines.append(rng.choice(["\n", "  \t\n", "\r\n"]))
+        lines.append("n0 n1 2.5")  # no trailing newline
+        edges["n0", "n1"] = edges["n1", "n0"] = 2.5
+        path = tmp_path_factory.mktemp("edges") / "edges.txt"
+        path.write_text("".join(lines))
+        return str(path), edges
+
+    @staticmethod
+    def adjacency(G):
+        return {(u, v): dict(data)
+                for u, nbrs in G.adj.items()
+                for v, data in nbrs.items()}
+
+    def test_workers(self, edge_list):
+        path, edges = edge_list
+        data = open(path).read()
+        for n_chunks in [2, 3]:
+            # the chunks are cut in the middle of lines
+            assert all(data[len(data) // n_chunks * i - 1] != "\n"
+                       for i in range(1, n_chunks))
+        G = eg.GraphC()
+        G.add_edges_from_file(path, weighted=True, n_workers=1)
+        adjacency = self.adjacency(G)
+        assert adjacency.keys() == edges.keys()
+        for edge, w in edges.items():
+            assert adjacency[edge]["weight"] == pytest.approx(w, abs=1e-6)
+        for n_workers in [2, 3, 0]:
+            H = eg.GraphC()
+            H.add_edges_from_file(path, weighted=True, n_workers=n_workers)
+            assert self.adjacency(H) == adjacency
+
+        G = eg.GraphC()
+        G.add_edges_from_file(path, n_workers=3)
+        assert self.adjacency(G) == dict.fromkeys(edges, {})
+
+    def test_errors(self, edge_list, tmp_path):
+        with pytest.raises(OSError):
+            eg.GraphC().add_edges_from_file(str(tmp_path / "missing.txt"))
+        path = tmp_path / "bad.txt"
+        path.write_text("# nodes\n1 2 0.5\n\n2 3\n")
+        G = eg.GraphC()
+        G.add_edges_from_file(str(path))
+        assert G.has_edge("2", "3")
+        with pytest.raises(ValueError, match="line 4"):
+            eg.GraphC().add_edges_from_file(str(path), weighted=True)
+        path.write_text("1 2 x\n")
+        with pytest.raises(ValueError, match="line 1"):
+            eg.GraphC().add_edges_from_file(str(path), weighted=True)
+        # A bad line in a later chunk is reported by its line in the file
+        data = open(edge_list[0]).read()
+        n_lines = data.count("\n") + 1
+        path.write_text(data + "\nn1\n")
+        with pytest.raises(ValueError, match=f"line {n_lines + 1}:"):
+            eg.GraphC().add_edges_from_file(str(path), n_workers=3)
+        assert len(G) == 3
+
+
+class TestGraphCArrays:
+    def setup_method(self):
+        self.np = pytest.importorskip("numpy")
+
+    @staticmethod
+    def adjacency(G):
+        return {(u, v): dict(data)
+                for u, nbrs in G.adj.items()
+                for v, data in nbrs.items()}
+
+    def test_arrays(self):
+        np = self.np
+        # (1, 2) is given three times, the last values win
+        src = np.array([1, 2, 3, 2, 1, 4], dtype=np.int64)
+        dst = np.array([2, 3, 1, 1, 2, 4], dtype=np.int32)
+        weights = np.array([0.5, 1.5, 2.5, 3.5, 4.5, 5.5], dtype=np.float32)
+        cost = np.array([1, 2, 3, 4, 5, 6])
+        G = eg.GraphC()
+        G.add_edges_from_arrays(src, dst, weights, cost=cost)
+        H = eg.Graph()
+        H.add_edges_from_arrays(src, dst, weights=weights, cost=cost)
+        assert sorted(G.nodes) == sorted(H.nodes) == [1, 2, 3, 4]
+        assert all(type(n) is int for n in G)
+        assert self.adjacency(G) == {(u, v): H[u][v]
+                                     for u in H
+                                     for v in H[u]}
+        assert dict(G.adj[1][2]) == {"weight": 4.5, "cost": 5}
+
+        G = eg.GraphC()
+        G.add_edges_from_arrays(src, dst)
+        assert self.adjacency(G) == {(u, v): {}
+                                     for u in H
+                                     for v in H[u]}
+
+    def test_errors(self):
+        np = self.np
+        for graph_type in [eg.Graph, eg.GraphC]:
+            G = graph_type()
+            with pytest.raises(eg.EasyGraphError):
+                G.add_edges_from_arrays(np.arange(2), np.arange(3))
+            with pytest.raises(eg.EasyGraphError):
+                G.add_edges_from_arrays([1], [2], weights=[1], weight=[2])
+            with pytest.raises(eg.EasyGraphError):
+                G.add_edges_from_arrays([1], [2], cost=np.arange(2))
+            assert len(G) == 0
+        # GraphC stores the attributes as floats, a bad value adds nothing
+        G = eg.GraphC()
+        with pytest.raises(TypeError):
+            G.add_edges_from_arrays(np.arange(3), np.arange(1, 4),
+                                    color=np.array(["r", "g", "b"]))
+        with pytest.raises(TypeError):
+            G.add_edges_from_arrays([1, 2], [2, 3], weights=[1.0, None])
+        assert len(G) == 0
@@ -1,26 +1,28 @@
+from easygraph.classes.csr_graph import CSRGraph
 from easygraph.utils import *
 from easygraph.utils.decorators import *
 
+try:
+    from cpp_easygraph import cpp_betweenness_centrality
+except ImportError:
+    pass
+
 __all__ = [
     "betweenness_centrality",
+    "approximate_betweenness_centrality",
+    "edge_betweenness_centrality",
 ]
 
 
-def betweenness_centrality_parallel(nodes, G, path_length, accumulate):
-    betweenness = {node: 0.0 for node in G}
-    for node in nodes:
-        S, P, sigma = path_length(G, source=node)
-        betweenness = accumulate(betweenness, S, P, sigma, node)
-    return betweenness
-
-
 @not_implemented_for("multigraph")
 def betweenness_centrality(G,
                            weight=None,
                            normalized=True,
                            endpoints=False,
-                           n_workers=None):
-    '''Compute the shortest-path betweenness centrality for nodes.
+                           n_workers=None,
+                           k=None,
+                           seed=None):
+    r'''Compute the shortest-path betweenness centrality for nodes.
 
     .. math::
 
@@ -35,7 +37,9 @@ def betweenness_centrality(G,
     Parameters
     ----------
     G : graph
-      A easygraph graph.
+      A easygraph graph, or its CSR snapshot returned by `G.freeze_csr()`.
+      For a snapshot, Brandes' algorithm runs on the arrays and the weights
+      frozen into the snapshot are used when *weight* is not None.
 
     weight : None or string, optional (default=None)
       If None, all edge weights are considered equal.
@@ -49,12 +53,62 @@ def betweenness_centrality(G,
     endpoints : bool, optional
       If True include the endpoints in the shortest path counts.
 
+    n_workers : int, optional (default=None)
+      The number of worker processes. If not None, the graph is frozen into
+      a CSR snapshot that is published once in shared memory; the workers
+      attach to it without copying, each accumulates into a local array and
+      the arrays are summed at the end. For a GraphC, Brandes' algorithm
+      runs natively in as many threads instead.
+
+    k : int, optional (default=None)
+      If k is not None, use k node samples (pivots) as sources of the
+      shortest paths instead of all the nodes, and scale the result by n/k.
+      Higher values give better approximation.
+
+    seed : integer or None, optional (default=None)
+      Seed of the random pivot selection, used only if k is not None.
+
     Returns
     -------
     nodes : dictionary
        Dictionary of nodes with betweenness centrality as the value.
+
+    See Also
+    --------
+    approximate_betweenness_centrality
     '''
 
+    sources = _sample_sources(G, k, seed)
+    if G.cflag == 1:
+        if sources is not None:
+            nodes = list(G.nodes)
+            sources = [nodes[i] for i in sources]
+        betweenness = cpp_betweenness_centrality(G,
+                                                 weight=weight,
+                                                 endpoints=endpoints,
+                                                 sources=sources,
+                                                 n_workers=n_workers)
+        return _rescale(betweenness,
+                        len(G),
+                        normalized=normalized,
+                        directed=G.is_directed(),
+                        k=k,
+                        endpoints=endpoints)
+
+    if isinstance(G, CSRGraph) or n_workers is not None:
+        csr = CSRGraph.from_graph(G, weight=weight)
+        betweenness = _csr_betweenness_centrality(csr,
+                                                  weight is not None,
+                                                  endpoints,
+                                                  n_workers,
+                                                  sources=sources)
+        return _rescale(betweenness,
+                        len(G),
+                        normalized=normalized,
+                        directed=G.is_directed(),
+                        k=k,
+                        endpoints=endpoints)
+
     import functools
     if weight is not None:
         path_length = functools.partial(_single_source_dijkstra_path,
@@ -67,46 +121,236 @@ def betweenness_centrality(G,
     else:
         accumulate = functools.partial(_accumulate_basic)
 
-    nodes = G.nodes
+    nodes = list(G.nodes)
+    if sources is not None:
+        nodes = [nodes[i] for i in sources]
     betweenness = dict.fromkeys(G, 0.0)
+    for node in nodes:
+        S, P, sigma = path_length(G, source=node)
+        betweenness = accumulate(betweenness, S, P, sigma, node)
 
-    if n_workers is not None:
-        #  use the parallel version for large graph
-        from multiprocessing import Pool
-        from functools import partial
-        import random
+    betweenness = _rescale(betweenness,
+                           len(G),
+                           normalized=normalized,
+                           directed=G.is_directed(),
+                           k=k,
+                           endpoints=endpoints)
+    return betweenness
 
-        nodes = list(nodes)
-        random.shuffle(nodes)
 
-        if len(nodes) > n_workers * 30000:
-            nodes = split_len(nodes, step=30000)
-        else:
-            nodes = split(nodes, n_workers)
-        local_function = partial(betweenness_centrality_parallel,
-                                 G=G,
-                                 path_length=path_length,
-                                 accumulate=accumulate)
-        with Pool(n_workers) as p:
-            ret = p.imap(local_function, nodes)
-            for res in ret:
-                for key in res:
-                    betweenness[key] += res[key]
+@not_implemented_for("multigraph")
+def edge_betweenness_centrality(G,
+                                weight=None,
+                                normalized=True,
+                                n_workers=None,
+                                k=None,
+                                seed=None,
+                                with_nodes=False):
+    r'''Compute the shortest-path betweenness centrality for edges.
+
+    .. math::
+
+       c_B(e) = \sum_{s,t \in V} \frac{\sigma(s, t|e)}{\sigma(s, t)}
+
+    where $V$ is the set of nodes, $\sigma(s, t)$ is the number of
+    shortest $(s, t)$-paths, and $\sigma(s, t|e)$ is the number of
+    those paths passing through edge $e$.
+
+    Edges are credited in the same accumulation pass of Brandes' algorithm
+    that credits nodes, so with `with_nodes=True` one sweep yields both the
+    node and the edge betweenness.
+
+    Parameters
+    ----------
+    G : graph
+      A easygraph graph, or its CSR snapshot returned by `G.freeze_csr()`.
+
+    weight : None or string, optional (default=None)
+      If None, all edge weights are considered equal.
+      Otherwise holds the name of the edge attribute used as weight.
+
+    normalized : bool, optional
+      If True the edge betweenness values are normalized by `1/(n(n-1))`
+      where `n` is the number of nodes in G.
+
+    n_workers : int, optional (default=None)
+      The number of worker processes, see `betweenness_centrality`.
+
+    k : int, optional (default=None)
+      If k is not None, use k node samples as sources of the shortest paths.
+
+    seed : integer or None, optional (default=None)
+      Seed of the random source selection, used only if k is not None.
+
+    with_nodes : bool, optional (default=False)
+      If True, also return the node betweenness computed in the same pass.
+
+    Returns
+    -------
+    edges : dictionary
+       Dictionary of edges with betweenness centrality as the value.
+
+    nodes : dictionary
+       Dictionary of nodes with betweenness centrality as the value, the same
+       as `betweenness_centrality(G, weight, normalized)`.
+       Only returned if *with_nodes* is True.
+
+    Examples
+    --------
+    >>> edge_bc = edge_betweenness_centrality(G)
+    >>> edge_bc, node_bc = edge_betweenness_centrality(G, with_nodes=True)
+
+    '''
+    sources = _sample_sources(G, k, seed)
+    if isinstance(G, CSRGraph) or n_workers is not None:
+        csr = CSRGraph.from_graph(G, weight=weight)
+        betweenness, edge_betweenness = _csr_betweenness_centrality(
+            csr,
+            weight is not None,
+            False,
+            n_workers,
+            sources=sources,
+            edges=True)
     else:
-        # use np-parallel version for small graph
+        if weight is not None:
+            path_length = _single_source_dijkstra_path
+        else:
+            path_length = _single_source_bfs_path
+        nodes = list(G.nodes)
+        if sources is not None:
+            nodes = [nodes[i] for i in sources]
+        betweenness = dict.fromkeys(G, 0.0)
+        edge_betweenness = {(u, v): 0.0 for u, v, _ in G.edges}
         for node in nodes:
-            S, P, sigma = path_length(G, source=node)
-            betweenness = accumulate(betweenness, S, P, sigma, node)
+            if weight is not None:
+                S, P, sigma = path_length(G, source=node, weight=weight)
+            else:
+                S, P, sigma = path_length(G, source=node)
+            _accumulate_edges(betweenness, edge_betweenness, S, P, sigma,
+                              node)
 
+    edge_betweenness = _rescale_e(edge_betweenness,
+                                  len(G),
+                                  normalized=normalized,
+                                  directed=G.is_directed(),
+                                  k=k)
+    if not with_nodes:
+        return edge_betweenness
     betweenness = _rescale(betweenness,
                            len(G),
                            normalized=normalized,
                            directed=G.is_directed(),
-                           endpoints=endpoints)
-    return betweenness
+                           k=k)
+    return edge_betweenness, betweenness
+
+
+@not_implemented_for("multigraph")
+def approximate_betweenness_centrality(G,
+                                       epsilon=0.01,
+                                       delta=0.1,
+                                       weight=None,
+                                       normalized=True,
+                                       seed=None):
+    r'''Estimate the betweenness centrality of nodes by shortest path sampling.
+
+    Sample node pairs $(s, t)$ uniformly, pick one shortest $(s, t)$-path
+    uniformly at random and credit its inner nodes, as in the algorithm of
+    Riondato and Kornaropoulos [1]_. The number of samples
+
+    .. math::
+
+        r = \left\lceil \frac{c}{\epsilon^2} \left( \lfloor \log_2(VD - 2)
+            \rfloor + 1 + \ln \frac{1}{\delta} \right) \right\rceil
+
+    with $c = 0.5$ depends only on an upper bound $VD$ of the vertex diameter,
+    not on the size of the graph. With probability at least $1 - \delta$,
+    every estimate is within $\epsilon$ of the exact normalized betweenness
+    $c_B(v) / (n(n-1))$.
+
+    Parameters
+    ----------
+    G : graph
+      A easygraph graph, or its CSR snapshot returned by `G.freeze_csr()`.
+
+    epsilon : float, optional (default=0.01)
+      Additive error bound of the normalized estimates.
+
+    delta : float, optional (default=0.1)
+      Probability that the error bound does not hold.
+
+    weight : None or string, optional (default=None)
+      If None, all edge weights are considered equal.
+      Otherwise holds the name of the edge attribute used as weight.
+
+    normalized : bool, optional
+      Scale the estimates like `betweenness_centrality` does.
+
+    seed : integer or None, optional (default=None)
+      Seed of the random sampling.
+
+    Returns
+    -------
+    nodes : dictionary
+       Dictionary of nodes with estimated betweenness centrality as the value.
+
+    n_samples : int
+       The number of sampled shortest paths.
+
+    Examples
+    --------
+    >>> bc, n_samples = approximate_betweenness_centrality(G, epsilon=0.02, seed=1)
+    >>> top_10 = sorted(bc, key=bc.get, reverse=True)[:10]
+
+    References
+    ----------
+    .. [1] Matteo Riondato and Evgenios M. Kornaropoulos:
+       Fast approximation of betweenness centrality through sampling.
+       Data Mining and Knowledge Discovery 30(2), 438-475, 2016.
+    '''
+    import math
+    import random
+    import numpy as np
+
+    if not 0 < epsilon < 1 or not 0 < delta < 1:
+        raise EasyGraphError("epsilon and delta must be in (0, 1).")
+    csr = CSRGraph.from_graph(G, weight=weight)
+    n = len(csr)
+    if n < 3:
+        return dict.fromkeys(csr.nodes, 0.0), 0
+
+    weighted = weight is not None
+    vd = _vertex_diameter_bound(csr, weighted)
+    log_vd = math.floor(math.log2(vd - 2)) if vd > 2 else 0
+    n_samples = math.ceil(0.5 / epsilon**2 *
+                          (log_vd + 1 + math.log(1 / delta)))
+
+    rng = random.Random(seed)
+    if weighted:
+        sample_path = _csr_dijkstra_sample_path
+    else:
+        sample_path = _csr_bfs_sample_path
+    hits = np.zeros(n)
+    for _ in range(n_samples):
+        s, t = rng.sample(range(n), 2)
+        for v in sample_path(csr, s, t, rng):
+            hits[v] += 1
+
+    # hits / n_samples estimates the betweenness divided by n(n-1).
+    betweenness = dict(
+        zip(csr.nodes, (hits * (n * (n - 1) / n_samples)).tolist()))
+    betweenness = _rescale(betweenness,
+                           n,
+                           normalized=normalized,
+                           directed=csr.is_directed())
+    return betweenness, n_samples
 
 
-def _rescale(betweenness, n, normalized, directed=False, endpoints=False):
+def _rescale(betweenness,
+             n,
+             normalized,
+             directed=False,
+             k=None,
+             endpoints=False):
     if normalized:
         if endpoints:
             if n < 2:
@@ -123,12 +367,42 @@ def _rescale(betweenness, n, normalized, directed=False, endpoints=False):
             scale = 0.5
         else:
             scale = None
+    if k is not None and k > 0:
+        # Scale the sums over k sampled sources up to all n sources
+        scale = (1 if scale is None else scale) * n / k
     if scale is not None:
         for v in betweenness:
             betweenness[v] *= scale
     return betweenness
 
 
+def _rescale_e(betweenness, n, normalized, directed=False, k=None):
+    if normalized:
+        if n <= 1:
+            scale = None  # no normalization b=0 for all nodes
+        else:
+            scale = 1 / (n * (n - 1))
+    else:  # rescale by 2 for undirected graphs
+        if not directed:
+            scale = 0.5
+        else:
+            scale = None
+    if k is not None and k > 0:
+        scale = (1 if scale is None else scale) * n / k
+    if scale is not None:
+        for v in betweenness:
+            betweenness[v] *= scale
+    return betweenness
+
+
+def _sample_sources(G, k, seed):
+    # Indices of the k pivots, or None to use every node as a source
+    if k is None:
+        return None
+    import random
+    return random.Random(seed).sample(range(len(G)), k)
+
+
 def _single_source_bfs_path(G, source):
     S = []
     P = {v: [] for v in G}
@@ -211,3 +485,284 @@ def _accumulate_basic(betweenness, S, P, sigma, s):
         if w != s:
             betweenness[w] += delta[w]
     return betweenness
+
+
+def _accumulate_edges(betweenness, edge_betweenness, S, P, sigma, s):
+    delta = dict.fromkeys(S, 0)
+    while S:
+        w = S.pop()
+        coeff = (1 + delta[w]) / sigma[w]
+        for v in P[w]:
+            c = sigma[v] * coeff
+            if (v, w) in edge_betweenness:
+                edge_betweenness[(v, w)] += c
+            else:
+                edge_betweenness[(w, v)] += c
+            delta[v] += c
+        if w != s:
+            betweenness[w] += delta[w]
+    return betweenness, edge_betweenness
+
+
+def _csr_betweenness_centrality(csr,
+                                weighted,
+                                endpoints,
+                                n_workers=None,
+                                sources=None,
+                                edges=False):
+    # Returns the node betweenness dict, and with edges=True also the edge
+    # betweenness dict credited in the same pass.
+    if sources is None:
+        sources = list(range(len(csr)))
+    else:
+        sources = list(sources)
+    if n_workers is not None and sources:
+        from functools import partial
+        local_function = partial(_csr_betweenness,
+                                 weighted=weighted,
+                                 endpoints=endpoints,
+                                 edges=edges)
+        betweenness = edge_credit = 0
+        for node_part, edge_part in csr.map_sources(local_function, sources,
+                                                    n_workers):
+            betweenness = betweenness + node_part
+            if edges:
+                edge_credit = edge_credit + edge_part
+    else:
+        betweenness, edge_credit = _csr_betweenness(csr, sources, weighted,
+                                                    endpoints, edges)
+    betweenness = dict(zip(csr.nodes, betweenness.tolist()))
+    if not edges:
+        return betweenness
+    return betweenness, _csr_edge_dict(csr, edge_credit)
+
+
+def _csr_edge_dict(csr, edge_credit):
+    # Key the credits of CSR positions by edge. Both directions of an
+    # undirected edge are summed under the orientation seen first, as in
+    # G.edges.
+    import numpy as np
+    n = len(csr)
+    m = len(csr.indices)
+    tails = np.repeat(np.arange(n, dtype=np.int64), np.diff(csr.indptr))
+    heads = csr.indices.astype(np.int64)
+    node_of = csr.nodes
+    if csr.is_directed():
+        firsts = np.arange(m)
+        totals = edge_credit
+    else:
+        keys = np.minimum(tails, heads) * n + np.maximum(tails, heads)
+        _, firsts, inverse = np.unique(keys,
+                                       return_index=True,
+                                       return_inverse=True)
+        totals = np.bincount(inverse.ravel(),
+                             weights=edge_credit,
+                             minlength=len(firsts))
+        order = np.argsort(firsts, kind="stable")
+        firsts, totals = firsts[order], totals[order]
+    return {(node_of[u], node_of[v]): c
+            for u, v, c in zip(tails[firsts].tolist(), heads[firsts].tolist(),
+                               totals.tolist())}
+
+
+def _csr_betweenness(csr, sources, weighted, endpoints, edges=False):
+    # Returns the node betweenness array, and the edge credit of every CSR
+    # position if edges is True (None otherwise).
+    import numpy as np
+    if weighted:
+        dependency = _csr_dijkstra_dependency
+    else:
+        dependency = _csr_bfs_dependency
+    betweenness = np.zeros(len(csr))
+    edge_credit = np.zeros(len(csr.indices)) if edges else None
+    for s in sources:
+        S, delta = dependency(csr, s, edge_credit)
+        if endpoints:
+            betweenness[s] += len(S) - 1
+            betweenness[S] += delta[S] + 1
+            betweenness[s] -= delta[s] + 1
+        else:
+            betweenness[S] += delta[S]
+            betweenness[s] -= delta[s]
+    return betweenness, edge_credit
+
+
+def _csr_bfs_dependency(csr, s, edge_credit=None):
+    # Brandes' accumulation with level-synchronous BFS, one vectorized step
+    # per BFS level. Returns the reached nodes and the dependency of s on
+    # every node; adds the credit of every CSR position to edge_credit.
+    import numpy as np
+    n = len(csr)
+    level_of = np.full(n, -1, dtype=np.int64)
+    sigma = np.zeros(n)
+    level_of[s] = 0
+    sigma[s] = 1.0
+    frontier = np.array([s], dtype=np.int64)
+    reached = [frontier]
+    layers = []
+    level = 0
+    while frontier.size:
+        src, dst, pos = csr.frontier_edges(frontier)
+        frontier = np.unique(dst[level_of[dst] < 0])
+        level += 1
+        level_of[frontier] = level
+        on_path = level_of[dst] == level
+        src, dst, pos = src[on_path], dst[on_path], pos[on_path]
+        np.add.at(sigma, dst, sigma[src])
+        layers.append((src, dst, pos))
+        reached.append(frontier)
+    delta = np.zeros(n)
+    for src, dst, pos in reversed(layers):
+        credit = sigma[src] * (1 + delta[dst]) / sigma[dst]
+        np.add.at(delta, src, credit)
+        if edge_credit is not None:
+            edge_credit[pos] += credit
+    return np.concatenate(reached), delta
+
+
+def _csr_dijkstra_dependency(csr, s, edge_credit=None):
+    import numpy as np
+    from heapq import heappush, heappop
+    from itertools import count
+    push = heappush
+    pop = heappop
+    indptr, indices, weights = csr.adjacency_lists()
+    S = []
+    P = {s: []}
+    sigma = {s: 1.0}
+    D = {}
+    seen = {s: 0}
+    Q = []
+    c = count()
+    push(Q, (0, next(c), s, s))
+    while Q:
+        (dist, _, pred, v) = pop(Q)
+        if v in D:
+            continue
+        if v != s:
+            sigma[v] += sigma[pred]
+        S.append(v)
+        D[v] = dist
+        for k in range(indptr[v], indptr[v + 1]):
+            w = indices[k]
+            vw_dist = dist + weights[k]
+            if w not in D and (w not in seen or vw_dist < seen[w]):
+                seen[w] = vw_dist
+                push(Q, (vw_dist, next(c), v, w))
+                sigma[w] = 0.0
+                P[w] = [(v, k)]
+            elif vw_dist == seen[w]:  # handle equal paths
+                sigma[w] += sigma[v]
+                P[w].append((v, k))
+    delta = dict.fromkeys(S, 0.0)
+    for w in reversed(S):
+        coeff = (1 + delta[w]) / sigma[w]
+        for v, k in P[w]:
+            c = sigma[v] * coeff
+            delta[v] += c
+            if edge_credit is not None:
+                edge_credit[k] += c
+    dependency = np.zeros(len(csr))
+    reached = np.array(S, dtype=np.int64)
+    dependency[reached] = list(delta.values())
+    return reached, dependency
+
+
+def _vertex_diameter_bound(csr, weighted):
+    # Upper bound of the number of nodes on a shortest path. For unweighted
+    # undirected graphs a BFS from one root per connected component gives
+    # 2 * eccentricity + 1; otherwise fall back to the number of nodes.
+    import numpy as np
+    from scipy.sparse.csgraph import connected_components
+    from easygraph.functions.path.path import _csr_bfs_levels
+    if weighted or csr.is_directed():
+        return len(csr)
+    _, labels = connected_components(csr.to_scipy_sparse(), directed=False)
+    _, roots = np.unique(labels, return_index=True)
+    return 2 * int(_csr_bfs_levels(csr, roots).max()) + 1
+
+
+def _choose(candidates, weights, rng):
+    import numpy as np
+    cumulative = np.cumsum(weights)
+    i = np.searchsorted(cumulative, rng.random() * cumulative[-1], "right")
+    return int(candidates[min(i, len(candidates) - 1)])
+
+
+def _csr_bfs_sample_path(csr, s, t, rng):
+    # Returns the inner nodes of a uniformly chosen shortest (s, t)-path,
+    # or an empty list if t is unreachable.
+    import numpy as np
+    n = len(csr)
+    level_of = np.full(n, -1, dtype=np.int64)
+    sigma = np.zeros(n)
+    level_of[s] = 0
+    sigma[s] = 1.0
+    frontier = np.array([s], dtype=np.int64)
+    level = 0
+    while frontier.size and level_of[t] < 0:
+        src, dst, _ = csr.frontier_edges(frontier)
+        frontier = np.unique(dst[level_of[dst] < 0])
+        level += 1
+        level_of[frontier] = level
+        on_path = level_of[dst] == level
+        np.add.at(sigma, dst[on_path], sigma[src[on_path]])
+    if level_of[t] < 0:
+        return []
+
+    rev = csr.reverse()
+    path = []
+    w = t
+    while True:
+        preds = rev.indices[rev.indptr[w]:rev.indptr[w + 1]]
+        preds = preds[level_of[preds] == level_of[w] - 1]
+        w = _choose(preds, sigma[preds], rng)
+        if w == s:
+            return path
+        path.append(w)
+
+
+def _csr_dijkstra_sample_path(csr, s, t, rng):
+    from heapq import heappush, heappop
+    from itertools import count
+    push = heappush
+    pop = heappop
+    indptr, indices, weights = csr.adjacency_lists()
+    P = {s: []}
+    sigma = {s: 1.0}
+    D = {}
+    seen = {s: 0}
+    Q = []
+    c = count()
+    push(Q, (0, next(c), s, s))
+    while Q:
+        (dist, _, pred, v) = pop(Q)
+        if v in D:
+            continue
+        if v != s:
+            sigma[v] += sigma[pred]
+        D[v] = dist
+        if v == t:
+            break
+        for k in range(indptr[v], indptr[v + 1]):
+            w = indices[k]
+            vw_dist = dist + weights[k]
+            if w not in D and (w not in seen or vw_dist < seen[w]):
+                seen[w] = vw_dist
+                push(Q, (vw_dist, next(c), v, w))
+                sigma[w] = 0.0
+                P[w] = [v]
+            elif vw_dist == seen[w]:  # handle equal paths
+                sigma[w] += sigma[v]
+                P[w].append(v)
+    if t not in D:
+        return []
+
+    path = []
+    w = t
+    while True:
+        preds = P[w]
+        w = _choose(preds, [sigma[v] for v in preds], rng)
+        if w == s:
+            return path
+        path.append(w)
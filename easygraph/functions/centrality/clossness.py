@@ -1,89 +1,198 @@
-from easygraph.functions.path import *
+from easygraph.classes.csr_graph import CSRGraph
+from easygraph.functions.path.path import _csr_dijkstra_multisource
 from easygraph.utils import *
 
 __all__ = [
     'closeness_centrality',
+    'harmonic_centrality',
 ]
 
 
-def closeness_centrality_parallel(nodes, G, path_length):
-    ret = []
-    length = len(G)
-    for node in nodes:
-        x = path_length(G, node)
-        dist = sum(x.values())
-        cnt = len(x)
-        if dist == 0:
-            ret.append([node, 0])
-        else:
-            ret.append([node, (cnt - 1) * (cnt - 1) / (dist * (length - 1))])
-    return ret
-
-
 @not_implemented_for("multigraph")
-def closeness_centrality(G, weight=None, n_workers=None):
-    '''Compute closeness centrality for nodes.
+def closeness_centrality(G, weight=None, n_workers=None, wf_improved=True):
+    r'''Compute closeness centrality for nodes.
 
     .. math::
 
         C_{WF}(u) = \frac{n-1}{N-1} \frac{n - 1}{\sum_{v=1}^{n-1} d(v, u)},
-    
-    Notice that the closeness distance function computes the 
-    outcoming distance to `u` for directed graphs. To use 
+
+    where `n` is the number of nodes reachable from `u` (including `u`) and
+    `N` is the number of nodes in the graph.
+
+    Notice that the closeness distance function computes the
+    outcoming distance to `u` for directed graphs. To use
     incoming distance, act on `G.reverse()`.
 
     Parameters
     ----------
     G : graph
-      A easygraph graph
+      A easygraph graph, or its CSR snapshot returned by `G.freeze_csr()`.
 
     weight : None or string, optional (default=None)
       If None, all edge weights are considered equal.
       Otherwise holds the name of the edge attribute used as weight.
 
+    n_workers : int, optional (default=None)
+      The number of worker processes. The workers attach to a CSR snapshot
+      published once in shared memory, see `CSRGraph.map_sources`.
+
+    wf_improved : bool, optional (default=True)
+      If True, scale by the fraction of nodes reachable, i.e. the
+      Wasserman and Faust improved formula above. Otherwise the closeness
+      is $(n - 1) / \sum d(v, u)$.
+
     Returns
     -------
     nodes : dictionary
       Dictionary of nodes with closeness centrality as the value.
 
+    Notes
+    -----
+    The distances are computed on a CSR snapshot of the graph. Without
+    weights, a batched multi-source BFS runs 64 sources at once, with one
+    bit per source in the visited mask of every node.
+
+    See Also
+    --------
+    harmonic_centrality
+
     '''
+    csr = CSRGraph.from_graph(G, weight=weight)
+    sums = _closeness_sums(csr, weight is not None, n_workers)
+    length = len(csr)
     closeness = dict()
-    nodes = G.nodes
-    length = len(nodes)
-    import functools
-    if weight is not None:
-        path_length = functools.partial(single_source_dijkstra, weight=weight)
-    else:
-        path_length = functools.partial(single_source_bfs)
+    for node, (dist, cnt, _) in zip(csr.nodes, sums.tolist()):
+        if dist == 0:
+            closeness[node] = 0
+        elif wf_improved:
+            closeness[node] = (cnt - 1) * (cnt - 1) / (dist * (length - 1))
+        else:
+            closeness[node] = (cnt - 1) / dist
+    return closeness
 
-    if n_workers is not None:
-        # use parallel version for large graph
-        from multiprocessing import Pool
-        from functools import partial
-        import random
 
-        nodes = list(nodes)
-        random.shuffle(nodes)
+@not_implemented_for("multigraph")
+def harmonic_centrality(G, weight=None, n_workers=None):
+    r'''Compute harmonic centrality for nodes.
 
-        if len(nodes) > n_workers * 30000:
-            nodes = split_len(nodes, step=30000)
-        else:
-            nodes = split(nodes, n_workers)
+    .. math::
+
+        C(u) = \sum_{v \neq u} \frac{1}{d(u, v)},
+
+    where the sum runs over the nodes reachable from `u`.
+
+    Parameters
+    ----------
+    G : graph
+      A easygraph graph, or its CSR snapshot returned by `G.freeze_csr()`.
+
+    weight : None or string, optional (default=None)
+      If None, all edge weights are considered equal.
+      Otherwise holds the name of the edge attribute used as weight.
+
+    n_workers : int, optional (default=None)
+      The number of worker processes, see `closeness_centrality`.
+
+    Returns
+    -------
+    nodes : dictionary
+      Dictionary of nodes with harmonic centrality as the value.
+
+    See Also
+    --------
+    closeness_centrality
+
+    '''
+    csr = CSRGraph.from_graph(G, weight=weight)
+    sums = _closeness_sums(csr, weight is not None, n_workers)
+    return dict(zip(csr.nodes, sums[:, 2].tolist()))
+
+
+def _closeness_sums(csr, weighted, n_workers=None):
+    # For every node u: sum of distances from u, number of nodes reachable
+    # from u (including u) and sum of reciprocal distances.
+    import numpy as np
+    sources = list(range(len(csr)))
+    sums = np.zeros((len(sources), 3))
+    if n_workers is not None and sources:
+        from functools import partial
         local_function = partial(closeness_centrality_parallel,
-                                 G=G,
-                                 path_length=path_length)
-        with Pool(n_workers) as p:
-            ret = p.imap(local_function, nodes)
-            res = [x for i in ret for x in i]
-        closeness = dict(res)
+                                 weighted=weighted)
+        for chunk, part in csr.map_sources(local_function, sources,
+                                           n_workers):
+            sums[chunk] = part
     else:
-        # use np-parallel version for small graph
-        for node in nodes:
-            x = path_length(G, node)
-        dist = sum(x.values())
-        cnt = len(x)
-        if dist == 0:
-            closeness[node] = 0
-        else:
-            closeness[node] = (cnt - 1) * (cnt - 1) / (dist * (length - 1))
-    return closeness
+        _, sums = closeness_centrality_parallel(csr, sources, weighted)
+    return sums
+
+
+def closeness_centrality_parallel(csr, sources, weighted):
+    import numpy as np
+    if weighted:
+        part = _csr_dijkstra_sums(csr, sources)
+    else:
+        part = _csr_bfs_sums(csr, sources)
+    return np.asarray(sources, dtype=np.int64), part
+
+
+def _csr_dijkstra_sums(csr, sources):
+    import numpy as np
+    sums = np.zeros((len(sources), 3))
+    for row, s in enumerate(sources):
+        dist = _csr_dijkstra_multisource(csr, [csr.node_of(s)])
+        sums[row] = (sum(dist.values()), len(dist),
+                     sum(1 / d for d in dist.values() if d > 0))
+    return sums
+
+
+def _csr_bfs_sums(csr, sources, batch_size=64):
+    # Multi-source BFS: up to 64 sources advance together, the bit i of
+    # seen[v] telling whether the i-th source of the batch has reached v.
+    # Each level expands only the nodes some source reached last level.
+    import numpy as np
+    n = len(csr)
+    sums = np.zeros((len(sources), 3))
+    for start in range(0, len(sources), batch_size):
+        batch = np.asarray(sources[start:start + batch_size], dtype=np.int64)
+        k = len(batch)
+        seen = np.zeros(n, dtype=np.uint64)
+        np.bitwise_or.at(seen, batch,
+                         np.left_shift(np.uint64(1),
+                                       np.arange(k, dtype=np.uint64)))
+        active = np.unique(batch)
+        visit = seen[active]
+        dist = np.zeros(k)
+        cnt = np.ones(k)
+        harmonic = np.zeros(k)
+        level = 0
+        while active.size:
+            src, dst, _ = csr.frontier_edges(active)
+            if not dst.size:
+                break
+            targets, inverse = np.unique(dst, return_inverse=True)
+            visit_next = np.zeros(len(targets), dtype=np.uint64)
+            np.bitwise_or.at(visit_next, inverse.ravel(),
+                             visit[np.searchsorted(active, src)])
+            visit_next &= ~seen[targets]
+            fresh = visit_next != 0
+            active, visit = targets[fresh], visit_next[fresh]
+            seen[active] |= visit
+            level += 1
+            reached = _bit_counts(visit, k)
+            dist += level * reached
+            cnt += reached
+            harmonic += reached / level
+        sums[start:start + k, 0] = dist
+        sums[start:start + k, 1] = cnt
+        sums[start:start + k, 2] = harmonic
+    return sums
+
+
+def _bit_counts(words, k):
+    # Number of words in which each of the k lowest bits is set
+    import numpy as np
+    if not words.size:
+        return np.zeros(k)
+    bits = np.unpackbits(words.astype("<u8").view(np.uint8),
+                         bitorder="little")
+    return bits.reshape(-1, 64)[:, :k].sum(axis=0)
@@ -0,0 +1,90 @@
+import pytest
+import easygraph as eg
+
+np = pytest.importorskip("numpy")
+
+
+class TestBetweennessCentrality:
+
+    def setup_method(self):
+        self.G = eg.Graph()
+        self.G.add_edges([(0, 1), (1, 2), (2, 3), (3, 4), (1, 5), (5, 3),
+                          (4, 6), (6, 7), (7, 4)])
+        self.n = len(self.G)
+
+    def test_pivots_all_nodes(self):
+        expected = eg.betweenness_centrality(self.G)
+        result = eg.betweenness_centrality(self.G, k=self.n, seed=1)
+        for node in self.G:
+            assert result[node] == pytest.approx(expected[node])
+
+    def test_pivots_csr(self):
+        result = eg.betweenness_centrality(self.G, k=4, seed=7)
+        csr_result = eg.betweenness_centrality(self.G.freeze_csr(),
+                                               k=4,
+                                               seed=7)
+        for node in self.G:
+            assert csr_result[node] == pytest.approx(result[node])
+
+    @pytest.mark.parametrize("weight", [None, "weight"])
+    def test_approximate(self, weight):
+        epsilon = 0.05
+        expected = eg.betweenness_centrality(self.G, weight=weight)
+        result, n_samples = eg.approximate_betweenness_centrality(
+            self.G, epsilon=epsilon, delta=0.01, weight=weight, seed=42)
+        assert n_samples > 0
+        # the error bound holds for betweenness divided by n(n-1)
+        scale = (self.n - 2) / self.n
+        for node in self.G:
+            assert abs(result[node] - expected[node]) * scale < epsilon
+
+    def test_approximate_seed(self):
+        first = eg.approximate_betweenness_centrality(self.G, 0.1, seed=3)
+        second = eg.approximate_betweenness_centrality(self.G, 0.1, seed=3)
+        assert first == second
+
+
+class TestEdgeBetweennessCentrality:
+
+    def setup_method(self):
+        self.G = eg.Graph()
+        self.G.add_edges([(0, 1), (1, 2), (2, 3), (1, 3), (3, 4)],
+                         edges_attr=[{
+                             "weight": 1
+                         }, {
+                             "weight": 1
+                         }, {
+                             "weight": 1
+                         }, {
+                             "weight": 3
+                         }, {
+                             "weight": 1
+                         }])
+
+    def test_path_graph(self):
+        G = eg.Graph()
+        G.add_edges([(0, 1), (1, 2)])
+        result = eg.edge_betweenness_centrality(G, normalized=False)
+        assert result == {(0, 1): 2.0, (1, 2): 2.0}
+
+    @pytest.mark.parametrize("weight", [None, "weight"])
+    def test_csr_and_combined(self, weight):
+        expected = eg.edge_betweenness_centrality(self.G, weight=weight)
+        expected_nodes = eg.betweenness_centrality(self.G, weight=weight)
+        result, nodes = eg.edge_betweenness_centrality(self.G.freeze_csr(),
+                                                       weight=weight,
+                                                       with_nodes=True)
+        assert list(result) == list(expected)
+        for edge in expected:
+            assert result[edge] == pytest.approx(expected[edge])
+        for node in self.G:
+            assert nodes[node] == pytest.approx(expected_nodes[node])
+
+    def test_directed(self):
+        G = eg.DiGraph()
+        G.add_edges([(0, 1), (1, 2), (0, 2), (2, 0)])
+        result = eg.edge_betweenness_centrality(G, normalized=False)
+        assert result == {(0, 1): 2.0, (1, 2): 2.0, (0, 2): 1.0, (2, 0): 3.0}
+        csr_result = eg.edge_betweenness_centrality(G.freeze_csr(),
+                                                    normalized=False)
+        assert csr_result == result
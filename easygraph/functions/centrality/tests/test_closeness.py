@@ -0,0 +1,68 @@
+import pytest
+import easygraph as eg
+
+np = pytest.importorskip("numpy")
+
+
+class TestClosenessCentrality:
+
+    def setup_method(self):
+        self.P4 = eg.Graph()
+        self.P4.add_edges([(0, 1), (1, 2), (2, 3)])
+        self.G = eg.Graph()
+        self.G.add_edges([(0, 1), (1, 2), (2, 0), (2, 3), (4, 5)],
+                         edges_attr=[{
+                             "weight": 2
+                         }, {
+                             "weight": 1
+                         }, {
+                             "weight": 4
+                         }, {
+                             "weight": 1
+                         }, {
+                             "weight": 1
+                         }])
+
+    def test_path_graph(self):
+        c = eg.closeness_centrality(self.P4)
+        assert c == pytest.approx({0: 0.5, 1: 0.75, 2: 0.75, 3: 0.5})
+
+    def test_every_node_evaluated(self):
+        c = eg.closeness_centrality(self.G)
+        assert c[0] == pytest.approx(9 / 20)
+        assert c[3] == pytest.approx(9 / 25)
+        assert c[4] == pytest.approx(1 / 5)
+
+    def test_wf_improved(self):
+        c = eg.closeness_centrality(self.G, wf_improved=False)
+        assert c[0] == pytest.approx(3 / 4)
+        assert c[4] == pytest.approx(1.0)
+
+    def test_weighted(self):
+        c = eg.closeness_centrality(self.G, weight="weight")
+        # distances from 0: 1 -> 2, 2 -> 3, 3 -> 4
+        assert c[0] == pytest.approx(9 / (9 * 5))
+
+    def test_directed(self):
+        G = eg.DiGraph()
+        G.add_edges([(0, 1), (1, 2)])
+        c = eg.closeness_centrality(G, wf_improved=False)
+        assert c == pytest.approx({0: 2 / 3, 1: 1.0, 2: 0})
+
+    def test_many_sources(self):
+        G = eg.Graph()
+        G.add_edges([(i, i + 1) for i in range(150)])
+        c = eg.closeness_centrality(G)
+        assert c[0] == pytest.approx(150 / sum(range(151)))
+        assert c[75] == pytest.approx(150 / (2 * sum(range(76))))
+
+    def test_harmonic(self):
+        h = eg.harmonic_centrality(self.P4)
+        assert h == pytest.approx({0: 11 / 6, 1: 2.5, 2: 2.5, 3: 11 / 6})
+        h = eg.harmonic_centrality(self.G, weight="weight")
+        assert h[0] == pytest.approx(1 / 2 + 1 / 3 + 1 / 4)
+
+    def test_parallel(self):
+        expected = eg.closeness_centrality(self.G, weight="weight")
+        result = eg.closeness_centrality(self.G, weight="weight", n_workers=2)
+        assert result == pytest.approx(expected)
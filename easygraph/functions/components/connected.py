@@ -2,6 +2,12 @@ import easygraph
 from easygraph.utils.decorators import *
 from threading import Thread
 
+try:
+    from cpp_easygraph import cpp_bfs
+    from cpp_easygraph import cpp_connected_components
+except ImportError:
+    pass
+
 __all__ = [
     "is_connected", "number_connected_components", "connected_components",
     "connected_component_of_node"
@@ -30,6 +36,8 @@ def is_connected(G):
     """
     assert len(G) != 0, "No node in the graph."
     arbitrary_node = next(iter(G))  # Pick an arbitrary node to run BFS
+    if G.cflag == 1:
+        return len(G) == len(cpp_bfs(G, [arbitrary_node]))
     return len(G) == sum(1 for node in _plain_bfs(G, arbitrary_node))
 
 
@@ -52,6 +60,8 @@ def number_connected_components(G):
     >>> number_connected_components(G)
 
     """
+    if G.cflag == 1:
+        return len(cpp_connected_components(G))
     return sum(1 for component in _generator_connected_components(G))
 
 
@@ -75,7 +85,11 @@ def connected_components(G):
 
     """
     # Return all components ordered by number of nodes included
-    all_components = sorted(list(_generator_connected_components(G)), key=len)
+    if G.cflag == 1:
+        components = cpp_connected_components(G)
+    else:
+        components = list(_generator_connected_components(G))
+    all_components = sorted(components, key=len)
     return all_components
 
 
@@ -113,6 +127,8 @@ def connected_component_of_node(G, node):
     >>> connected_component_of_node(G, node='Jack')
     
     """
+    if G.cflag == 1:
+        return set(cpp_bfs(G, [node]))
     return set(_plain_bfs(G, node))
 
 
@@ -1,4 +1,5 @@
 from .pagerank import *
 from .laplacian import *
 from .mst import *
-from .bridges import *
\ No newline at end of file
+from .bridges import *
+from .cluster import *
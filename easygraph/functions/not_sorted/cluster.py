@@ -0,0 +1,119 @@
+from easygraph.utils import *
+
+try:
+    from cpp_easygraph import cpp_triangles
+except ImportError:
+    pass
+
+__all__ = ["triangles", "clustering"]
+
+
+def _triangles(G, nodes=None):
+    """Returns the number of edges between the neighbors of each node.
+
+    Self-loops are ignored. For every node, the result is its number of
+    triangles.
+    """
+    adj = G.adj
+    if nodes is not None:
+        triangles = {}
+        for v in nodes:
+            nbrs = adj[v].keys() - {v}
+            # Each edge between two neighbors is seen from both ends
+            triangles[v] = sum(
+                len(nbrs & adj[u].keys()) - (u in adj[u]) for u in nbrs) // 2
+        return triangles
+    # Orient every edge toward the node of higher degree, so that each
+    # triangle is found once, at its edge between the two lower nodes, by
+    # intersecting the short out-sets of its ends.
+    rank = {
+        v: i
+        for i, v in enumerate(sorted(adj, key=lambda v: len(adj[v])))
+    }
+    higher = {
+        v: {u
+            for u in nbrs if rank[u] > rank[v]}
+        for v, nbrs in adj.items()
+    }
+    triangles = dict.fromkeys(adj, 0)
+    for u, higher_u in higher.items():
+        for v in higher_u:
+            common = higher_u & higher[v]
+            if common:
+                triangles[u] += len(common)
+                triangles[v] += len(common)
+                for w in common:
+                    triangles[w] += 1
+    return triangles
+
+
+@not_implemented_for("multigraph")
+@not_implemented_for("directed")
+def triangles(G, nodes=None):
+    """Returns the number of triangles through each node.
+
+    All the triangles of the graph are counted in one pass, which
+    intersects the neighbor sets of the two ends of each edge.
+
+    Parameters
+    ----------
+    G : easygraph.Graph
+        An undirected graph. Self-loops are ignored.
+
+    nodes : list of nodes or None, optional (default : None)
+        The nodes you want to calculate. If *None*, all nodes in `G` will be calculated.
+
+    Returns
+    -------
+    triangles : dict
+        The number of triangles through each node in `nodes`.
+
+    Examples
+    --------
+    >>> G = eg.complete_graph(5)
+    >>> eg.triangles(G, nodes=[0, 1])
+    {0: 6, 1: 6}
+
+    """
+    if G.cflag == 1:
+        if nodes is not None:
+            nodes = list(nodes)
+        return {v: int(t) for v, t in cpp_triangles(G, nodes=nodes).items()}
+    return _triangles(G, nodes)
+
+
+@not_implemented_for("multigraph")
+@not_implemented_for("directed")
+def clustering(G, nodes=None):
+    """Returns the clustering coefficient of each node.
+
+    The clustering coefficient of a node of degree `d` through `t`
+    triangles is `2t / (d (d - 1))`, the fraction of the pairs of its
+    neighbors that are adjacent. It is 0 for nodes with fewer than two
+    neighbors.
+
+    Parameters
+    ----------
+    G : easygraph.Graph
+        An undirected graph. Self-loops are ignored.
+
+    nodes : list of nodes or None, optional (default : None)
+        The nodes you want to calculate. If *None*, all nodes in `G` will be calculated.
+
+    Returns
+    -------
+    clustering : dict
+        The clustering coefficient of each node in `nodes`.
+
+    Examples
+    --------
+    >>> G = eg.complete_graph(5)
+    >>> eg.clustering(G, nodes=[0, 1])
+    {0: 1.0, 1: 1.0}
+
+    """
+    clustering = {}
+    for v, t in triangles(G, nodes).items():
+        d = sum(1 for u in G.neighbors(v) if u != v)
+        clustering[v] = 0 if t == 0 else 2 * t / (d * (d - 1))
+    return clustering
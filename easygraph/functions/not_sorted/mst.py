@@ -136,7 +136,8 @@ def kruskal_mst_edges(G,
         If `ignore_nan is True` then that edge is ignored instead.
 
     """
-    subtrees = UnionFind()
+    index = {node: i for i, node in enumerate(G)}
+    subtrees = IndexUnionFind(len(index))
     edges = []
     for u, v, t in G.edges:
         edges.append((u, v, t))
@@ -154,12 +155,11 @@ def kruskal_mst_edges(G,
 
     edges = sorted(filter_nan_edges(), key=itemgetter(0))
     for wt, u, v, d in edges:
-        if subtrees[u] != subtrees[v]:
+        if subtrees.union(index[u], index[v]):
             if data:
                 yield (u, v, d)
             else:
                 yield (u, v)
-            subtrees.union(u, v)
 
 
 def prim_mst_edges(G, minimum, weight="weight", data=True, ignore_nan=False):
@@ -696,7 +696,9 @@ class UnionFind:
         # Find the heaviest root according to its weight.
         roots = iter(
             sorted({self[x]
-                    for x in objects}, key=lambda r: self.weights[r]))
+                    for x in objects},
+                   key=lambda r: self.weights[r],
+                   reverse=True))
         try:
             root = next(roots)
         except StopIteration:
@@ -705,3 +707,67 @@ class UnionFind:
         for r in roots:
             self.weights[root] += self.weights[r]
             self.parents[r] = root
+
+
+class IndexUnionFind:
+    """Union-find data structure over the integers 0, ..., n - 1.
+
+    The parent and the rank of each element are kept in two lists indexed
+    by the element, which is much lighter than `UnionFind` when the elements
+    are node indices, e.g. those of a CSR snapshot. `find` compresses the
+    path it walks and `union` attaches the root of lower rank below the
+    other, so any sequence of operations runs in almost linear time.
+
+    Parameters
+    ----------
+    n : int
+        The number of elements, each in its own singleton set at first.
+
+    Examples
+    --------
+    >>> sets = IndexUnionFind(4)
+    >>> sets.union(0, 2)
+    True
+    >>> sets.union(2, 0)
+    False
+    >>> sets.find(0) == sets.find(2)
+    True
+
+    """
+
+    def __init__(self, n):
+        self.parents = list(range(n))
+        self.ranks = [0] * n
+
+    def __len__(self):
+        return len(self.parents)
+
+    def find(self, i):
+        """Returns the representative element of the set containing i."""
+        parents = self.parents
+        root = i
+        while parents[root] != root:
+            root = parents[root]
+        while parents[i] != root:
+            parents[i], i = root, parents[i]
+        return root
+
+    def union(self, i, j):
+        """Merges the sets containing i and j.
+
+        Returns
+        -------
+        merged : bool
+            False if i and j were already in the same set.
+
+        """
+        i, j = self.find(i), self.find(j)
+        if i == j:
+            return False
+        ranks = self.ranks
+        if ranks[i] < ranks[j]:
+            i, j = j, i
+        self.parents[j] = i
+        if ranks[i] == ranks[j]:
+            ranks[i] += 1
+        return True
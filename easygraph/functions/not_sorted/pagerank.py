@@ -1,50 +1,379 @@
+from collections import deque
+
 import easygraph as eg
+from easygraph.classes.csr_graph import CSRGraph
 from easygraph.utils import *
 
-__all__ = ["pagerank"]
+__all__ = ["pagerank", "IncrementalPageRank"]
 
 
 @not_implemented_for("multigraph")
-def pagerank(G, alpha=0.85):
+def pagerank(G,
+             alpha=0.85,
+             personalization=None,
+             max_iter=1000,
+             tol=1e-10,
+             nstart=None,
+             weight="weight",
+             dangling=None):
     """
     Returns the PageRank value of each node in G.
 
+    The PageRank is computed by power iteration on the sparse transition
+    matrix of a CSR snapshot of G, so each iteration costs O(N + M) time and
+    no dense N x N matrix is built.
+
     Parameters
     ----------
     G : graph
         Undirected graph will be considered as directed graph with two directed edges for each undirected edge.
+        A CSR snapshot returned by `G.freeze_csr()` is accepted as well.
 
     alpha : float
         The damping factor. Default is 0.85
 
+    personalization : dict, optional (default : None)
+        The teleportation distribution, keyed by node. Nodes not in the
+        dict get 0. If None, teleportation is uniform.
+
+    max_iter : int, optional (default : 1000)
+        Maximum number of power iterations.
+
+    tol : float, optional (default : 1e-10)
+        Convergence is reached when the L1 change of the scores in one
+        iteration is below ``N * tol``. The default matches the accuracy of
+        an exact eigenvector solve; a looser tolerance such as 1e-6 is usually
+        enough for ranking.
+
+    nstart : dict, optional (default : None)
+        Starting value of the iteration for each node, e.g. the result of a
+        previous run on a slightly different graph (warm start). Nodes not
+        in the dict start at 0.
+
+    weight : string or None, optional (default : 'weight')
+        Weight key of the edges. If None, all the weights will be regarded as 1.
+
+    dangling : dict, optional (default : None)
+        The distribution of the out-links of dangling nodes (nodes without
+        out-edges), keyed by node. If None, *personalization* is used.
+
+    Returns
+    -------
+    pagerank : dict
+        Each node's (key) PageRank value (value).
+
+    Raises
+    ------
+    EasyGraphError
+        If the power iteration does not converge within *max_iter* iterations.
+
+    Examples
+    --------
+    >>> pr = eg.pagerank(G, tol=1e-6)
+
+    Rerun after small changes of G, starting from the previous result:
+
+    >>> pr = eg.pagerank(G, tol=1e-6, nstart=pr)
+
     """
     import numpy as np
     if len(G) == 0:
         return {}
-    M = google_matrix(G, alpha=alpha)
+    csr = CSRGraph.from_graph(G, weight=weight)
+    N = len(csr)
+    A = csr.to_scipy_sparse()
+    AT = A.T.tocsr()
+    out_weight = np.asarray(A.sum(axis=1)).ravel()
+    inv_out_weight = np.zeros(N)
+    np.divide(1.0, out_weight, out=inv_out_weight, where=out_weight != 0)
+    is_dangling = out_weight == 0
+
+    if personalization is None:
+        p = np.repeat(1.0 / N, N)
+    else:
+        p = _distribution(personalization, csr, "personalization")
+    if dangling is None:
+        dangling_weights = p
+    else:
+        dangling_weights = _distribution(dangling, csr, "dangling")
+    if nstart is None:
+        x = np.repeat(1.0 / N, N)
+    else:
+        x = _distribution(nstart, csr, "nstart")
+
+    for _ in range(max_iter):
+        xlast = x
+        x = alpha * AT.dot(xlast * inv_out_weight)
+        x += alpha * xlast[is_dangling].sum() * dangling_weights
+        x += (1 - alpha) * p
+        err = np.absolute(x - xlast).sum()
+        if err < N * tol:
+            return dict(zip(csr.nodes, map(float, x)))
+    raise EasyGraphError(
+        "pagerank: power iteration failed to converge in {} iterations.".
+        format(max_iter))
+
+
+def _distribution(values, csr, name):
+    import numpy as np
+    x = np.array([values.get(node, 0) for node in csr.nodes], dtype=float)
+    total = x.sum()
+    if total == 0:
+        raise EasyGraphError(
+            "pagerank: {} must have a nonzero sum over the nodes of G.".format(
+                name))
+    return x / total
+
+
+class IncrementalPageRank:
+    """Keeps the PageRank of a graph up to date while the graph changes.
+
+    The object subscribes to the structural changes of *G* (see
+    `Graph.subscribe`). Adding or removing an edge or a node updates the
+    internal state in O(1) time, and the scores are then settled by local
+    residual pushes around the touched nodes, instead of rerunning the power
+    iteration on the whole graph.
+
+    The state is a pair of estimates `p` and residuals `r` with the invariant
+    ``N * pr = p + r * Pi`` where ``Pi = (1 - alpha) * (I - alpha * P)^-1``, so
+    pushing the residual of a node, or rescaling the estimate of a node whose
+    out-degree changed [1]_, keeps the exact PageRank recoverable. The
+    residual mass sent to the uniform distribution by dangling nodes is kept
+    as a single scalar. Pushes stop when every residual is at most *tol*,
+    which bounds the L1 error of the scores, see `error_bound`.
+
+    Edges are unweighted, and teleportation and dangling nodes use the
+    uniform distribution, i.e. the scores approximate
+    ``pagerank(G, alpha, weight=None)``.
+
+    Parameters
+    ----------
+    G : easygraph.Graph or easygraph.DiGraph
+        The graph to follow.
+
+    alpha : float, optional (default : 0.85)
+        The damping factor.
+
+    tol : float, optional (default : 1e-6)
+        The largest residual left on a node after settling.
 
-    # use numpy LAPACK solver
-    eigenvalues, eigenvectors = np.linalg.eig(M.T)
-    ind = np.argmax(eigenvalues)
-    # eigenvector of largest eigenvalue is at ind, normalized
-    largest = np.array(eigenvectors[:, ind]).flatten().real
-    norm = float(largest.sum())
-    return dict(zip(G, map(float, largest / norm)))
+    See Also
+    --------
+    pagerank
+
+    References
+    ----------
+    .. [1] Hongyang Zhang, Peter Lofgren, Ashish Goel.
+       "Approximate Personalized PageRank on Dynamic Graphs", KDD 2016.
+
+    Examples
+    --------
+    >>> ipr = eg.IncrementalPageRank(G)
+    >>> G.add_edge(1, 5)
+    >>> G.remove_edge(2, 3)
+    >>> ipr[5]
+    >>> scores = ipr.scores()
+
+    Start over from an exact computation, e.g. after many updates:
+
+    >>> ipr.refresh()
+
+    """
+
+    def __init__(self, G, alpha=0.85, tol=1e-6):
+        if G.is_multigraph():
+            raise EasyGraphNotImplemented("not implemented for multigraph type")
+        self.G = G
+        self.alpha = alpha
+        self.tol = tol
+        self._directed = G.is_directed()
+        self.refresh()
+        G.subscribe(self._on_change)
+
+    def __getitem__(self, node):
+        self._settle()
+        return self._p[node] / (self._n * (1 - self._t))
+
+    def __len__(self):
+        return self._n
+
+    def scores(self):
+        """Returns the PageRank value of each node.
+
+        Returns
+        -------
+        pagerank : dict
+            Each node's (key) PageRank value (value).
+
+        """
+        self._settle()
+        scale = 1 / (self._n * (1 - self._t)) if self._n else 0
+        return {node: value * scale for node, value in self._p.items()}
+
+    def error_bound(self):
+        """Returns an upper bound of the L1 distance to the exact PageRank.
+
+        Returns
+        -------
+        bound : float
+            The sum over the nodes of the absolute difference between
+            `scores` and the exact PageRank is at most *bound*.
+
+        """
+        self._settle()
+        if not self._n:
+            return 0.0
+        return sum(map(abs, self._r.values())) / (self._n * abs(1 - self._t))
+
+    def refresh(self):
+        """Recomputes the state from the current graph.
+
+        Use it after changes made while the object was not subscribed, or to
+        clear the rounding errors accumulated over many updates.
+
+        """
+        import numpy as np
+        alpha = self.alpha
+        self._t = 0.0
+        self._dangling = 0.0
+        self._n = N = len(self.G)
+        self._pending = deque()
+        if N == 0:
+            self._p, self._r, self._degree = {}, {}, {}
+            return
+        csr = CSRGraph.from_graph(self.G, weight=None)
+        pr = pagerank(csr, alpha=alpha, weight=None)
+        p = np.array([pr[node] for node in csr.nodes]) * N
+        degree = csr.degree_array()
+        inv_degree = np.zeros(N)
+        np.divide(1.0, degree, out=inv_degree, where=degree != 0)
+        self._dangling = float(p[degree == 0].sum())
+        inflow = csr.to_scipy_sparse().T.dot(p * inv_degree)
+        inflow += self._dangling / N
+        r = 1 - (p - alpha * inflow) / (1 - alpha)
+        self._p = dict(zip(csr.nodes, p.tolist()))
+        self._r = dict(zip(csr.nodes, r.tolist()))
+        self._degree = dict(zip(csr.nodes, degree.tolist()))
+        self._pending = deque(
+            csr.node_of(i) for i in np.flatnonzero(np.absolute(r) > self.tol))
+
+    def close(self):
+        """Stops following the changes of the graph."""
+        self.G.unsubscribe(self._on_change)
+
+    def _on_change(self, event, u, v):
+        if event == "add_edge":
+            self._add_arc(u, v)
+            if not self._directed and u != v:
+                self._add_arc(v, u)
+        elif event == "remove_edge":
+            self._remove_arc(u, v)
+            if not self._directed and u != v:
+                self._remove_arc(v, u)
+        elif event == "add_node":
+            self._add_node(u)
+        elif event == "remove_node":
+            self._remove_node(u)
+
+    def _add_arc(self, u, w):
+        # p[u] is rescaled so that p[u] / degree[u] seen by the old
+        # out-neighbors stays the same, only u and w change their residuals.
+        alpha = self.alpha
+        d = self._degree[u]
+        p_u = self._p[u]
+        if d:
+            delta = p_u / d
+            self._p[u] = p_u + delta
+            self._r[u] -= delta / (1 - alpha)
+            self._r[w] += alpha * delta / (1 - alpha)
+        else:  # u stops being dangling
+            self._dangling -= p_u
+            self._t -= alpha * p_u / (self._n * (1 - alpha))
+            self._r[w] += alpha * p_u / (1 - alpha)
+        self._degree[u] = d + 1
+        self._pending.extend((u, w))
+
+    def _remove_arc(self, u, w):
+        alpha = self.alpha
+        d = self._degree[u]
+        p_u = self._p[u]
+        if d > 1:
+            delta = p_u / d
+            self._p[u] = p_u - delta
+            self._r[u] += delta / (1 - alpha)
+            self._r[w] -= alpha * delta / (1 - alpha)
+        else:  # u becomes dangling
+            self._r[w] -= alpha * p_u / (1 - alpha)
+            self._dangling += p_u
+            self._t += alpha * p_u / (self._n * (1 - alpha))
+        self._degree[u] = d - 1
+        self._pending.extend((u, w))
+
+    def _add_node(self, node):
+        # The dangling nodes spread over one more node
+        alpha = self.alpha
+        N = self._n
+        spread = alpha * self._dangling / (1 - alpha)
+        self._t += spread / (N + 1) - (spread / N if N else 0)
+        self._n = N + 1
+        self._p[node] = 0.0
+        self._r[node] = 1 + spread / (N + 1) - self._t
+        self._degree[node] = 0
+        self._pending.append(node)
+
+    def _remove_node(self, node):
+        # All the edges of the node are already removed, so it is dangling
+        alpha = self.alpha
+        N = self._n
+        spread = alpha * self._dangling / (1 - alpha)
+        self._dangling -= self._p.pop(node)
+        del self._r[node]
+        del self._degree[node]
+        self._n = N - 1
+        if self._n:
+            self._t += (alpha * self._dangling /
+                        ((1 - alpha) * self._n)) - spread / N
+        else:
+            self._t = self._dangling = 0.0
+
+    def _settle(self):
+        alpha = self.alpha
+        tol = self.tol
+        p, r = self._p, self._r
+        adj = self.G.adj
+        queue = self._pending  # FIFO, i.e. pushes proceed in sweeps
+        while queue:
+            u = queue.popleft()
+            r_u = r.get(u)
+            if r_u is None or abs(r_u) <= tol:
+                continue
+            r[u] = 0.0
+            p[u] += (1 - alpha) * r_u
+            nbrs = adj[u]
+            if nbrs:
+                share = alpha * r_u / len(nbrs)
+                for v in nbrs:
+                    before = r[v]
+                    r[v] = before + share
+                    if abs(before) <= tol < abs(before + share):
+                        queue.append(v)
+            else:
+                self._dangling += (1 - alpha) * r_u
+                self._t += alpha * r_u / self._n
 
 
 def google_matrix(G, alpha):
     import numpy as np
-    M = eg.utils.to_numpy_array(G)
     N = len(G)
     if N == 0:
-        return M
-
-    # Get dangling nodes(nodes with no out link)
-    dangling_nodes = np.where(M.sum(axis=1) == 0)[0]
-    dangling_weights = np.repeat(1.0 / N, N)
-    for node in dangling_nodes:
-        M[node] = dangling_weights
-
-    M /= M.sum(axis=1)[:, np.newaxis]
+        return np.zeros((0, 0))
+    # Work from the sparse adjacency, only the result itself is dense
+    A = eg.utils.to_scipy_sparse_array(G, format="csr")
+    out_weight = np.asarray(A.sum(axis=1)).ravel()
 
-    return alpha * M + (1 - alpha) * np.repeat(1.0 / N, N)
+    M = np.full((N, N), (1 - alpha) / N)
+    # Get dangling nodes(nodes with no out link), they link to every node
+    M[out_weight == 0] += alpha / N
+    rows = np.repeat(np.arange(N), np.diff(A.indptr))
+    M[rows, A.indices] += alpha * A.data / out_weight[rows]
+    return M
@@ -0,0 +1,48 @@
+import math
+
+import pytest
+
+import easygraph as eg
+
+
+class TestTriangles:
+    def setup_method(self):
+        # two triangles sharing the edge (1, 2), a tail, a self-loop and an
+        # isolated node
+        self.G = eg.Graph()
+        self.G.add_edges([(0, 1), (0, 2), (1, 2), (1, 3), (2, 3), (3, 4),
+                          (4, 4)])
+        self.G.add_node(5)
+
+    def test_triangles(self):
+        expected = {0: 1, 1: 2, 2: 2, 3: 1, 4: 0, 5: 0}
+        assert eg.triangles(self.G) == expected
+        assert eg.triangles(self.G, nodes=[1, 4]) == {1: 2, 4: 0}
+        assert eg.triangles(eg.complete_graph(5)) == dict.fromkeys(range(5), 6)
+
+    def test_clustering(self):
+        assert eg.clustering(self.G) == {
+            0: 1.0,
+            1: 2 / 3,
+            2: 2 / 3,
+            3: 1 / 3,
+            4: 0,
+            5: 0
+        }
+        assert eg.clustering(self.G, nodes=[0]) == {0: 1.0}
+
+    def test_effective_size(self):
+        # n - 2t/n, with n the neighbors other than the node itself
+        es = eg.effective_size(self.G)
+        assert es[0] == 1
+        assert es[1] == pytest.approx(3 - 4 / 3)
+        assert es[3] == pytest.approx(3 - 2 / 3)
+        assert es[4] == 1
+        assert math.isnan(es[5])
+        assert eg.effective_size(self.G, nodes=[3]) == {3: es[3]}
+
+    def test_not_implemented(self):
+        with pytest.raises(eg.EasyGraphNotImplemented):
+            eg.triangles(eg.DiGraph([(0, 1)]))
+        with pytest.raises(eg.EasyGraphNotImplemented):
+            eg.clustering(eg.MultiGraph([(0, 1)]))
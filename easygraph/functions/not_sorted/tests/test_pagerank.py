@@ -23,4 +23,74 @@ class TestPageRank:
         self.G1.remove_edge(1,4)
         pg = eg.pagerank(self.G1)
         for k, v in pg.items():
-            assert pytest.approx(v, 0.0000001) == pg_true[k]
\ No newline at end of file
+            assert pytest.approx(v, 0.0000001) == pg_true[k]
+    def test_pagerank_directed_weighted(self):
+        G = eg.DiGraph()
+        G.add_edges([(0, 1), (1, 2), (2, 0), (2, 3), (3, 1), (4, 0)],
+                     edges_attr=[{"weight": w} for w in [1, 2, 1, 3, 1, 1]])
+        G.add_node(5)
+        # dense Google matrix, dangling node 5 links to every node
+        M = eg.to_numpy_array(G)
+        M[5] = 1.0
+        M /= M.sum(axis=1)[:, np.newaxis]
+        M = 0.85 * M + 0.15 / len(G)
+        eigenvalues, eigenvectors = np.linalg.eig(M.T)
+        largest = eigenvectors[:, np.argmax(eigenvalues)].real
+        expected = largest / largest.sum()
+        pg = eg.pagerank(G)
+        for i, node in enumerate(G):
+            assert pg[node] == pytest.approx(expected[i], rel=1e-7)
+
+    def test_personalization_and_dangling(self):
+        G = eg.DiGraph()
+        G.add_edges([(0, 1), (1, 2)])
+        pg = eg.pagerank(G, personalization={0: 1})
+        assert sum(pg.values()) == pytest.approx(1.0)
+        assert pg[0] > pg[1] > pg[2]
+        pg = eg.pagerank(G, personalization={0: 1}, dangling={2: 1})
+        assert pg[2] > pg[1]
+        with pytest.raises(eg.EasyGraphError):
+            eg.pagerank(G, personalization={"missing": 1})
+
+    def test_nstart(self):
+        pg = eg.pagerank(self.G1)
+        assert eg.pagerank(self.G1, nstart=pg) == pytest.approx(pg)
+        with pytest.raises(eg.EasyGraphError):
+            eg.pagerank(self.G1, nstart={0: 1, 1: 0.5}, max_iter=1)
+
+    @pytest.mark.parametrize("directed", [False, True])
+    def test_incremental(self, directed):
+        G = eg.DiGraph() if directed else eg.Graph()
+        G.add_edges([(0, 1), (1, 2), (2, 0), (2, 3), (3, 3)])
+        G.add_node(4)
+        ipr = eg.IncrementalPageRank(G, tol=1e-10)
+        G.add_edge(4, 0)
+        G.add_edge(3, 5)
+        G.remove_edge(1, 2)
+        G.add_edges_from([(5, 1), (6, 2)])
+        G.remove_node(0)
+        G.add_node(7)
+        assert len(ipr) == len(G)
+        expected = eg.pagerank(G, weight=None, tol=1e-14)
+        scores = ipr.scores()
+        assert sum(abs(scores[n] - expected[n])
+                   for n in G) <= ipr.error_bound() + 1e-12
+        for node in G:
+            assert ipr[node] == pytest.approx(expected[node], abs=1e-9)
+        ipr.close()
+        G.add_edge(7, 1)
+        ipr.refresh()
+        assert ipr.scores() == pytest.approx(eg.pagerank(G, weight=None))
+
+    @pytest.mark.parametrize("directed", [False, True])
+    def test_incremental_compact_arrays(self, directed):
+        # Giving data to existing edges of a compact graph adds no edges
+        G = eg.DiGraph() if directed else eg.Graph()
+        G.compact()
+        G.add_edges([(0, 1), (1, 2), (2, 0), (2, 3)])
+        ipr = eg.IncrementalPageRank(G, tol=1e-10)
+        G.add_edges_from_arrays([0, 1, 2, 3], [1, 2, 0, 4],
+                                weights=[1, 2, 3, 4])
+        expected = eg.pagerank(G, weight=None, tol=1e-14)
+        for node in G:
+            assert ipr[node] == pytest.approx(expected[node], abs=1e-9)
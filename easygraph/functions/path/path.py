@@ -1,4 +1,12 @@
+from easygraph.classes.csr_graph import CSRGraph
 from easygraph.utils.decorators import *
+from easygraph.utils.exception import EasyGraphError
+
+try:
+    from cpp_easygraph import cpp_bfs
+    from cpp_easygraph import cpp_dijkstra
+except ImportError:
+    pass
 
 __all__ = [
     "Dijkstra",
@@ -8,6 +16,8 @@ __all__ = [
     "single_source_bfs",
     "single_source_dijkstra",
     "multi_source_dijkstra",
+    "shortest_path",
+    "distance_matrix",
 ]
 
 
@@ -51,6 +61,10 @@ def Floyd(G):
     result_dict : dict
         the length of paths from all nodes to remaining nodes
 
+    See Also
+    --------
+    distance_matrix
+
     Examples
     --------
     Returns the length of paths from all nodes to remaining nodes
@@ -58,26 +72,121 @@ def Floyd(G):
     >>> Floyd(G)
 
     """
-    adj = G.adj.copy()
-    result_dict = {}
-    for i in G:
-        result_dict[i] = {}
-    for i in G:
-        temp_key = adj[i].keys()
-        for j in G:
-            if j in temp_key:
-                result_dict[i][j] = adj[i][j].get("weight", 1)
-            else:
-                result_dict[i][j] = float("inf")
-            if i == j:
-                result_dict[i][i] = 0
-    for k in G:
-        for i in G:
-            for j in G:
-                temp = result_dict[i][k] + result_dict[k][j]
-                if result_dict[i][j] > temp:
-                    result_dict[i][j] = temp
-    return result_dict
+    import numpy as np
+    nodes = list(G)
+    dist = distance_matrix(G, dtype=np.float64)
+    return {i: dict(zip(nodes, row)) for i, row in zip(nodes, dist.tolist())}
+
+
+@not_implemented_for("multigraph")
+def distance_matrix(G,
+                    weight="weight",
+                    method="auto",
+                    dtype="float32",
+                    filename=None):
+    """Returns the matrix of the shortest path lengths between all pairs of nodes.
+
+    Rows and columns follow the order of the nodes of G, i.e. ``list(G)``.
+    Unreachable pairs get ``inf``.
+
+    Parameters
+    ----------
+    G : graph
+        A easygraph graph, or its CSR snapshot returned by `G.freeze_csr()`.
+
+    weight : string or None, optional (default : 'weight')
+        Weight key of the edges, edges without it have weight 1. If None,
+        every edge has length 1.
+
+    method : string, optional (default : 'auto')
+        'bfs', 'dijkstra', 'floyd-warshall' or 'auto'. 'bfs' and 'dijkstra'
+        search from each source in turn on the CSR snapshot of G, in
+        compiled code, which costs O(N * M log N) time. 'floyd-warshall'
+        updates blocks of rows of the matrix with vectorized min-plus
+        products, which costs O(N^3) time but wins on dense graphs. 'auto'
+        chooses 'bfs' if *weight* is None, 'floyd-warshall' if some weight
+        is negative or if the graph has at least 0.1 * N^2 edges, and
+        'dijkstra' otherwise.
+
+    dtype : data-type, optional (default : 'float32')
+        The data type of the matrix. 'float32' halves the memory, and is
+        exact for integer distances up to 2^24.
+
+    filename : string, optional (default : None)
+        If given, the matrix is a `numpy.memmap` backed by this file, so
+        that graphs whose matrix does not fit in memory can be handled.
+
+    Returns
+    -------
+    dist : numpy.ndarray or numpy.memmap
+        N x N matrix, dist[i, j] is the length of a shortest path from the
+        i-th node to the j-th node.
+
+    See Also
+    --------
+    Floyd
+
+    Examples
+    --------
+    >>> dist = eg.distance_matrix(G)
+    >>> dist = eg.distance_matrix(G, weight=None, filename="dist.dat")
+
+    """
+    import numpy as np
+    csr = CSRGraph.from_graph(G, weight=weight)
+    n = len(csr)
+    if filename is None:
+        dist = np.empty((n, n), dtype=dtype)
+    else:
+        dist = np.memmap(filename, dtype=dtype, mode="w+", shape=(n, n))
+    if n == 0:
+        return dist
+    # Rows processed at a time, so that temporaries stay around 32 MB
+    block = max(1, (1 << 22) // n)
+    if method == "auto":
+        if weight is None:
+            method = "bfs"
+        elif (csr.weights < 0).any() or csr.indices.size >= 0.1 * n * n:
+            method = "floyd-warshall"
+        else:
+            method = "dijkstra"
+    if method in ("bfs", "dijkstra"):
+        from scipy.sparse.csgraph import shortest_path
+        A = csr.to_scipy_sparse().copy()  # scipy wants writable buffers
+        for start in range(0, n, block):
+            sources = np.arange(start, min(start + block, n))
+            dist[start:start + block] = shortest_path(
+                A,
+                method="D",
+                directed=csr.is_directed(),
+                unweighted=(method == "bfs"),
+                indices=sources)
+    elif method == "floyd-warshall":
+        _floyd_warshall(csr, dist, block)
+    else:
+        raise EasyGraphError(
+            "Unknown method {} for distance_matrix.".format(method))
+    return dist
+
+
+def _floyd_warshall(csr, dist, block):
+    # dist[i] = min(dist[i], dist[i, k] + dist[k]) for every pivot k, as a
+    # rank-1 min-plus update applied to one block of rows at a time.
+    import numpy as np
+    n = len(csr)
+    dist[:] = np.inf
+    sources = np.repeat(np.arange(n), np.diff(csr.indptr))
+    np.minimum.at(dist, (sources, csr.indices), csr.weights)
+    if (dist.diagonal() < 0).any():
+        raise ValueError('Contradictory paths found:', 'negative weights?')
+    np.fill_diagonal(dist, 0)
+    for k in range(n):
+        row = np.array(dist[k])
+        for start in range(0, n, block):
+            rows = dist[start:start + block]
+            np.minimum(rows, rows[:, k, np.newaxis] + row, out=rows)
+    if (dist.diagonal() < 0).any():
+        raise ValueError('Contradictory paths found:', 'negative weights?')
 
 
 @not_implemented_for("multigraph")
@@ -85,6 +194,10 @@ def Floyd(G):
 def Prim(G):
     """Returns the edges that make up the minimum spanning tree
 
+    The tree spans the connected component of the first node of G. It is
+    grown with a binary heap of the edges leaving the tree, which costs
+    O(M log M) time.
+
     Parameters
     ---------- 
     G : graph
@@ -102,34 +215,39 @@ def Prim(G):
     >>> Prim(G)
 
     """
-    adj = G.adj.copy()
+    from heapq import heapify, heappop, heappush
+    push = heappush
+    pop = heappop
+    csr = CSRGraph.from_graph(G)
+    indptr, indices, weights = csr.adjacency_lists()
+    node_of = csr.nodes
     result_dict = {}
     for i in G:
         result_dict[i] = {}
-    selected = []
-    candidate = []
-    for i in G:
-        if not selected:
-            selected.append(i)
-        else:
-            candidate.append(i)
-    while len(candidate):
-        start = None
-        end = None
-        min_weight = float("inf")
-        for i in selected:
-            for j in candidate:
-                if i in G and j in G[i] and adj[i][j].get("weight",
-                                                          1) < min_weight:
-                    start = i
-                    end = j
-                    min_weight = adj[i][j].get("weight", 1)
-        if start != None and end != None:
-            result_dict[start][end] = min_weight
-            selected.append(end)
-            candidate.remove(end)
-        else:
-            break
+    if not len(csr):
+        return result_dict
+    selected = [False] * len(csr)
+    selected[0] = True
+    # Lightest edge seen from the tree to each node, only lighter ones are
+    # pushed again
+    best = [float("inf")] * len(csr)
+    frontier = []
+    for k in range(indptr[0], indptr[1]):
+        if weights[k] < best[indices[k]]:
+            best[indices[k]] = weights[k]
+            frontier.append((weights[k], 0, indices[k]))
+    heapify(frontier)
+    while frontier:
+        weight, start, end = pop(frontier)
+        if selected[end]:
+            continue
+        selected[end] = True
+        result_dict[node_of[start]][node_of[end]] = weight
+        for k in range(indptr[end], indptr[end + 1]):
+            v = indices[k]
+            if not selected[v] and weights[k] < best[v]:
+                best[v] = weights[k]
+                push(frontier, (weights[k], end, v))
     return result_dict
 
 
@@ -138,6 +256,10 @@ def Prim(G):
 def Kruskal(G):
     """Returns the edges that make up the minimum spanning tree
 
+    The edges are sorted by weight at once with NumPy, then joined with an
+    `IndexUnionFind` over the node indices, which costs O(M log M) time.
+    For a disconnected graph the result is a spanning forest.
+
     Parameters
     ---------- 
     G : graph
@@ -155,32 +277,39 @@ def Kruskal(G):
     >>> Kruskal(G)
 
     """
-    adj = G.adj.copy()
+    import numpy as np
+    from easygraph.functions.not_sorted.mst import IndexUnionFind
+    csr = CSRGraph.from_graph(G)
+    n = len(csr)
+    node_of = csr.nodes
     result_dict = {}
-    edge_list = []
     for i in G:
         result_dict[i] = {}
-    for i in G:
-        for j in G[i]:
-            weight = adj[i][j].get("weight", 1)
-            edge_list.append([i, j, weight])
-    edge_list.sort(key=lambda a: a[2])
-    group = [[i] for i in G]
-    for edge in edge_list:
-        for i in range(len(group)):
-            if edge[0] in group[i]:
-                m = i
-            if edge[1] in group[i]:
-                n = i
-        if m != n:
-            result_dict[edge[0]][edge[1]] = edge[2]
-            group[m] = group[m] + group[n]
-            group[n] = []
+    # Each undirected edge once, from its endpoint that comes first
+    sources = np.repeat(np.arange(n), np.diff(csr.indptr))
+    once = sources < csr.indices
+    order = np.argsort(csr.weights[once], kind="stable")
+    edges = zip(sources[once][order].tolist(),
+                csr.indices[once][order].tolist(),
+                csr.weights[once][order].tolist())
+    forest = IndexUnionFind(n)
+    union = forest.union
+    missing = n - 1
+    for u, v, weight in edges:
+        if missing == 0:
+            break
+        if union(u, v):
+            result_dict[node_of[u]][node_of[v]] = weight
+            missing -= 1
     return result_dict
 
 
 @not_implemented_for("multigraph")
 def single_source_bfs(G, source, target=None):
+    if isinstance(G, CSRGraph):
+        return _csr_single_source_bfs(G, source, target=target)
+    if G.cflag == 1:
+        return cpp_bfs(G, [source], target=target)
     nextlevel = {source: 0}
     return dict(_single_source_bfs(G.adj, nextlevel, target=target))
 
@@ -215,6 +344,10 @@ def multi_source_dijkstra(G, sources, weight="weight", target=None):
 
 
 def _dijkstra_multisource(G, sources, weight="weight", target=None):
+    if isinstance(G, CSRGraph):
+        return _csr_dijkstra_multisource(G, sources, target=target)
+    if G.cflag == 1:
+        return cpp_dijkstra(G, list(sources), weight=weight, target=target)
     from heapq import heappush, heappop
     push = heappush
     pop = heappop
@@ -247,3 +380,319 @@ def _dijkstra_multisource(G, sources, weight="weight", target=None):
             else:
                 continue
     return dist
+
+
+@not_implemented_for("multigraph")
+def shortest_path(G, source, target, weight=None, heuristic=None):
+    """Returns the length and the nodes of a shortest path from source to target.
+
+    Without a heuristic, two searches grow from *source* along the edges
+    and from *target* against them, and stop as soon as they meet, which
+    usually visits far fewer nodes than one search from *source*. With
+    *weight* None it is a bidirectional BFS, otherwise a bidirectional
+    Dijkstra. With a heuristic, an A* search runs from *source* and stops
+    when *target* is settled.
+
+    Parameters
+    ----------
+    G : graph
+        A easygraph graph, or its CSR snapshot returned by `G.freeze_csr()`.
+        Repeated queries on a fixed graph are faster on the snapshot.
+
+    source : object
+        Starting node.
+
+    target : object
+        Ending node.
+
+    weight : string or None, optional (default : None)
+        Weight key of the edges, edges without it have weight 1. If None,
+        every edge has length 1. For a CSR snapshot, any value other than
+        None uses the weights frozen into the snapshot.
+
+    heuristic : function, optional (default : None)
+        ``heuristic(u, target)`` estimates the distance from node *u* to
+        *target*. It must never overestimate the distance for the returned
+        path to be a shortest one.
+
+    Returns
+    -------
+    length : number
+        The length of the path.
+
+    path : list
+        The nodes of the path, from *source* to *target*.
+
+    Raises
+    ------
+    EasyGraphError
+        If *source* or *target* is not in G, or if there is no path
+        between them.
+
+    ValueError
+        If a negative edge weight is found.
+
+    See Also
+    --------
+    single_source_dijkstra
+
+    Examples
+    --------
+    >>> length, path = eg.shortest_path(G, 1, 5, weight="weight")
+
+    On a grid graph whose nodes are (x, y) tuples:
+
+    >>> manhattan = lambda u, v: abs(u[0] - v[0]) + abs(u[1] - v[1])
+    >>> length, path = eg.shortest_path(G, (0, 0), (9, 9),
+    ...                                 heuristic=manhattan)
+
+    """
+    for node in (source, target):
+        if node not in G:
+            raise EasyGraphError("Node {} is not in the graph.".format(node))
+    if isinstance(G, CSRGraph):
+        indptr, indices, weights = G.adjacency_lists()
+        rindptr, rindices, rweights = G.reverse().adjacency_lists()
+        node_of = G.nodes
+        start, end = G.index_of(source), G.index_of(target)
+        if weight is None:
+            succ = lambda v: indices[indptr[v]:indptr[v + 1]]
+            pred = lambda v: rindices[rindptr[v]:rindptr[v + 1]]
+            weighted_succ = lambda v: ((u, 1) for u in succ(v))
+        else:
+            succ = lambda v: zip(indices[indptr[v]:indptr[v + 1]], weights[
+                indptr[v]:indptr[v + 1]])
+            pred = lambda v: zip(rindices[rindptr[v]:rindptr[v + 1]],
+                                 rweights[rindptr[v]:rindptr[v + 1]])
+            weighted_succ = succ
+        if heuristic is not None:
+            estimate = heuristic
+            heuristic = lambda u, v: estimate(node_of[u], node_of[v])
+    else:
+        adj = G.adj
+        radj = G._pred if G.is_directed() else adj
+        start, end = source, target
+        if weight is None:
+            succ = adj.__getitem__
+            pred = radj.__getitem__
+            weighted_succ = lambda v: ((u, 1) for u in adj[v])
+        else:
+            succ = lambda v: ((u, d.get(weight, 1)) for u, d in adj[v].items())
+            pred = lambda v: (
+                (u, d.get(weight, 1)) for u, d in radj[v].items())
+            weighted_succ = succ
+
+    if heuristic is not None:
+        result = _astar(weighted_succ, start, end, heuristic)
+    elif weight is None:
+        result = _bidirectional_bfs(succ, pred, start, end)
+    else:
+        result = _bidirectional_dijkstra(succ, pred, start, end)
+    if result is None:
+        raise EasyGraphError("No path between {} and {}.".format(
+            source, target))
+    length, path = result
+    if isinstance(G, CSRGraph):
+        path = [node_of[v] for v in path]
+    return length, path
+
+
+def _join_paths(parents_forward, parents_backward, meet):
+    # Walks up the two search trees from the node where they meet
+    path = []
+    v = meet
+    while v is not None:
+        path.append(v)
+        v = parents_forward[v]
+    path.reverse()
+    v = parents_backward[meet]
+    while v is not None:
+        path.append(v)
+        v = parents_backward[v]
+    return path
+
+
+def _bidirectional_bfs(succ, pred, source, target):
+    # Expands one whole level of the smaller frontier at a time
+    if source == target:
+        return 0, [source]
+    parents_forward = {source: None}
+    parents_backward = {target: None}
+    forward, backward = [source], [target]
+    while forward and backward:
+        if len(forward) <= len(backward):
+            this_level, forward = forward, []
+            for v in this_level:
+                for u in succ(v):
+                    if u not in parents_forward:
+                        parents_forward[u] = v
+                        forward.append(u)
+                    if u in parents_backward:
+                        path = _join_paths(parents_forward, parents_backward,
+                                           u)
+                        return len(path) - 1, path
+        else:
+            this_level, backward = backward, []
+            for v in this_level:
+                for u in pred(v):
+                    if u not in parents_backward:
+                        parents_backward[u] = v
+                        backward.append(u)
+                    if u in parents_forward:
+                        path = _join_paths(parents_forward, parents_backward,
+                                           u)
+                        return len(path) - 1, path
+    return None
+
+
+def _bidirectional_dijkstra(succ, pred, source, target):
+    # The two searches settle nodes alternately. Once a node is settled by
+    # both, no path shorter than the best one seen can remain.
+    from heapq import heappush, heappop
+    from itertools import count
+    if source == target:
+        return 0, [source]
+    push = heappush
+    pop = heappop
+    neighbors = (succ, pred)
+    dists = ({}, {})
+    seen = ({source: 0}, {target: 0})
+    parents = ({source: None}, {target: None})
+    c = count()
+    fringe = ([(0, next(c), source)], [(0, next(c), target)])
+    best = meet = None
+    direction = 1
+    while fringe[0] and fringe[1]:
+        direction = 1 - direction
+        (d, _, v) = pop(fringe[direction])
+        dist = dists[direction]
+        if v in dist:
+            continue
+        dist[v] = d
+        if v in dists[1 - direction]:
+            return best, _join_paths(parents[0], parents[1], meet)
+        seen_here, seen_there = seen[direction], seen[1 - direction]
+        for u, cost in neighbors[direction](v):
+            vu_dist = d + cost
+            if u in dist:
+                if vu_dist < dist[u]:
+                    raise ValueError('Contradictory paths found:',
+                                     'negative weights?')
+            elif u not in seen_here or vu_dist < seen_here[u]:
+                seen_here[u] = vu_dist
+                parents[direction][u] = v
+                push(fringe[direction], (vu_dist, next(c), u))
+                if u in seen_there:
+                    total = vu_dist + seen_there[u]
+                    if best is None or total < best:
+                        best, meet = total, u
+    return None
+
+
+def _astar(succ, source, target, heuristic):
+    from heapq import heappush, heappop
+    from itertools import count
+    push = heappush
+    pop = heappop
+    c = count()
+    queue = [(heuristic(source, target), next(c), source, 0, None)]
+    # Cost and heuristic of the nodes queued, and parents of the settled ones
+    enqueued = {}
+    explored = {}
+    while queue:
+        _, _, v, dist, parent = pop(queue)
+        if v == target:
+            path = [v]
+            while parent is not None:
+                path.append(parent)
+                parent = explored[parent]
+            path.reverse()
+            return dist, path
+        if v in explored:
+            if explored[v] is None:  # the source
+                continue
+            if enqueued[v][0] < dist:  # a shorter path was queued later
+                continue
+        explored[v] = parent
+        for u, cost in succ(v):
+            if cost < 0:
+                raise ValueError('Contradictory paths found:',
+                                 'negative weights?')
+            u_dist = dist + cost
+            if u in enqueued:
+                u_queued, h = enqueued[u]
+                if u_queued <= u_dist:
+                    continue
+            else:
+                h = heuristic(u, target)
+            enqueued[u] = u_dist, h
+            push(queue, (u_dist + h, next(c), u, u_dist, v))
+    return None
+
+
+def _csr_bfs_levels(csr, sources, target=None):
+    # Level-synchronous BFS: each level is expanded with one vectorized
+    # gather over the CSR arrays. Unreached nodes keep level -1.
+    import numpy as np
+    level_of = np.full(len(csr), -1, dtype=np.int64)
+    frontier = np.unique(np.asarray(sources, dtype=np.int64))
+    level_of[frontier] = 0
+    level = 0
+    while frontier.size:
+        if target is not None and level_of[target] >= 0:
+            break
+        _, targets, _ = csr.frontier_edges(frontier)
+        frontier = np.unique(targets[level_of[targets] < 0])
+        level += 1
+        level_of[frontier] = level
+    return level_of
+
+
+def _csr_single_source_bfs(csr, source, target=None):
+    import numpy as np
+    target = None if target is None else csr.index_of(target)
+    level_of = _csr_bfs_levels(csr, [csr.index_of(source)], target=target)
+    reached = np.flatnonzero(level_of >= 0)
+    reached = reached[np.argsort(level_of[reached], kind="stable")]
+    node_of = csr.nodes
+    return {
+        node_of[i]: level
+        for i, level in zip(reached.tolist(), level_of[reached].tolist())
+    }
+
+
+def _csr_dijkstra_multisource(csr, sources, target=None):
+    # For a CSR snapshot the weights frozen into the snapshot are used.
+    from heapq import heappush, heappop
+    from itertools import count
+    push = heappush
+    pop = heappop
+    indptr, indices, weights = csr.adjacency_lists()
+    node_of = csr.nodes
+    target = None if target is None else csr.index_of(target)
+    dist = {}
+    seen = {}
+    c = count()
+    Q = []
+    for source in sources:
+        source = csr.index_of(source)
+        seen[source] = 0
+        push(Q, (0, next(c), source))
+    while Q:
+        (d, _, v) = pop(Q)
+        if v in dist:
+            continue
+        dist[v] = d
+        if v == target:
+            break
+        for k in range(indptr[v], indptr[v + 1]):
+            u = indices[k]
+            vu_dist = d + weights[k]
+            if u in dist:
+                if vu_dist < dist[u]:
+                    raise ValueError('Contradictory paths found:',
+                                     'negative weights?')
+            elif u not in seen or vu_dist < seen[u]:
+                seen[u] = vu_dist
+                push(Q, (vu_dist, next(c), u))
+    return {node_of[v]: d for v, d in dist.items()}
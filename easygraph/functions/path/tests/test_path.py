@@ -0,0 +1,161 @@
+import pytest
+import easygraph as eg
+
+
+class TestShortestPath:
+
+    def setup_method(self):
+        self.G = eg.Graph()
+        self.G.add_edges([(1, 2), (2, 3), (3, 4), (1, 5), (5, 4), (4, 6)],
+                         edges_attr=[{
+                             "weight": w
+                         } for w in [1, 1, 1, 5, 1, 2]])
+        self.G.add_node(7)
+        self.DG = eg.DiGraph()
+        self.DG.add_edges([(1, 2), (2, 3), (3, 1), (1, 4), (4, 3)],
+                          edges_attr=[{
+                              "weight": w
+                          } for w in [1, 1, 1, 3, 1]])
+        self.grid = eg.Graph()
+        for x in range(6):
+            for y in range(6):
+                if x < 5:
+                    self.grid.add_edge((x, y), (x + 1, y))
+                if y < 5:
+                    self.grid.add_edge((x, y), (x, y + 1))
+
+    @pytest.mark.parametrize("frozen", [False, True])
+    def test_undirected(self, frozen):
+        G = self.G.freeze_csr() if frozen else self.G
+        assert eg.shortest_path(G, 1, 6) == (3, [1, 5, 4, 6])
+        assert eg.shortest_path(G, 1, 6, weight="weight") == (5,
+                                                              [1, 2, 3, 4, 6])
+        assert eg.shortest_path(G, 6, 6) == (0, [6])
+        with pytest.raises(eg.EasyGraphError):
+            eg.shortest_path(G, 1, 7)
+        with pytest.raises(eg.EasyGraphError):
+            eg.shortest_path(G, 1, 8)
+
+    @pytest.mark.parametrize("frozen", [False, True])
+    def test_directed(self, frozen):
+        G = self.DG.freeze_csr() if frozen else self.DG
+        assert eg.shortest_path(G, 1, 3) == (2, [1, 2, 3])
+        assert eg.shortest_path(G, 3, 4, weight="weight") == (4, [3, 1, 4])
+        with pytest.raises(eg.EasyGraphError):
+            eg.shortest_path(G, 4, 5)
+
+    def test_astar(self):
+        manhattan = lambda u, v: abs(u[0] - v[0]) + abs(u[1] - v[1])
+        length, path = eg.shortest_path(self.grid, (0, 0), (5, 3),
+                                        heuristic=manhattan)
+        assert length == 8 and len(path) == 9
+        assert all(manhattan(u, v) == 1 for u, v in zip(path, path[1:]))
+        zero = lambda u, v: 0
+        assert eg.shortest_path(self.G, 1, 6, weight="weight",
+                                heuristic=zero)[0] == 5
+        assert eg.shortest_path(self.DG.freeze_csr(),
+                                3,
+                                4,
+                                weight="weight",
+                                heuristic=zero) == (4, [3, 1, 4])
+
+    def test_matches_dijkstra(self):
+        G = eg.Graph()
+        G.add_edges([(i, (i * 7 + 3) % 40) for i in range(40)] +
+                    [(i, i + 1) for i in range(0, 39, 3)],
+                    edges_attr=[{
+                        "weight": (i % 5) + 1
+                    } for i in range(40 + 13)])
+        for s in G:
+            dist = eg.single_source_dijkstra(G, s)
+            for t in G:
+                if t in dist:
+                    length, path = eg.shortest_path(G, s, t, weight="weight")
+                    assert length == dist[t]
+                    assert sum(G.adj[u][v]["weight"]
+                               for u, v in zip(path, path[1:])) == length
+
+
+class TestDistanceMatrix:
+
+    def setup_method(self):
+        self.G = eg.Graph()
+        self.G.add_edges([(1, 2), (2, 3), (3, 4), (1, 5), (5, 4), (4, 6)],
+                         edges_attr=[{
+                             "weight": w
+                         } for w in [1, 1, 1, 5, 1, 2]])
+        self.G.add_node(7)
+        self.DG = eg.DiGraph()
+        self.DG.add_edges([(1, 2), (2, 3), (3, 1), (1, 4), (4, 3)],
+                          edges_attr=[{
+                              "weight": w
+                          } for w in [1, 1, 1, 3, 1]])
+
+    @pytest.mark.parametrize("method", ["auto", "dijkstra", "floyd-warshall"])
+    def test_methods(self, method):
+        np = pytest.importorskip("numpy")
+        pytest.importorskip("scipy")
+        for G in (self.G, self.DG):
+            dist = eg.distance_matrix(G, method=method)
+            assert dist.dtype == np.float32
+            for i, s in enumerate(G):
+                expected = eg.single_source_dijkstra(G, s)
+                for j, t in enumerate(G):
+                    assert dist[i, j] == expected.get(t, np.inf)
+
+    def test_unweighted_and_memmap(self, tmp_path):
+        np = pytest.importorskip("numpy")
+        pytest.importorskip("scipy")
+        filename = str(tmp_path / "dist.dat")
+        dist = eg.distance_matrix(self.G,
+                                  weight=None,
+                                  dtype=np.float64,
+                                  filename=filename)
+        assert isinstance(dist, np.memmap)
+        assert dist[0].tolist() == [0, 1, 2, 2, 1, 3, np.inf]
+        assert eg.Floyd(self.G)[1] == dict(
+            zip(self.G, [0, 1, 2, 3, 4, 5, float("inf")]))
+        with pytest.raises(eg.EasyGraphError):
+            eg.distance_matrix(self.G, method="johnson")
+
+
+class TestSpanningTree:
+
+    def setup_method(self):
+        self.G = eg.Graph()
+        self.G.add_edges([(1, 2), (2, 3), (3, 4), (4, 1), (1, 3), (5, 6)],
+                         edges_attr=[{
+                             "weight": w
+                         } for w in [4, 2, 5, 1, 3, 7]])
+
+    def test_prim(self):
+        tree = eg.Prim(self.G)
+        assert tree == {1: {4: 1, 3: 3}, 2: {}, 3: {2: 2}, 4: {}, 5: {}, 6: {}}
+
+    def test_kruskal(self):
+        tree = eg.Kruskal(self.G)
+        assert tree == {
+            1: {
+                4: 1,
+                3: 3
+            },
+            2: {
+                3: 2
+            },
+            3: {},
+            4: {},
+            5: {
+                6: 7
+            },
+            6: {}
+        }
+        edges = eg.minimum_spanning_edges(self.G, data=False)
+        assert sorted(map(sorted, edges)) == [[1, 3], [1, 4], [2, 3], [5, 6]]
+
+    def test_index_union_find(self):
+        from easygraph.functions.not_sorted.mst import IndexUnionFind
+        sets = IndexUnionFind(5)
+        assert sets.union(0, 1) and sets.union(2, 3) and sets.union(1, 3)
+        assert not sets.union(0, 2)
+        assert sets.find(0) == sets.find(3) != sets.find(4)
+        assert len(sets) == 5
@@ -74,17 +74,9 @@ def load_adj_matrix(G):
     -------
     A : A sparse matrix A
     '''
-    listE = []
-    for edge in G.edges:
-        listE.append(edge[0] - 1)
-        listE.append(edge[1] - 1)
-    adj_tuples = np.array(listE).reshape(-1, 2)
-    n = len(np.unique(adj_tuples))
-    vals = np.array([1] * len(G.edges))
-    max_id = max(max(adj_tuples[:, 0]), max(adj_tuples[:, 1])) + 1
-    A = sps.csr_matrix((vals, (adj_tuples[:, 0], adj_tuples[:, 1])),
-                       shape=(max_id, max_id))
-    A = A + A.T
+    A = to_scipy_sparse_array(G,
+                              nodelist=range(1, len(G) + 1),
+                              weight=None)
     return sps.csr_matrix(A)
 
 
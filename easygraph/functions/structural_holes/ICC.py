@@ -4,31 +4,59 @@ from easygraph.utils import *
 __all__ = ["ICC", "BICC", "AP_BICC"]
 
 
-def inverse_closeness_centrality(G, v):
-    c_v = sum(eg.Dijkstra(G, v).values()) / (len(G) - 1)
+def inverse_closeness_centrality(G, v, dist=None):
+    # dist: distances from v, e.g. a row of eg.distance_matrix(G)
+    if dist is None:
+        dist = eg.Dijkstra(G, v)
+    c_v = sum(d for d in dist.values() if d != float("inf")) / (len(G) - 1)
     return c_v
 
 
-def bounded_inverse_closeness_centrality(G, v, l):
+def bounded_inverse_closeness_centrality(G, v, l, dist=None):
     queue = []
     queue.append(v)
     seen = set()
     seen.add(v)
-    shortest_path = eg.Floyd(G)
+    if dist is None:
+        dist = eg.Dijkstra(G, v)
     result = 0
     while (len(queue) > 0):
         vertex = queue.pop(0)
-        if shortest_path[v][vertex] == l + 1:
+        if dist[vertex] == l + 1:
             break
         nodes = G.neighbors(node=vertex)
         for w in nodes:
             if w not in seen:
                 queue.append(w)
                 seen.add(w)
-                result += shortest_path[v][w]
+                result += dist[w]
     return result / (len(G) - 1)
 
 
+class _DistanceRow:
+    # The distances from one node, a row of the distance matrix read by node
+    __slots__ = ("row", "index")
+
+    def __init__(self, row, index):
+        self.row = row
+        self.index = index
+
+    def __getitem__(self, v):
+        return self.row[self.index[v]]
+
+    def values(self):
+        return self.row.tolist()
+
+
+def _distance_rows(G):
+    # Distances from every node, from one all-pairs computation kept as a
+    # matrix, with the row of a node found through its index
+    import numpy as np
+    index = {v: i for i, v in enumerate(G)}
+    dist = eg.distance_matrix(G, dtype=np.float64)
+    return {v: _DistanceRow(dist[i], index) for v, i in index.items()}
+
+
 def Modified_DFS(G, u, V, time, n):
     V[u]['color'] = 'black'
     time += 1
@@ -107,10 +135,13 @@ def ICC(G, k):
     .. [1] https://dl.acm.org/doi/10.1145/2806416.2806431
     
     """
+    import numpy as np
     Q = []
     V = []
-    for v in G.nodes:
-        i_c = inverse_closeness_centrality(G, v)
+    dist = eg.distance_matrix(G, dtype=np.float64)
+    dist[np.isinf(dist)] = 0
+    i_cs = dist.sum(axis=1, dtype=np.float64) / (len(G) - 1)
+    for v, i_c in zip(G.nodes, i_cs.tolist()):
         if len(Q) < k:
             Q.append([v, i_c])
             continue
@@ -167,8 +198,9 @@ def BICC(G, k, K, l):
     """
     H = []
     V = []
+    dist = _distance_rows(G)
     for v in G.nodes:
-        b_i_c = bounded_inverse_closeness_centrality(G, v, l)
+        b_i_c = bounded_inverse_closeness_centrality(G, v, l, dist=dist[v])
         if len(H) < K:
             H.append([v, b_i_c])
             continue
@@ -183,7 +215,7 @@ def BICC(G, k, K, l):
             H.append([v, b_i_c])
     for i in H:
         v = i[0]
-        i_c = inverse_closeness_centrality(G, v)
+        i_c = inverse_closeness_centrality(G, v, dist=dist[v])
         if len(V) < k:
             V.append([v, i_c])
             continue
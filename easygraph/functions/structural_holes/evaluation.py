@@ -1,6 +1,10 @@
 import sys
 import math
+from functools import partial
+
+from easygraph.classes.csr_graph import CSRGraph
 from easygraph.utils import *
+from easygraph.functions.not_sorted.cluster import _triangles
 
 try:
     from cpp_easygraph import cpp_constraint
@@ -9,7 +13,9 @@ try:
 except ImportError:
     pass
 
-__all__ = ['effective_size', 'efficiency', 'constraint', 'hierarchy']
+__all__ = [
+    'effective_size', 'efficiency', 'constraint', 'hierarchy', 'BurtContext'
+]
 
 
 def mutual_weight(G, u, v, weight=None):
@@ -24,72 +30,317 @@ def mutual_weight(G, u, v, weight=None):
     return a_uv + a_vu
 
 
-sum_nmw_rec = {}
-max_nmw_rec = {}
+def normalized_mutual_weight(G, u, v, norm=sum, weight=None):
+    scale = norm(
+        mutual_weight(G, u, w, weight) for w in set(G.all_neighbors(u)))
+    return 0 if scale == 0 else mutual_weight(G, u, v, weight) / scale
 
 
-def normalized_mutual_weight(G, u, v, norm=sum, weight=None):
-    if norm == sum:
-        try:
-            # res = sum_nmw_rec[(u, v)]
-            # print('yes')
-            return sum_nmw_rec[(u, v)]
-        except KeyError:
-            scale = norm(
-                mutual_weight(G, u, w, weight) for w in G.all_neighbors(u))
-            nmw = 0 if scale == 0 else mutual_weight(G, u, v, weight) / scale
-            sum_nmw_rec[(u, v)] = nmw
-            return nmw
-    elif norm == max:
-        try:
-            return max_nmw_rec[(u, v)]
-        except KeyError:
-            scale = norm(
-                mutual_weight(G, u, w, weight) for w in G.all_neighbors(u))
-            nmw = 0 if scale == 0 else mutual_weight(G, u, v, weight) / scale
-            max_nmw_rec[(u, v)] = nmw
-            return nmw
-
-
-def effective_size_parallel(nodes, G, weight):
-    ret = []
-    for node in nodes:
-        neighbors_of_node = set(G.all_neighbors(node))
-        if len(neighbors_of_node) == 0:
-            ret.append([node, float('nan')])
-            continue
-        ret.append([
-            node,
-            sum(redundancy(G, node, u, weight) for u in neighbors_of_node)
-        ])
-    return ret
+def local_constraint(G, u, v, weight=None):
+    nmw = normalized_mutual_weight
+    direct = nmw(G, u, v, weight=weight)
+    indirect = sum(
+        nmw(G, u, w, weight=weight) * nmw(G, w, v, weight=weight)
+        for w in set(G.all_neighbors(u)))
+    return (direct + indirect)**2
 
 
-def effective_size_borgatti_parallel(nodes, G, weight):
+class BurtContext:
+    """
+    Normalized mutual weights of a graph, shared by Burt's metrics.
+
+    The mutual weight of two adjacent nodes is the sum of the weights of the
+    edges between them, in both directions. It is stored in a CSR snapshot
+    of the graph, where the neighbors of a node are its predecessors and
+    successors, together with its normalizations by the sum and by the
+    maximum of the mutual weights around the node, as arrays aligned with
+    the snapshot.
+
+    `effective_size`, `efficiency`, `constraint` and `hierarchy` accept the
+    context in place of building their own, and it keeps the values they
+    compute for all the nodes, so that computing several of them, or the
+    same one again, on an unchanged graph only pays the setup once.
+
+    Parameters
+    ----------
+    G : easygraph.Graph or easygraph.DiGraph
+        The graph. Later changes of *G* are not reflected in the context.
+
+    weight : string or None, optional (default : None)
+        The key for edge weight. If *None*, `G` will be regarded as unweighted graph.
+
+    Attributes
+    ----------
+    csr : easygraph.CSRGraph
+        The snapshot, with the mutual weights as weights.
+
+    sum_nmw, max_nmw : numpy.ndarray
+        The mutual weights normalized around the source node, by their sum
+        and by their maximum, aligned with ``csr.indices``.
+
+    Examples
+    --------
+    >>> context = eg.BurtContext(G, weight='weight')
+    >>> constraint = eg.constraint(G, context=context)
+    >>> hierarchy = eg.hierarchy(G, context=context)
+
+    """
+
+    def __init__(self, G, weight=None):
+        import numpy as np
+        import scipy.sparse as sp
+
+        csr = CSRGraph.from_graph(G, weight=weight)
+        n = len(csr)
+        sources = np.repeat(np.arange(n), np.diff(csr.indptr))
+        # The transposed edges are added to the edges, and the duplicates
+        # summed without dropping the edges of weight zero
+        A = sp.coo_matrix(
+            (np.concatenate([csr.weights, csr.weights]),
+             (np.concatenate([sources, csr.indices
+                              ]), np.concatenate([csr.indices, sources]))),
+            shape=(n, n)).tocsr()
+        A.sum_duplicates()
+        self.csr = CSRGraph(A.indptr,
+                            A.indices,
+                            A.data,
+                            node_list=csr.nodes,
+                            weight=weight)
+        self.weight = weight
+        self.sum_nmw, self.max_nmw = _normalized_mutual_weights(self.csr)
+        self._values = {}
+
+    def local_constraint(self, u, v):
+        """Returns the local constraint of *u* from its neighbor *v*."""
+        csr = self.csr
+        i, j = csr.index_of(u), csr.index_of(v)
+        return _local_constraints(csr, self.sum_nmw, [i])[_entry(csr, i, j)]
+
+    def _get(self, name, nodes, n_workers):
+        """Returns the values of the metric *name* of *nodes* as a dict.
+
+        The values of all the nodes are kept, those of some of them are only
+        computed for them unless all the values are known already.
+        """
+        import numpy as np
+
+        csr = self.csr
+        if nodes is None:
+            if name not in self._values:
+                rows = np.arange(len(csr))
+                self._values.update(self._compute(name, rows, n_workers))
+            return dict(zip(csr.nodes, self._values[name].tolist()))
+        nodes = list(nodes)
+        rows = np.array([csr.index_of(v) for v in nodes], dtype=np.int64)
+        if name in self._values:
+            values = self._values[name][rows]
+        else:
+            values = self._compute(name, rows, n_workers)[name]
+        return dict(zip(nodes, values.tolist()))
+
+    def _compute(self, name, rows, n_workers):
+        import numpy as np
+
+        if name == "effective_size":
+            kernel = _effective_size_kernel
+        else:
+            kernel = _constraint_kernel
+        if n_workers is None:
+            chunks = [
+                kernel(self.csr, rows, tables=(self.sum_nmw, self.max_nmw))
+            ]
+        else:
+            chunks = self.csr.map_sources(kernel, rows.tolist(), n_workers)
+        values = {}
+        position = np.empty(len(self.csr), dtype=np.int64)
+        position[rows] = np.arange(len(rows))
+        for chunk_rows, chunk_values in chunks:
+            for key, array in chunk_values.items():
+                if key not in values:
+                    values[key] = np.empty(len(rows))
+                values[key][position[chunk_rows]] = array
+        return values
+
+
+def _burt_context(G, weight, context):
+    if context is None:
+        return BurtContext(G, weight)
+    if weight is not None and weight != context.weight:
+        raise EasyGraphError(
+            "The context was built with weight {!r}, not {!r}.".format(
+                context.weight, weight))
+    return context
+
+
+def _normalized_mutual_weights(csr):
+    import numpy as np
+
+    n = len(csr)
+    sources = np.repeat(np.arange(n), np.diff(csr.indptr))
+    weights = csr.weights
+    sum_scale = np.bincount(sources, weights=weights, minlength=n)
+    max_scale = np.full(n, -np.inf)
+    np.maximum.at(max_scale, sources, weights)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sum_nmw = np.where(sum_scale[sources] != 0,
+                           weights / sum_scale[sources], 0)
+        max_nmw = np.where(max_scale[sources] != 0,
+                           weights / max_scale[sources], 0)
+    return sum_nmw, max_nmw
+
+
+def _entry(csr, i, j):
+    """Returns the position of the edge (i, j) among the edges of row i."""
+    import numpy as np
+
+    row = csr.indices[csr.indptr[i]:csr.indptr[i + 1]]
+    k = int(np.searchsorted(row, j))
+    if k == len(row) or row[k] != j:
+        raise EasyGraphError("No edge {}-{} in graph.".format(
+            csr.node_of(i), csr.node_of(j)))
+    return k
+
+
+def _row_entries(indptr, rows):
+    """Returns the positions of the edges of *rows*, row after row, and the
+    position in *rows* of the row of each of them."""
+    import numpy as np
+
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    owners = np.repeat(np.arange(len(rows)), lengths)
+    offsets = np.cumsum(lengths) - lengths
+    entries = np.arange(int(lengths.sum())) - offsets[owners] + starts[owners]
+    return entries, owners
+
+
+# Bound on the number of paths of length two expanded at once
+_BLOCK_PATHS = 1 << 21
+
+
+def _masked_product(X, Y, csr, rows):
+    """Returns the entries of X @ Y at the edges of *rows*, row after row.
+
+    X and Y have the structure of *csr*, so the product only has paths of
+    length two, which are expanded for blocks of rows at a time.
+    """
+    import numpy as np
+
+    n = len(csr)
+    indptr, indices = csr.indptr, csr.indices
+    degree = np.diff(indptr)
+    entries, owners = _row_entries(indptr, rows)
+    paths = np.bincount(owners,
+                        weights=degree[indices[entries]],
+                        minlength=len(rows))
+    bounds = np.searchsorted(np.cumsum(paths),
+                             np.arange(_BLOCK_PATHS, paths.sum(),
+                                       _BLOCK_PATHS))
+    result = np.zeros(len(entries))
+    first = np.cumsum(degree[rows]) - degree[rows]
+    for block in np.split(np.arange(len(rows)), np.unique(bounds)):
+        if len(block) == 0:
+            continue
+        Q = X[rows[block]] @ Y
+        Q.sum_duplicates()
+        begin = first[block[0]]
+        end = first[block[-1]] + degree[rows[block[-1]]]
+        mask_keys = ((owners[begin:end] - block[0]) * n +
+                     indices[entries[begin:end]])
+        keys = (np.repeat(np.arange(len(block)), np.diff(Q.indptr)) * n +
+                Q.indices)
+        k = np.minimum(np.searchsorted(keys, mask_keys), max(len(keys) - 1, 0))
+        if len(keys):
+            found = keys[k] == mask_keys
+            result[begin:end][found] = Q.data[k[found]]
+    return result
+
+
+def _matrix(csr, data):
+    import scipy.sparse as sp
+
+    n = len(csr)
+    return sp.csr_matrix((data, csr.indices, csr.indptr), shape=(n, n))
+
+
+def _local_constraints(csr, sum_nmw, rows):
+    """Returns the local constraints of the nodes of *rows* on each of
+    their neighbors, row after row."""
+    import numpy as np
+
+    rows = np.asarray(rows, dtype=np.int64)
+    P = _matrix(csr, sum_nmw)
+    entries, _ = _row_entries(csr.indptr, rows)
+    return (sum_nmw[entries] + _masked_product(P, P, csr, rows))**2
+
+
+def _constraint_kernel(csr, rows, tables=None):
+    import numpy as np
+
+    rows = np.asarray(rows, dtype=np.int64)
+    sum_nmw, _ = tables or _normalized_mutual_weights(csr)
+    c = _local_constraints(csr, sum_nmw, rows)
+    entries, owners = _row_entries(csr.indptr, rows)
+    degree = np.diff(csr.indptr)[rows]
+    C = np.bincount(owners, weights=c, minlength=len(rows))
+    constraint = np.where(degree > 0, C, np.nan)
+
+    # n is the number of neighbors other than the node itself
+    n = degree - np.bincount(owners,
+                             weights=csr.indices[entries] == rows[owners],
+                             minlength=len(rows))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = c / C[owners] * n[owners]
+        terms = np.where(ratio > 0, ratio * np.log(ratio), 0)
+        hierarchy = np.bincount(owners, weights=terms,
+                                minlength=len(rows)) / (n * np.log(n))
+    hierarchy[n <= 1] = 0
+    return rows, {"constraint": constraint, "hierarchy": hierarchy}
+
+
+def _effective_size_kernel(csr, rows, tables=None):
+    import numpy as np
+
+    rows = np.asarray(rows, dtype=np.int64)
+    sum_nmw, max_nmw = tables or _normalized_mutual_weights(csr)
+    # The redundancy of a node with its neighbors adds up, over the
+    # neighbors w of the node, nmw(node, w) * sum(nmw(u, w, norm=max)) for
+    # the neighbors u of the node
+    S = _matrix(csr, np.ones(len(csr.indices)))
+    M = _matrix(csr, max_nmw)
+    entries, owners = _row_entries(csr.indptr, rows)
+    redundancy = np.bincount(owners,
+                             weights=sum_nmw[entries] *
+                             _masked_product(S, M, csr, rows),
+                             minlength=len(rows))
+    degree = np.diff(csr.indptr)[rows]
+    effective_size = np.where(degree > 0, degree - redundancy, np.nan)
+    return rows, {"effective_size": effective_size}
+
+
+def effective_size_borgatti(G, nodes):
+    """Borgatti's simplified effective size n - 2t/n of unweighted
+    undirected graphs, with n the number of neighbors of a node other than
+    itself and t the number of edges between them.
+    """
+    adj = G.adj
     ret = []
-    for node in nodes:
+    for node, t in _triangles(G, nodes).items():
         # Effective size is not defined for isolated nodes
-        if len(G[node]) == 0:
+        if len(adj[node]) == 0:
             ret.append([node, float('nan')])
             continue
-        E = G.ego_subgraph(node)
-        if len(E) > 1:
-            ret.append([node, len(E) - 1 - (2 * E.size()) / (len(E) - 1)])
-        else:
-            ret.append([node, 0])
+        n = len(adj[node]) - (node in adj[node])
+        ret.append([node, n - 2 * t / n if n else 0])
     return ret
 
 
-def redundancy(G, u, v, weight=None):
-    nmw = normalized_mutual_weight
-    r = sum(
-        nmw(G, u, w, weight=weight) * nmw(G, v, w, norm=max, weight=weight)
-        for w in set(G.all_neighbors(u)))
-    return 1 - r
+def effective_size_borgatti_parallel(nodes, G, weight):
+    return effective_size_borgatti(G, nodes)
 
 
 @not_implemented_for("multigraph")
-def effective_size(G, nodes=None, weight=None, n_workers=None):
+def effective_size(G, nodes=None, weight=None, n_workers=None, context=None):
     """Burt's metric - Effective Size.
 
     Parameters
@@ -102,6 +353,10 @@ def effective_size(G, nodes=None, weight=None, n_workers=None):
     weight : string or None, optional (default : None)
         The key for edge weight. If *None*, `G` will be regarded as unweighted graph.
 
+    context : BurtContext or None, optional (default : None)
+        The normalized mutual weights of `G`, shared with the other metrics.
+        Its weight is used if *weight* is None.
+
     Returns
     -------
     effective_size : dict
@@ -122,22 +377,21 @@ def effective_size(G, nodes=None, weight=None, n_workers=None):
 
     """
     if G.cflag == 1:
-        return cpp_effective_size(G, nodes=nodes, weight=weight)
-    sum_nmw_rec.clear()
-    max_nmw_rec.clear()
-    effective_size = {}
-    if nodes is None:
-        nodes = G
+        return cpp_effective_size(G,
+                                  nodes=nodes,
+                                  weight=weight,
+                                  n_workers=n_workers)
+    if context is not None and weight is None:
+        weight = context.weight
     # Use Borgatti's simplified formula for unweighted and undirected graphs
     if not G.is_directed() and weight is None:
         if n_workers is not None:
             from multiprocessing import Pool
-            from functools import partial
             import random
             local_function = partial(effective_size_borgatti_parallel,
                                      G=G,
                                      weight=weight)
-            nodes = list(nodes)
+            nodes = list(G if nodes is None else nodes)
             random.shuffle(nodes)
             if len(nodes) > n_workers * 50000:
                 nodes = split_len(nodes, step=50000)
@@ -146,52 +400,15 @@ def effective_size(G, nodes=None, weight=None, n_workers=None):
             with Pool(n_workers) as p:
                 ret = p.imap(local_function, nodes)
                 res = [x for i in ret for x in i]
-            effective_size = dict(res)
-        else:
-            for v in nodes:
-                # Effective size is not defined for isolated nodes
-                if len(G[v]) == 0:
-                    effective_size[v] = float('nan')
-                    continue
-                E = G.ego_subgraph(v)
-                if len(E) > 1:
-                    effective_size[v] = len(E) - 1 - (2 * E.size()) / (len(E) -
-                                                                       1)
-                else:
-                    effective_size[v] = 0
-    else:
-
-        if n_workers is not None:
-            from multiprocessing import Pool
-            from functools import partial
-            import random
-            local_function = partial(effective_size_parallel,
-                                     G=G,
-                                     weight=weight)
-            nodes = list(nodes)
-            random.shuffle(nodes)
-            if len(nodes) > n_workers * 30000:
-                nodes = split_len(nodes, step=30000)
-            else:
-                nodes = split(nodes, n_workers)
-            with Pool(n_workers) as p:
-                ret = p.imap(local_function, nodes)
-                res = [x for i in ret for x in i]
-            effective_size = dict(res)
-        else:
-            for v in nodes:
-                # Effective size is not defined for isolated nodes
-                if len(G[v]) == 0:
-                    effective_size[v] = float('nan')
-                    continue
-                effective_size[v] = sum(
-                    redundancy(G, v, u, weight)
-                    for u in set(G.all_neighbors(v)))
-    return effective_size
+            return dict(res)
+        # All the triangles are counted in one pass if nodes is None
+        return dict(effective_size_borgatti(G, nodes))
+    context = _burt_context(G, weight, context)
+    return context._get("effective_size", nodes, n_workers)
 
 
 @not_implemented_for("multigraph")
-def efficiency(G, nodes=None, weight=None):
+def efficiency(G, nodes=None, weight=None, context=None):
     """Burt's metric - Efficiency.
 
     Parameters
@@ -204,6 +421,10 @@ def efficiency(G, nodes=None, weight=None):
     weight : string or None, optional (default : None)
         The key for edge weight. If *None*, `G` will be regarded as unweighted graph.
 
+    context : BurtContext or None, optional (default : None)
+        The normalized mutual weights of `G`, shared with the other metrics.
+        Its weight is used if *weight* is None.
+
     Returns
     -------
     efficiency : dict
@@ -226,30 +447,19 @@ def efficiency(G, nodes=None, weight=None):
     if G.cflag == 1:
         e_size = cpp_effective_size(G, nodes=nodes, weight=weight)
     else:
-        e_size = effective_size(G, nodes=nodes, weight=weight)
+        if context is not None and weight is None:
+            weight = context.weight
+        e_size = effective_size(G,
+                                nodes=nodes,
+                                weight=weight,
+                                context=context)
     degree = G.degree(weight=weight)
     efficiency = {n: v / degree[n] for n, v in e_size.items()}
     return efficiency
 
 
-def compute_constraint_of_nodes(nodes, G, weight):
-    ret = []
-    for node in nodes:
-        neighbors_of_node = set(G.all_neighbors(node))
-        if len(neighbors_of_node) == 0:
-            ret.append([node, float('nan')])
-            continue
-        ret.append([
-            node,
-            sum(
-                local_constraint(G, node, u, weight)
-                for u in neighbors_of_node)
-        ])
-    return ret
-
-
 @not_implemented_for("multigraph")
-def constraint(G, nodes=None, weight=None, n_workers=None):
+def constraint(G, nodes=None, weight=None, n_workers=None, context=None):
     """Burt's metric - Constraint.
 
     Parameters
@@ -266,6 +476,10 @@ def constraint(G, nodes=None, weight=None, n_workers=None):
         The number of workers calculating (default: None). 
         None if not using only one worker.
 
+    context : BurtContext or None, optional (default : None)
+        The normalized mutual weights of `G`, shared with the other metrics.
+        Its weight is used if *weight* is None.
+
     Returns
     -------
     constraint : dict
@@ -291,90 +505,12 @@ def constraint(G, nodes=None, weight=None, n_workers=None):
                               nodes=nodes,
                               weight=weight,
                               n_workers=n_workers)
-    sum_nmw_rec.clear()
-    max_nmw_rec.clear()
-    local_constraint_rec.clear()
-    if nodes is None:
-        nodes = G.nodes
-    constraint = {}
-
-    def compute_constraint_of_v(v):
-        neighbors_of_v = set(G.all_neighbors(v))
-        if len(neighbors_of_v) == 0:
-            constraint_of_v = float('nan')
-        else:
-            constraint_of_v = sum(
-                local_constraint(G, v, n, weight) for n in neighbors_of_v)
-        return v, constraint_of_v
-
-    if n_workers is not None:
-        from multiprocessing import Pool
-        from functools import partial
-        import random
-        local_function = partial(compute_constraint_of_nodes,
-                                 G=G,
-                                 weight=weight)
-        nodes = list(nodes)
-        random.shuffle(nodes)
-        if len(nodes) > n_workers * 30000:
-            nodes = split_len(nodes, step=30000)
-        else:
-            nodes = split(nodes, n_workers)
-        with Pool(n_workers) as p:
-            ret = p.imap(local_function, nodes)
-            constraint_results = [x for i in ret for x in i]
-    else:
-        constraint_results = []
-        for v in nodes:
-            constraint_results.append(compute_constraint_of_v(v))
-
-    constraint = dict(constraint_results)
-    return constraint
-
-
-local_constraint_rec = {}
-
-
-def local_constraint(G, u, v, weight=None):
-    try:
-        return local_constraint_rec[(u, v)]
-    except KeyError:
-        nmw = normalized_mutual_weight
-        direct = nmw(G, u, v, weight=weight)
-        indirect = sum(
-            nmw(G, u, w, weight=weight) * nmw(G, w, v, weight=weight)
-            for w in set(G.all_neighbors(u)))
-        result = (direct + indirect)**2
-        local_constraint_rec[(u, v)] = result
-        return result
-
-
-def hierarchy_parallel(nodes, G):
-
-    ret = []
-    for v in nodes:
-        E = G.ego_subgraph(v)
-        n = len(E) - 1
-        C = 0
-        c = {}
-        neighbors_of_v = set(G.all_neighbors(v))
-        for w in neighbors_of_v:
-            C += local_constraint(G, v, w)
-            c[w] = local_constraint(G, v, w)
-        if n > 1:
-            ret.append([
-                v,
-                sum(c[w] / C * n * math.log(c[w] / C * n) / (n * math.log(n))
-                    for w in neighbors_of_v)
-            ])
-        else:
-            ret.append([v, 0])
-
-    return ret
+    context = _burt_context(G, weight, context)
+    return context._get("constraint", nodes, n_workers)
 
 
 @not_implemented_for("multigraph")
-def hierarchy(G, nodes=None, weight=None, n_workers=None):
+def hierarchy(G, nodes=None, weight=None, n_workers=None, context=None):
     """Returns the hierarchy of nodes in the graph
 
     Parameters
@@ -382,6 +518,10 @@ def hierarchy(G, nodes=None, weight=None, n_workers=None):
     G : graph
     nodes :  dict, optional (default: None)
     weight : dict, optional (default: None)
+    context : BurtContext, optional (default: None)
+        The normalized mutual weights of G, shared with the other metrics.
+        The hierarchy is computed from its local constraints, which are
+        weighted if it is.
 
     Returns
     -------
@@ -400,41 +540,8 @@ def hierarchy(G, nodes=None, weight=None, n_workers=None):
 
     """
     if G.cflag == 1:
-        return cpp_hierarchy(G, nodes=nodes, weight=weight)
-    sum_nmw_rec.clear()
-    max_nmw_rec.clear()
-    local_constraint_rec.clear()
-    if nodes is None:
-        nodes = G.nodes
-    hierarchy = {}
-    if n_workers is not None:
-        from multiprocessing import Pool
-        from functools import partial
-        import random
-        local_function = partial(hierarchy_parallel, G=G)
-        nodes = list(nodes)
-        random.shuffle(nodes)
-        if len(nodes) > n_workers * 30000:
-            nodes = split_len(nodes, step=30000)
-        else:
-            nodes = split(nodes, n_workers)
-        with Pool(n_workers) as p:
-            ret = p.imap(local_function, nodes)
-            res = [x for i in ret for x in i]
-        hierarchy = dict(res)
-    else:
-        for v in G.nodes:
-            E = G.ego_subgraph(v)
-            n = len(E) - 1
-            C = 0
-            c = {}
-            neighbors_of_v = set(G.all_neighbors(v))
-            for w in neighbors_of_v:
-                C += local_constraint(G, v, w)
-                c[w] = local_constraint(G, v, w)
-            if n > 1:
-                hierarchy[v] = sum(c[w] / C * n * math.log(c[w] / C * n) /
-                                   (n * math.log(n)) for w in neighbors_of_v)
-            if v not in hierarchy:
-                hierarchy[v] = 0
-    return hierarchy
+        return cpp_hierarchy(G, nodes=nodes, weight=weight, n_workers=n_workers)
+    # The local constraints are unweighted without a context
+    if context is None:
+        context = BurtContext(G)
+    return context._get("hierarchy", nodes, n_workers)
@@ -0,0 +1,28 @@
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+import easygraph as eg
+from easygraph.functions.structural_holes.ICC import _distance_rows
+
+
+class TestICC:
+    def setup_method(self):
+        # path sums like 0.1 + 0.2 are not exact in float32
+        self.G = eg.Graph()
+        self.G.add_edges([(0, 1), (1, 2), (2, 3), (3, 0), (1, 4)],
+                         edges_attr=[{
+                             "weight": w
+                         } for w in [0.1, 0.2, 0.7, 0.3, 0.05]])
+
+    def test_distance_rows(self):
+        dist = _distance_rows(self.G)
+        for v in self.G:
+            expected = eg.Dijkstra(self.G, v)
+            assert {u: dist[v][u] for u in self.G} == expected
+            assert dist[v].values() == [expected[u] for u in self.G]
+
+    def test_top_nodes(self):
+        assert len(eg.ICC(self.G, k=2)) == 2
+        assert len(eg.BICC(self.G, k=2, K=3, l=2)) == 2
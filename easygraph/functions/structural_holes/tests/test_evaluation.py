@@ -0,0 +1,73 @@
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("scipy")
+
+import easygraph as eg
+
+
+class TestBurtMetrics:
+    def setup_method(self):
+        self.G = eg.Graph()
+        self.G.add_edges([(1, 2), (2, 3), (3, 1), (3, 4), (4, 5)],
+                         edges_attr=[{"weight": w} for w in [1, 2, 1, 3, 1]])
+        self.G.add_node(6)
+
+    def test_constraint(self):
+        constraint = eg.constraint(self.G)
+        expected = {1: 1.00694, 2: 1.00694, 3: 0.61111, 4: 0.5, 5: 1.0}
+        for v, c in expected.items():
+            assert constraint[v] == pytest.approx(c, abs=1e-5)
+        assert math.isnan(constraint[6])
+        assert eg.constraint(self.G, nodes=[4]) == {4: constraint[4]}
+
+    def test_hierarchy(self):
+        hierarchy = eg.hierarchy(self.G, nodes=[1, 3, 4, 6])
+        assert hierarchy[1] == pytest.approx(0.009938, abs=1e-6)
+        assert hierarchy[3] == pytest.approx(0.052205, abs=1e-6)
+        assert hierarchy[4] == 0
+        assert hierarchy[6] == 0
+
+    def test_context(self):
+        context = eg.BurtContext(self.G, weight="weight")
+        constraint = eg.constraint(self.G, weight="weight")
+        assert eg.constraint(self.G, context=context) == pytest.approx(
+            constraint, nan_ok=True)
+        assert eg.constraint(self.G, nodes=[3], context=context) == {
+            3: constraint[3]
+        }
+        # the mutual weights are normalized by their maximum for the
+        # redundancy
+        assert eg.effective_size(self.G, weight="weight",
+                                 context=context)[3] == pytest.approx(3 - 5 / 12)
+        assert eg.efficiency(self.G, nodes=[4], context=context) == {
+            4: pytest.approx(2 / 4)
+        }
+        assert context.local_constraint(4, 5) == pytest.approx(1 / 16)
+        with pytest.raises(eg.EasyGraphError):
+            eg.constraint(self.G, weight="cost", context=context)
+
+    def test_directed(self):
+        # reciprocal neighbors are counted once
+        G = eg.DiGraph([(1, 2), (2, 1), (1, 3)])
+        constraint = eg.constraint(G)
+        assert constraint[1] == pytest.approx((2 / 3)**2 + (1 / 3)**2)
+        assert constraint[3] == pytest.approx(1)
+        assert eg.effective_size(G)[1] == pytest.approx(2)
+
+    @pytest.mark.parametrize("directed", [False, True])
+    @pytest.mark.parametrize("weight", [None, "weight"])
+    @pytest.mark.parametrize(
+        "metric", [eg.constraint, eg.effective_size, eg.hierarchy])
+    def test_workers(self, metric, weight, directed):
+        G = eg.DiGraph() if directed else eg.Graph()
+        G.add_edges([(1, 2), (2, 3), (3, 1), (3, 4), (4, 5), (5, 3), (2, 6)],
+                    edges_attr=[{
+                        "weight": w
+                    } for w in [1, 2, 1, 3, 1, 2, 4]])
+        G.add_node(7)
+        expected = metric(G, weight=weight)
+        assert metric(G, weight=weight, n_workers=2) == pytest.approx(
+            expected, nan_ok=True)
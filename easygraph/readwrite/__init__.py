@@ -5,4 +5,5 @@ from easygraph.readwrite.ucinet import *
 from easygraph.readwrite.edgelist import *
 from easygraph.readwrite.graphviz import *
 from easygraph.readwrite.pajek import *
-from easygraph.readwrite.pickle import *
\ No newline at end of file
+from easygraph.readwrite.pickle import *
+from easygraph.readwrite.binary import *
\ No newline at end of file
@@ -0,0 +1,438 @@
+"""
+Read and write graphs in the EasyGraph binary format.
+
+The format stores the CSR snapshot of a graph (see `CSRGraph`) as raw
+little-endian arrays, so that reading a graph needs no parsing: the arrays
+are mapped into memory with `numpy.memmap` and traversal algorithms run on
+them directly.
+
+A file is laid out as follows:
+
+- the 8 bytes magic string ``EGBINARY``,
+- the length of the header, as a little-endian unsigned 64-bit integer,
+- the header, a UTF-8 encoded JSON object describing the graph and the
+  dtype, shape and offset of every array,
+- the arrays, each starting at a multiple of 64 bytes from the beginning
+  of the file.
+
+The arrays are the node-id table, the CSR offsets and targets, and one
+column per node attribute and per edge attribute. Edge attribute columns
+are aligned with the CSR targets, so each undirected edge has its
+attributes stored for both directions. Attributes of type bool, int, float
+and str are stored as typed columns, other values are pickled. So are the
+node ids that are not all int or all str, and the graph attributes that do
+not round-trip through JSON, e.g. tuples. Pickled data can run code when
+read, so `read_binary` only loads it with ``allow_pickle=True``.
+"""
+import json
+import pickle
+
+from itertools import chain
+
+from easygraph.classes.csr_graph import CSRGraph
+from easygraph.utils.exception import EasyGraphError
+
+__all__ = ["read_binary", "write_binary"]
+
+MAGIC = b"EGBINARY"
+VERSION = 1
+ALIGNMENT = 64
+
+
+def write_binary(G, path):
+    """Write G in the EasyGraph binary format.
+
+    Parameters
+    ----------
+    G : graph
+        A easygraph Graph or DiGraph, or a CSR snapshot returned by
+        `G.freeze_csr()`, in which case its weights and the columns in its
+        `edge_attrs` and `node_attrs` are written.
+
+    path : string or path-like
+        File name to write.
+
+    See Also
+    --------
+    read_binary
+
+    Examples
+    --------
+    >>> G = eg.path_graph(4)
+    >>> eg.write_binary(G, "test.egb")
+
+    """
+    import numpy as np
+    csr = CSRGraph.from_graph(G, weight=None)
+    n = len(csr)
+    arrays = []
+    header = {
+        "version": VERSION,
+        "directed": csr.is_directed(),
+        "number_of_nodes": n,
+        "number_of_edges": int(csr.indptr[-1]),
+    }
+    graph = dict(csr.graph)
+    try:
+        header["graph"] = json.loads(json.dumps(graph))
+    except (TypeError, ValueError):
+        header["graph"] = None
+    # JSON turns tuples into lists and keys into strings, such graph
+    # attributes are pickled instead
+    if header["graph"] != graph:
+        header["graph"] = None
+        header["graph_pickle"] = _add_pickle(arrays, "graph", graph)
+    header["nodes"] = _add_nodes(arrays, csr.nodes)
+    header["indptr"] = _add_array(arrays, "indptr", csr.indptr, "<i8")
+    header["indices"] = _add_array(arrays, "indices", csr.indices,
+                                   csr.indices.dtype.newbyteorder("<"))
+
+    if isinstance(G, CSRGraph):
+        node_columns = dict(G.node_attrs)
+        edge_columns = dict(G.edge_attrs)
+        if G.weight is not None and G.weight not in edge_columns:
+            edge_columns[G.weight] = G.weights
+    else:
+        node_columns = _attribute_columns(G.nodes[u] for u in csr.nodes)
+        edge_columns = _attribute_columns(d for u in csr.nodes
+                                          for d in G.adj[u].values())
+    header["node_attrs"] = [
+        _add_column(arrays, "node_attr", key, values)
+        for key, values in node_columns.items()
+    ]
+    header["edge_attrs"] = [
+        _add_column(arrays, "edge_attr", key, values)
+        for key, values in edge_columns.items()
+    ]
+
+    # Array offsets are relative to the data section, which starts at the
+    # first aligned position after the header.
+    offset = 0
+    for spec, data in arrays:
+        offset = _aligned(offset)
+        spec["offset"] = offset
+        offset += len(data)
+    encoded = json.dumps(header).encode("utf-8")
+    start = _aligned(len(MAGIC) + 8 + len(encoded))
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.array([len(encoded)], dtype="<u8").tobytes())
+        f.write(encoded)
+        for spec, data in arrays:
+            f.write(b"\0" * (start + spec["offset"] - f.tell()))
+            f.write(data)
+
+
+def read_binary(path,
+                mmap=True,
+                weight="weight",
+                create_using=None,
+                allow_pickle=False):
+    """Read a graph written by `write_binary`.
+
+    Parameters
+    ----------
+    path : string or path-like
+        File name to read.
+
+    mmap : bool, optional (default : True)
+        If True, the arrays are mapped read-only from the file with
+        `numpy.memmap`, so only the pages actually used are loaded. If False,
+        the file is read into memory.
+
+    weight : string or None, optional (default : 'weight')
+        The edge attribute used as the weights of the returned CSRGraph.
+        A float64 column is used without copy. Edges without it, or every
+        edge if *weight* is None, get weight 1.
+
+    create_using : easygraph graph class or instance, optional (default : None)
+        If given, the file is loaded into a graph of this type, with all the
+        attributes, instead of a CSRGraph. This parses every edge.
+
+    allow_pickle : bool, optional (default : False)
+        Whether to load the pickled parts of the file: the attribute values
+        that are not bool, int, float or str, the node ids that are not all
+        int or all str, and the graph attributes that JSON cannot represent.
+        Unpickling can run arbitrary code, only allow it for trusted files.
+
+    Returns
+    -------
+    G : CSRGraph or graph
+        By default a CSRGraph whose *indptr* and *indices* are the arrays of
+        the file. Its `node_attrs` and `edge_attrs` map each attribute name
+        to its column: a NumPy array, or a masked array if some values are
+        missing, for bool, int and float values, and a list otherwise.
+
+    Raises
+    ------
+    EasyGraphError
+        If the file is not in the EasyGraph binary format, or if it has
+        pickled data and *allow_pickle* is False.
+
+    See Also
+    --------
+    write_binary
+
+    Examples
+    --------
+    >>> csr = eg.read_binary("test.egb")
+    >>> eg.single_source_bfs(csr, 0)
+    >>> G = eg.read_binary("test.egb", create_using=eg.Graph)
+
+    """
+    import numpy as np
+    if mmap:
+        raw = np.memmap(path, dtype=np.uint8, mode="r")
+    else:
+        raw = np.fromfile(path, dtype=np.uint8)
+    if bytes(raw[:len(MAGIC)]) != MAGIC:
+        raise EasyGraphError(
+            "{} is not in the EasyGraph binary format.".format(path))
+    length = int(raw[len(MAGIC):len(MAGIC) + 8].view("<u8")[0])
+    header_end = len(MAGIC) + 8 + length
+    header = json.loads(bytes(raw[len(MAGIC) + 8:header_end]).decode("utf-8"))
+    if header["version"] > VERSION:
+        raise EasyGraphError(
+            "{} was written by a newer version of the format.".format(path))
+    data = raw[_aligned(header_end):]
+
+    def unpickle(spec):
+        if not allow_pickle:
+            raise EasyGraphError(
+                "{} has pickled data, which is only read with "
+                "allow_pickle=True.".format(path))
+        return pickle.loads(bytes(_array(data, spec)))
+
+    graph = header["graph"]
+    if graph is None:
+        graph = unpickle(header["graph_pickle"])
+    nodes = _read_nodes(data, header["nodes"], unpickle)
+    node_attrs = {
+        spec["key"]: _read_column(data, spec, unpickle)
+        for spec in header["node_attrs"]
+    }
+    edge_attrs = {
+        spec["key"]: _read_column(data, spec, unpickle)
+        for spec in header["edge_attrs"]
+    }
+    indptr = _array(data, header["indptr"])
+    indices = _array(data, header["indices"])
+
+    if create_using is not None:
+        return _to_graph(header, graph, nodes, indptr, indices, node_attrs,
+                         edge_attrs, create_using)
+
+    weights = None
+    if weight is not None and weight in edge_attrs:
+        weights = edge_attrs[weight]
+        if np.ma.isMaskedArray(weights):
+            weights = weights.astype(np.float64).filled(1)
+    csr = CSRGraph(indptr,
+                   indices,
+                   weights,
+                   node_list=nodes,
+                   directed=header["directed"],
+                   weight=weight)
+    csr.graph.update(graph)
+    csr.node_attrs = node_attrs
+    csr.edge_attrs = edge_attrs
+    return csr
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _add_array(arrays, name, array, dtype):
+    import numpy as np
+    array = np.ascontiguousarray(array, dtype=dtype)
+    spec = {"name": name, "dtype": array.dtype.str, "shape": array.shape}
+    arrays.append((spec, array.tobytes()))
+    return spec
+
+
+def _add_pickle(arrays, name, obj):
+    import numpy as np
+    blob = np.frombuffer(pickle.dumps(obj), dtype=np.uint8)
+    return _add_array(arrays, name, blob, np.uint8)
+
+
+def _add_strings(arrays, name, strings):
+    # UTF-8 blob and the offset of each string in it
+    import numpy as np
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return {
+        "offsets": _add_array(arrays, name + "_offsets", offsets, "<i8"),
+        "blob": _add_array(arrays, name + "_blob", blob, np.uint8),
+    }
+
+
+def _add_nodes(arrays, nodes):
+    if isinstance(nodes, range):
+        return {"kind": "range"}
+    if all(type(node) is int for node in nodes):
+        if nodes == list(range(len(nodes))):
+            return {"kind": "range"}
+        spec = {"kind": "int"}
+        spec["ids"] = _add_array(arrays, "node_ids", nodes, "<i8")
+    elif all(type(node) is str for node in nodes):
+        spec = {"kind": "str"}
+        spec.update(_add_strings(arrays, "node_ids", nodes))
+    else:
+        spec = {"kind": "object"}
+        spec["pickle"] = _add_pickle(arrays, "node_ids", list(nodes))
+    return spec
+
+
+def _attribute_columns(dicts):
+    # One list per attribute key, with None where the attribute is missing
+    dicts = list(dicts)
+    keys = dict.fromkeys(chain.from_iterable(dicts))
+    return {key: [d.get(key) for d in dicts] for key in keys}
+
+
+def _column_kind(kinds):
+    kinds = kinds - {type(None)}
+    if not kinds:
+        return "object"
+    if kinds == {bool}:
+        return "bool"
+    if kinds == {int}:
+        return "int"
+    if kinds <= {int, float}:
+        return "float"
+    if kinds == {str}:
+        return "str"
+    return "object"
+
+
+def _add_column(arrays, name, key, values):
+    import numpy as np
+    if not isinstance(key, str):
+        raise EasyGraphError(
+            "Attribute names must be strings, got {!r}.".format(key))
+    name = "{}:{}".format(name, key)
+    spec = {"key": key}
+    if isinstance(values, np.ndarray):  # column of a CSRGraph
+        if np.ma.isMaskedArray(values):
+            spec["present"] = _add_array(arrays, name + "_present",
+                                         ~np.ma.getmaskarray(values), np.bool_)
+            values = values.data
+        spec["kind"] = "array"
+        spec["values"] = _add_array(arrays, name, values,
+                                    values.dtype.newbyteorder("<"))
+        return spec
+    values = list(values)
+    kinds = set(map(type, values))
+    kind = spec["kind"] = _column_kind(kinds)
+    if kind == "object":
+        spec["pickle"] = _add_pickle(arrays, name, values)
+        return spec
+    if type(None) in kinds:
+        filler = {"bool": False, "int": 0, "float": 0.0, "str": ""}[kind]
+        spec["present"] = _add_array(
+            arrays, name + "_present",
+            [value is not None for value in values], np.bool_)
+        values = [filler if value is None else value for value in values]
+    if kind == "str":
+        spec.update(_add_strings(arrays, name, values))
+    else:
+        dtype = {"bool": np.bool_, "int": "<i8", "float": "<f8"}[kind]
+        spec["values"] = _add_array(arrays, name, values, dtype)
+    return spec
+
+
+def _array(data, spec):
+    import numpy as np
+    dtype = np.dtype(spec["dtype"])
+    count = int(np.prod(spec["shape"], dtype=np.int64))
+    start = spec["offset"]
+    array = data[start:start + count * dtype.itemsize].view(dtype)
+    return array.reshape(spec["shape"])
+
+
+def _read_strings(data, spec):
+    offsets = _array(data, spec["offsets"]).tolist()
+    blob = bytes(_array(data, spec["blob"]))
+    return [
+        blob[start:end].decode("utf-8")
+        for start, end in zip(offsets[:-1], offsets[1:])
+    ]
+
+
+def _read_nodes(data, spec, unpickle):
+    kind = spec["kind"]
+    if kind == "range":
+        return None
+    if kind == "int":
+        return _array(data, spec["ids"]).tolist()
+    if kind == "str":
+        return _read_strings(data, spec)
+    return unpickle(spec["pickle"])
+
+
+def _read_column(data, spec, unpickle):
+    import numpy as np
+    kind = spec["kind"]
+    if kind == "object":
+        return unpickle(spec["pickle"])
+    present = _array(data, spec["present"]) if "present" in spec else None
+    if kind == "str":
+        values = _read_strings(data, spec)
+        if present is not None:
+            values = [
+                value if ok else None
+                for value, ok in zip(values, present.tolist())
+            ]
+        return values
+    values = _array(data, spec["values"])
+    if present is not None:
+        values = np.ma.masked_array(values, mask=~present)
+    return values
+
+
+def _column_values(column):
+    # Python values of a column, None where missing
+    import numpy as np
+    if isinstance(column, list):
+        return column
+    if np.ma.isMaskedArray(column):
+        return [
+            None if missing else value for value, missing in zip(
+                column.data.tolist(),
+                np.ma.getmaskarray(column).tolist())
+        ]
+    return column.tolist()
+
+
+def _to_graph(header, graph, nodes, indptr, indices, node_attrs, edge_attrs,
+              create_using):
+    import numpy as np
+    if isinstance(create_using, type):
+        G = create_using()
+    else:
+        G = create_using
+    if nodes is None:
+        nodes = list(range(header["number_of_nodes"]))
+    G.graph.update(graph)
+
+    def records(columns, count):
+        columns = [(key, _column_values(column))
+                   for key, column in columns.items()]
+        for i in range(count):
+            yield {
+                key: values[i]
+                for key, values in columns if values[i] is not None
+            }
+
+    G.add_nodes_from(zip(nodes, records(node_attrs, len(nodes))))
+    sources = np.repeat(np.arange(len(nodes)), np.diff(indptr)).tolist()
+    targets = indices.tolist()
+    edges = zip(sources, targets, records(edge_attrs, len(targets)))
+    if not header["directed"]:
+        edges = (edge for edge in edges if edge[0] <= edge[1])
+    G.add_edges_from((nodes[u], nodes[v], d) for u, v, d in edges)
+    return G
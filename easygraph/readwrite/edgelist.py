@@ -1,18 +1,161 @@
+"""
+Read and write graphs as lists of edges.
+
+Each line holds the two end nodes of an edge followed by its data, either
+as a Python dictionary representation or as typed columns::
+
+    # source target data
+    1 2 {'weight': 3}
+    2 3 {'weight': 27}
+
+or, with ``data=(("weight", float),)``::
+
+    1 2 3
+    2 3 27
+
+Files are read and written as streams, in batches of lines, so memory use
+does not grow with the size of the file. Filenames ending in .gz or .bz2
+are compressed and uncompressed transparently.
+"""
+import gc
+
+from itertools import islice
+
 import easygraph as eg
 
+from easygraph.utils import open_file
+
 __all__ = [
+    "generate_edgelist",
+    "write_edgelist",
     "parse_edgelist",
+    "read_edgelist",
 ]
 
 
+def generate_edgelist(G, delimiter=" ", data=True):
+    """Generate a single line of the graph G in edge list format.
+
+    Parameters
+    ----------
+    G : EasyGraph graph
+
+    delimiter : string, optional
+       Separator for node labels
+
+    data : bool or list of keys
+       If False generate no edge data.  If True use a dictionary
+       representation of edge data.  If a list of keys use a list of data
+       values corresponding to the keys.
+
+    Returns
+    -------
+    lines : string
+        Lines of data in edge list format.
+
+    Examples
+    --------
+    >>> G = eg.Graph()
+    >>> G.add_edges([(0, 1), (1, 2)], edges_attr=[{"weight": 3}, {"weight": 4}])
+    >>> for line in eg.generate_edgelist(G):
+    ...     print(line)
+    0 1 {'weight': 3}
+    1 2 {'weight': 4}
+    >>> for line in eg.generate_edgelist(G, data=["weight"]):
+    ...     print(line)
+    0 1 3
+    1 2 4
+
+    See Also
+    --------
+    write_edgelist
+
+    """
+    if data is True:
+        for u, v, d in G.edges:
+            yield delimiter.join(map(str, (u, v, dict(d))))
+    elif data is False:
+        for u, v, _ in G.edges:
+            yield delimiter.join(map(str, (u, v)))
+    else:
+        for u, v, d in G.edges:
+            e = [u, v]
+            e.extend(d[k] for k in data if k in d)
+            yield delimiter.join(map(str, e))
+
+
+@open_file(1, mode="wb")
+def write_edgelist(G,
+                   path,
+                   comments="#",
+                   delimiter=" ",
+                   data=True,
+                   encoding="utf-8",
+                   batch_size=10000):
+    """Write graph as a list of edges.
+
+    Parameters
+    ----------
+    G : graph
+       A EasyGraph graph
+    path : file or string
+       File or filename to write. If a file is provided, it must be
+       opened in 'wb' mode. Filenames ending in .gz or .bz2 will be compressed.
+    comments : string, optional
+       The character used to indicate the start of a comment
+    delimiter : string, optional
+       The string used to separate values.  The default is whitespace.
+    data : bool or list, optional
+       If False write no edge data.
+       If True write a string representation of the edge data dictionary..
+       If a list (or other iterable) is provided, write the  keys specified
+       in the list.
+    encoding: string, optional
+       Specify which encoding to use when writing file.
+    batch_size : int, optional (default=10000)
+       The number of lines encoded and written at once.
+
+    Examples
+    --------
+    >>> G = eg.path_graph(4)
+    >>> eg.write_edgelist(G, "test.edgelist")
+    >>> fh = open("test.edgelist", "wb")
+    >>> eg.write_edgelist(G, fh)
+    >>> eg.write_edgelist(G, "test.edgelist.gz")
+    >>> eg.write_edgelist(G, "test.edgelist.gz", data=False)
+
+    >>> G = eg.Graph()
+    >>> G.add_edge(1, 2, weight=7, color="red")
+    >>> eg.write_edgelist(G, "test.edgelist", data=False)
+    >>> eg.write_edgelist(G, "test.edgelist", data=["color"])
+    >>> eg.write_edgelist(G, "test.edgelist", data=["color", "weight"])
+
+    See Also
+    --------
+    read_edgelist
+
+    """
+    lines = generate_edgelist(G, delimiter, data)
+    while True:
+        batch = list(islice(lines, batch_size))
+        if not batch:
+            break
+        batch.append("")
+        path.write("\n".join(batch).encode(encoding))
+
+
 def parse_edgelist(lines,
                    comments="#",
                    delimiter=None,
                    create_using=None,
                    nodetype=None,
-                   data=True):
+                   data=True,
+                   batch_size=10000):
     """Parse lines of an edge list representation of a graph.
 
+    The lines are parsed in batches: the columns of a batch are converted
+    type by type and its edges are added at once with `add_edges`.
+
     Parameters
     ----------
     lines : list or iterator of strings
@@ -31,6 +174,8 @@ def parse_edgelist(lines,
        If `False` generate no edge data or if `True` use a dictionary
        representation of edge data or a list tuples specifying dictionary
        key names and types for edge data.
+    batch_size : int, optional (default=10000)
+       The number of lines parsed and added to the graph at once.
 
     Returns
     -------
@@ -68,63 +213,184 @@ def parse_edgelist(lines,
 
     See Also
     --------
-    read_weighted_edgelist
+    read_edgelist
     """
-    from ast import literal_eval
-
     G = eg.empty_graph(0, create_using)
-    for line in lines:
+    lines = iter(lines)
+    # The cyclic garbage collector is paused while loading, otherwise it
+    # walks the whole graph again and again as the batches allocate.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        _parse_batches(G, lines, comments, delimiter, nodetype, data,
+                       batch_size)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return G
+
+
+def _parse_batches(G, lines, comments, delimiter, nodetype, data, batch_size):
+    while True:
+        batch = list(islice(lines, batch_size))
+        if not batch:
+            break
         if comments is not None:
-            p = line.find(comments)
-            if p >= 0:
-                line = line[:p]
-            if not line:
-                continue
+            batch = [line.partition(comments)[0] for line in batch]
         # split line, should have 2 or more
-        s = line.strip().split(delimiter)
-        if len(s) < 2:
+        rows = [
+            s for s in (line.strip().split(delimiter) for line in batch)
+            if len(s) >= 2
+        ]
+        if not rows:
             continue
-        u = s.pop(0)
-        v = s.pop(0)
-        d = s
+        us = [s[0] for s in rows]
+        vs = [s[1] for s in rows]
         if nodetype is not None:
-            try:
-                u = nodetype(u)
-                v = nodetype(v)
-            except Exception as err:
-                raise TypeError(
-                    f"Failed to convert nodes {u},{v} to type {nodetype}."
-                ) from err
-
-        if len(d) == 0 or data is False:
-            # no data or data type specified
-            edgedata = {}
+            us = _convert_column(us, nodetype, "nodes")
+            vs = _convert_column(vs, nodetype, "nodes")
+        # add_edges_from raises on bad edges and gives multigraphs an edge
+        # per line
+        if data is False or all(len(s) == 2 for s in rows):
+            G.add_edges_from(zip(us, vs))
         elif data is True:
-            # no edge types specified
-            try:  # try to evaluate as dictionary
-                if delimiter == ",":
-                    edgedata_str = ",".join(d)
-                else:
-                    edgedata_str = " ".join(d)
-                edgedata = dict(literal_eval(edgedata_str.strip()))
-            except Exception as err:
-                raise TypeError(
-                    f"Failed to convert edge data ({d}) to dictionary."
-                ) from err
+            G.add_edges_from(zip(us, vs, _dict_data(rows, delimiter)))
         else:
-            # convert edge data to dictionary with specified keys and type
-            if len(d) != len(data):
-                raise IndexError(
-                    f"Edge data {d} and data_keys {data} are not the same length"
-                )
-            edgedata = {}
-            for (edge_key, edge_type), edge_value in zip(data, d):
-                try:
-                    edge_value = edge_type(edge_value)
-                except Exception as err:
-                    raise TypeError(
-                        f"Failed to convert {edge_key} data {edge_value} "
-                        f"to type {edge_type}.") from err
-                edgedata.update({edge_key: edge_value})
-        G.add_edge(u, v, **edgedata)
-    return G
+            G.add_edges_from(zip(us, vs, _typed_data(rows, data)))
+
+
+def _convert_column(values, convert, name):
+    try:
+        return list(map(convert, values))
+    except Exception:
+        pass
+    for value in values:
+        try:
+            convert(value)
+        except Exception as err:
+            raise TypeError(
+                f"Failed to convert {name} {value} to type {convert}.") from err
+
+
+def _dict_data(rows, delimiter):
+    from ast import literal_eval
+
+    joiner = "," if delimiter == "," else " "
+    edges_attr = []
+    for s in rows:
+        d = s[2:]
+        if not d:
+            edges_attr.append({})
+            continue
+        try:  # try to evaluate as dictionary
+            edges_attr.append(dict(literal_eval(joiner.join(d).strip())))
+        except Exception as err:
+            raise TypeError(
+                f"Failed to convert edge data ({d}) to dictionary.") from err
+    return edges_attr
+
+
+def _typed_data(rows, data):
+    # Each data column is converted at once, the rows without data get {}
+    keys = [edge_key for edge_key, _ in data]
+    with_data = [s[2:] for s in rows if len(s) > 2]
+    for d in with_data:
+        if len(d) != len(keys):
+            raise IndexError(
+                f"Edge data {d} and data_keys {data} are not the same length")
+    columns = [
+        _convert_column(column, edge_type, f"{edge_key} data")
+        for (edge_key, edge_type), column in zip(data, zip(*with_data))
+    ]
+    values = zip(*columns)
+    return [dict(zip(keys, next(values))) if len(s) > 2 else {} for s in rows]
+
+
+@open_file(0, mode="rb")
+def read_edgelist(path,
+                  comments="#",
+                  delimiter=None,
+                  create_using=None,
+                  nodetype=None,
+                  data=True,
+                  encoding="utf-8",
+                  batch_size=10000):
+    """Read a graph from a list of edges.
+
+    Parameters
+    ----------
+    path : file or string
+       File or filename to read. If a file is provided, it must be
+       opened in 'rb' mode.
+       Filenames ending in .gz or .bz2 will be uncompressed.
+    comments : string, optional
+       The character used to indicate the start of a comment. To specify that
+       no character should be treated as a comment, use ``comments=None``.
+    delimiter : string, optional
+       The string used to separate values.  The default is whitespace.
+    create_using : EasyGraph graph constructor, optional (default=eg.Graph)
+       Graph type to create. If graph instance, then cleared before populated.
+    nodetype : int, float, str, Python type, optional
+       Convert node data from strings to specified type
+    data : bool or list of (label,type) tuples
+       Tuples specifying dictionary key names and types for edge data
+    encoding: string, optional
+       Specify which encoding to use when reading file.
+    batch_size : int, optional (default=10000)
+       The number of lines parsed and added to the graph at once.
+
+    Returns
+    -------
+    G : graph
+       A easygraph Graph or other type specified with create_using
+
+    Examples
+    --------
+    >>> eg.write_edgelist(eg.path_graph(4), "test.edgelist")
+    >>> G = eg.read_edgelist("test.edgelist")
+
+    >>> fh = open("test.edgelist", "rb")
+    >>> G = eg.read_edgelist(fh)
+    >>> fh.close()
+
+    >>> G = eg.read_edgelist("test.edgelist", nodetype=int)
+    >>> G = eg.read_edgelist("test.edgelist", create_using=eg.DiGraph)
+
+    Edgelist with data in a list:
+
+    >>> textline = "1 2 3"
+    >>> fh = open("test.edgelist", "w")
+    >>> d = fh.write(textline)
+    >>> fh.close()
+    >>> G = eg.read_edgelist("test.edgelist", nodetype=int, data=(("weight", float),))
+    >>> list(G)
+    [1, 2]
+    >>> list(G.edges)
+    [(1, 2, {'weight': 3.0})]
+
+    See parse_edgelist() for more examples of formatting.
+
+    See Also
+    --------
+    parse_edgelist
+    write_edgelist
+
+    """
+    return parse_edgelist(_decoded_lines(path, encoding),
+                          comments=comments,
+                          delimiter=delimiter,
+                          create_using=create_using,
+                          nodetype=nodetype,
+                          data=data,
+                          batch_size=batch_size)
+
+
+def _decoded_lines(f, encoding, block_size=1 << 20):
+    # Lines are read and decoded by blocks of about block_size bytes
+    while True:
+        block = f.readlines(block_size)
+        if not block:
+            return
+        if isinstance(block[0], bytes):
+            block = b"".join(block).decode(encoding).split("\n")
+        yield from block
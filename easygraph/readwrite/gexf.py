@@ -7,18 +7,22 @@ from xml.etree.ElementTree import (
     Element,
     ElementTree,
     SubElement,
+    iterparse,
     tostring,
     register_namespace,
 )
+from xml.sax.saxutils import escape
 
 __all__ = ["write_gexf", "relabel_gexf_graph", "generate_gexf", "read_gexf"]
 
 
+@open_file(1, mode="wb")
 def write_gexf(G,
                path,
                encoding="utf-8",
                prettyprint=True,
-               version="1.2draft"):
+               version="1.2draft",
+               stream=False):
     """Write G in GEXF format to path.
 
     "GEXF (Graph Exchange XML Format) is a language for describing
@@ -41,18 +45,27 @@ def write_gexf(G,
        If True use line breaks and indenting in output XML.
     version: string (optional, default: '1.2draft')
        The version of GEXF to be used for nodes attributes checking
+    stream : bool (optional, default: False)
+       If True write the nodes and edges to the file one at a time instead
+       of building the whole XML tree first. The data of G is read twice,
+       once to declare the attributes and once to write them, but memory
+       use no longer grows with the size of G.
 
     Examples
     --------
     >>> G = eg.path_graph(4)
     >>> eg.write_gexf(G, "test.gexf")
-    
+    >>> eg.write_gexf(G, "test.gexf.gz", stream=True)
+
     """
     writer = GEXFWriter(encoding=encoding,
                         prettyprint=prettyprint,
                         version=version)
-    writer.add_graph(G)
-    writer.write(path)
+    if stream:
+        writer.write_stream(G, path)
+    else:
+        writer.add_graph(G)
+        writer.write(path)
 
 
 def generate_gexf(G, encoding="utf-8", prettyprint=True, version="1.2draft"):
@@ -103,7 +116,11 @@ def generate_gexf(G, encoding="utf-8", prettyprint=True, version="1.2draft"):
 
 
 @open_file(0, mode="rb")
-def read_gexf(path, node_type=None, relabel=False, version="1.2draft"):
+def read_gexf(path,
+              node_type=None,
+              relabel=False,
+              version="1.2draft",
+              stream=False):
     """Read graph in GEXF format from path.
 
     "GEXF (Graph Exchange XML Format) is a language for describing
@@ -122,6 +139,10 @@ def read_gexf(path, node_type=None, relabel=False, version="1.2draft"):
     version : string (default: 1.2draft)
     Version of GEFX File Format (see http://gexf.net/schema.html)
        Supported values: "1.1draft", "1.2draft"
+    stream : bool (default: False)
+       If True parse the file incrementally, dropping every node and edge
+       element once it is added to the graph, instead of loading the
+       whole XML tree first.
 
     Returns
     -------
@@ -139,10 +160,12 @@ def read_gexf(path, node_type=None, relabel=False, version="1.2draft"):
     .. [1] GEXF File Format, http://gexf.net/
     """
     reader = GEXFReader(node_type=node_type, version=version)
-    if relabel:
-        G = relabel_gexf_graph(reader(path))
+    if stream:
+        G = reader.read_incremental(path)
     else:
         G = reader(path)
+    if relabel:
+        G = relabel_gexf_graph(G)
     return G
 
 
@@ -251,6 +274,13 @@ class GEXF:
 class GEXFWriter(GEXF):
     # class for writing GEXF format files
     # use write_gexf() function
+    attrib_entities = {
+        '"': "&quot;",
+        "\n": "&#10;",
+        "\r": "&#13;",
+        "\t": "&#09;"
+    }
+
     def __init__(self,
                  graph=None,
                  encoding="utf-8",
@@ -303,8 +333,14 @@ class GEXFWriter(GEXF):
         return s
 
     def add_graph(self, G):
+        graph_element = self.start_graph(G)
+        self.add_nodes(G, graph_element)
+        self.add_edges(G, graph_element)
+        self.xml.append(graph_element)
+
+    def start_graph(self, G):
         # first pass through G collecting edge ids
-        for u, v, dd in G.edges:
+        for *_, dd in G.edges:
             eid = dd.get("id")
             if eid is not None:
                 self.all_edge_ids.add(str(eid))
@@ -324,12 +360,15 @@ class GEXFWriter(GEXF):
                                 mode=mode,
                                 name=name)
         self.graph_element = graph_element
-        self.add_nodes(G, graph_element)
-        self.add_edges(G, graph_element)
-        self.xml.append(graph_element)
+        return graph_element
 
     def add_nodes(self, G, graph_element):
         nodes_element = Element("nodes")
+        nodes_element.extend(self.node_elements(G))
+        graph_element.append(nodes_element)
+
+    def node_elements(self, G):
+        default = G.graph.get("node_default", {})
         for node, data in G.nodes.items():
             node_data = data.copy()
             node_id = str(node_data.pop("id", node))
@@ -356,7 +395,6 @@ class GEXFWriter(GEXF):
             # add node element with attributes
             node_element = Element("node", **kw)
             # add node element and attr subelements
-            default = G.graph.get("node_default", {})
             node_data = self.add_parents(node_element, node_data)
             if self.VERSION == "1.1":
                 node_data = self.add_slices(node_element, node_data)
@@ -365,8 +403,7 @@ class GEXFWriter(GEXF):
             node_data = self.add_viz(node_element, node_data)
             node_data = self.add_attributes("node", node_element, node_data,
                                             default)
-            nodes_element.append(node_element)
-        graph_element.append(nodes_element)
+            yield node_element
 
     def get_attr_id(self, title, attr_type, edge_or_node, default, mode):
         # find the id of the attribute or generate a new id
@@ -401,6 +438,11 @@ class GEXFWriter(GEXF):
         return new_id
 
     def add_edges(self, G, graph_element):
+        edges_element = Element("edges")
+        edges_element.extend(self.edge_elements(G))
+        graph_element.append(edges_element)
+
+    def edge_elements(self, G):
 
         def edge_key_data(G):
             if G.is_multigraph():
@@ -412,7 +454,6 @@ class GEXFWriter(GEXF):
                         edge_id = next(self.edge_id)
                         while str(edge_id) in self.all_edge_ids:
                             edge_id = next(self.edge_id)
-                        self.all_edge_ids.add(str(edge_id))
                     yield u, v, edge_id, edge_data
             else:
                 for u, v, data in G.edges:
@@ -422,10 +463,9 @@ class GEXFWriter(GEXF):
                         edge_id = next(self.edge_id)
                         while str(edge_id) in self.all_edge_ids:
                             edge_id = next(self.edge_id)
-                        self.all_edge_ids.add(str(edge_id))
                     yield u, v, edge_id, edge_data
 
-        edges_element = Element("edges")
+        default = G.graph.get("edge_default", {})
         for u, v, key, edge_data in edge_key_data(G):
             kw = {"id": str(key)}
             try:
@@ -461,7 +501,6 @@ class GEXFWriter(GEXF):
                                    source=source_id,
                                    target=target_id,
                                    **kw)
-            default = G.graph.get("edge_default", {})
             if self.VERSION == "1.1":
                 edge_data = self.add_slices(edge_element, edge_data)
             else:
@@ -469,34 +508,21 @@ class GEXFWriter(GEXF):
             edge_data = self.add_viz(edge_element, edge_data)
             edge_data = self.add_attributes("edge", edge_element, edge_data,
                                             default)
-            edges_element.append(edge_element)
-        graph_element.append(edges_element)
+            yield edge_element
 
     def add_attributes(self, node_or_edge, xml_obj, data, default):
         # Add attrvalues to node or edge
         attvalues = Element("attvalues")
         if len(data) == 0:
             return data
-        mode = "static"
         for k, v in data.items():
             # rename generic multigraph key to avoid any name conflict
             if k == "key":
                 k = "easygraph_key"
-            val_type = type(v)
-            if val_type not in self.xml_type:
-                raise TypeError(
-                    f"attribute value type is not allowed: {val_type}")
+            attr_id, val_type = self.declare_attribute(node_or_edge, k, v,
+                                                       default)
             if isinstance(v, list):
                 # dynamic data
-                for val, start, end in v:
-                    val_type = type(val)
-                    if start is not None or end is not None:
-                        mode = "dynamic"
-                        self.alter_graph_mode_timeformat(start)
-                        self.alter_graph_mode_timeformat(end)
-                        break
-                attr_id = self.get_attr_id(str(k), self.xml_type[val_type],
-                                           node_or_edge, default, mode)
                 for val, start, end in v:
                     e = Element("attvalue")
                     e.attrib["for"] = attr_id
@@ -516,9 +542,6 @@ class GEXFWriter(GEXF):
                     attvalues.append(e)
             else:
                 # static data
-                mode = "static"
-                attr_id = self.get_attr_id(str(k), self.xml_type[val_type],
-                                           node_or_edge, default, mode)
                 e = Element("attvalue")
                 e.attrib["for"] = attr_id
                 if isinstance(v, bool):
@@ -537,6 +560,25 @@ class GEXFWriter(GEXF):
         xml_obj.append(attvalues)
         return data
 
+    def declare_attribute(self, node_or_edge, key, value, default):
+        # find the id and the XML type of an attribute value,
+        # a list of (value, start, end) being dynamic data
+        val_type = type(value)
+        if val_type not in self.xml_type:
+            raise TypeError(f"attribute value type is not allowed: {val_type}")
+        mode = "static"
+        if isinstance(value, list):
+            for val, start, end in value:
+                val_type = type(val)
+                if start is not None or end is not None:
+                    mode = "dynamic"
+                    self.alter_graph_mode_timeformat(start)
+                    self.alter_graph_mode_timeformat(end)
+                    break
+        attr_id = self.get_attr_id(str(key), self.xml_type[val_type],
+                                   node_or_edge, default, mode)
+        return attr_id, val_type
+
     def add_viz(self, element, node_data):
         viz = node_data.pop("viz", False)
         if viz:
@@ -649,6 +691,109 @@ class GEXFWriter(GEXF):
         document = ElementTree(self.xml)
         document.write(fh, encoding=self.encoding, xml_declaration=True)
 
+    def write_stream(self, G, fh):
+        # Write G to the binary file fh one node or edge at a time, so
+        # that only the attribute declarations are held in memory. They
+        # and the time format precede the nodes, so a first pass over the
+        # data of G collects them without building any element.
+        graph_element = self.start_graph(G)
+        self.declare_graph_attributes(G)
+        indent = "\n" if self.prettyprint else ""
+
+        def write(parts):
+            text = "".join(parts)
+            fh.write(text.encode(self.encoding, "xmlcharrefreplace"))
+
+        root = dict(self.xml.attrib)
+        root["xmlns:viz"] = self.NS_VIZ
+        write([
+            f"<?xml version='1.0' encoding='{self.encoding}'?>\n",
+            self.start_tag("gexf", root),
+            indent,
+            "  " * self.prettyprint,
+            self.element_string(self.xml.find("meta"), 1),
+            indent,
+            "  " * self.prettyprint,
+            self.start_tag("graph", graph_element.attrib),
+        ])
+        for attributes_element in graph_element:
+            write([indent, "    " * self.prettyprint,
+                   self.element_string(attributes_element, 2)])
+        for tag, elements in (("nodes", self.node_elements(G)),
+                              ("edges", self.edge_elements(G))):
+            write([indent, "    " * self.prettyprint, f"<{tag}>"])
+            prefix = indent + "      " * self.prettyprint
+            parts = []
+            for element in elements:
+                parts.append(prefix)
+                parts.append(self.element_string(element, 3))
+                if len(parts) >= 2000:
+                    write(parts)
+                    parts = []
+            parts.append(f"{indent}{'    ' * self.prettyprint}</{tag}>")
+            write(parts)
+        write([indent, "  " * self.prettyprint, "</graph>", indent, "</gexf>",
+               indent])
+
+    def declare_graph_attributes(self, G):
+        # Go through the data of G in the order of add_nodes() and
+        # add_edges(), declaring the attributes and setting the time format.
+        spells = "slices" if self.VERSION == "1.1" else "spells"
+        node_keys = {"id", "label", "pid", "start", "end", "parents", "viz"}
+        node_keys.add(spells)
+        default = G.graph.get("node_default", {})
+        for node, data in G.nodes.items():
+            self.declare_times(data)
+            for k, v in data.items():
+                if k not in node_keys:
+                    self.declare_attribute("node", k, v, default)
+        edge_keys = {"id", "label", "weight", "type", "start", "end", "viz"}
+        edge_keys.add(spells)
+        default = G.graph.get("edge_default", {})
+        if G.is_multigraph():
+            edges = (dict(data, key=key) for u, v, key, data in G.edges)
+        else:
+            edges = (data for u, v, data in G.edges)
+        for data in edges:
+            self.declare_times(data)
+            for k, v in data.items():
+                if k == "key":
+                    k = "easygraph_key"
+                if k not in edge_keys:
+                    self.declare_attribute("edge", k, v, default)
+
+    def declare_times(self, data):
+        self.alter_graph_mode_timeformat(data.get("start"))
+        self.alter_graph_mode_timeformat(data.get("end"))
+        if self.VERSION != "1.1":
+            for start, end in data.get("spells") or ():
+                self.alter_graph_mode_timeformat(start)
+                self.alter_graph_mode_timeformat(end)
+
+    def start_tag(self, tag, attrib):
+        attributes = "".join(f' {k}="{escape(v, self.attrib_entities)}"'
+                             for k, v in attrib.items())
+        return f"<{tag}{attributes}>"
+
+    def element_string(self, element, level):
+        # Serialize an element like ElementTree does, but with the viz
+        # prefix declared once on the root element.
+        tag = element.tag.replace(f"{{{self.NS_VIZ}}}", "viz:")
+        text = self.start_tag(tag, element.attrib)
+        if len(element) == 0 and not element.text:
+            return text[:-1] + " />"
+        parts = [text]
+        if element.text:
+            parts.append(escape(element.text))
+        if len(element):
+            prefix = "\n" + "  " * (level + 1) if self.prettyprint else ""
+            for child in element:
+                parts.append(prefix)
+                parts.append(self.element_string(child, level + 1))
+            parts.append(prefix[:-2])
+        parts.append(f"</{tag}>")
+        return "".join(parts)
+
     def indent(self, elem, level=0):
         i = "\n" + "  " * level
         if len(elem):
@@ -690,7 +835,82 @@ class GEXFReader(GEXF):
                 return self.make_graph(g)
         raise EasyGraphError("No <graph> element in GEXF file.")
 
+    def read_incremental(self, stream):
+        # Like __call__, but adds every top-level node or edge element to
+        # the graph as soon as it is parsed and then drops it.
+        G = None
+        node_attr = {}
+        edge_attr = {}
+        depth = 0  # of the current <node> element, subnodes being nested
+        container = None
+        for event, elem in iterparse(stream, events=("start", "end")):
+            if G is None:
+                if event == "start" and elem.tag.endswith("}graph"):
+                    for version in [self.version, *self.versions]:
+                        self.set_version(version)
+                        if elem.tag == f"{{{self.NS_GEXF}}}graph":
+                            break
+                    else:
+                        break
+                    G = self.start_graph(elem)
+                    self.add_weight_attribute(G, edge_attr)
+                    tags = {
+                        name: f"{{{self.NS_GEXF}}}{name}"
+                        for name in ("node", "nodes", "edge", "edges",
+                                     "attributes", "graph")
+                    }
+                continue
+            if event == "start":
+                if elem.tag == tags["node"]:
+                    depth += 1
+                elif depth == 0 and elem.tag in (tags["nodes"],
+                                                 tags["edges"]):
+                    container = elem
+            elif elem.tag == tags["node"]:
+                depth -= 1
+                if depth == 0:
+                    self.add_node(G, elem, node_attr)
+                    del container[:]
+            elif depth > 0:
+                continue
+            elif elem.tag == tags["edge"]:
+                self.add_edge(G, elem, edge_attr)
+                del container[:]
+            elif elem.tag == tags["attributes"]:
+                self.add_attributes(G, elem, node_attr, edge_attr)
+                self.add_weight_attribute(G, edge_attr)
+            elif elem.tag == tags["graph"]:
+                return self.finish_graph(G)
+        raise EasyGraphError("No <graph> element in GEXF file.")
+
     def make_graph(self, graph_xml):
+        G = self.start_graph(graph_xml)
+
+        # node and edge attributes
+        attributes_elements = graph_xml.findall(
+            f"{{{self.NS_GEXF}}}attributes")
+        # dictionaries to hold attributes
+        node_attr = {}
+        edge_attr = {}
+        for a in attributes_elements:
+            self.add_attributes(G, a, node_attr, edge_attr)
+        self.add_weight_attribute(G, edge_attr)
+
+        # add nodes
+        nodes_element = graph_xml.find(f"{{{self.NS_GEXF}}}nodes")
+        if nodes_element is not None:
+            for node_xml in nodes_element.findall(f"{{{self.NS_GEXF}}}node"):
+                self.add_node(G, node_xml, node_attr)
+
+        # add edges
+        edges_element = graph_xml.find(f"{{{self.NS_GEXF}}}edges")
+        if edges_element is not None:
+            for edge_xml in edges_element.findall(f"{{{self.NS_GEXF}}}edge"):
+                self.add_edge(G, edge_xml, edge_attr)
+
+        return self.finish_graph(G)
+
+    def start_graph(self, graph_xml):
         edgedefault = graph_xml.get("defaultedgetype", None)
         if edgedefault == "directed":
             G = eg.MultiDiGraph()
@@ -717,56 +937,33 @@ class GEXFReader(GEXF):
         self.timeformat = graph_xml.get("timeformat")
         if self.timeformat == "date":
             self.timeformat = "string"
+        return G
 
-        # node and edge attributes
-        attributes_elements = graph_xml.findall(
-            f"{{{self.NS_GEXF}}}attributes")
-        # dictionaries to hold attributes and attribute defaults
-        node_attr = {}
-        node_default = {}
-        edge_attr = {}
-        edge_default = {}
-        for a in attributes_elements:
-            attr_class = a.get("class")
-            if attr_class == "node":
-                na, nd = self.find_gexf_attributes(a)
-                node_attr.update(na)
-                node_default.update(nd)
-                G.graph["node_default"] = node_default
-            elif attr_class == "edge":
-                ea, ed = self.find_gexf_attributes(a)
-                edge_attr.update(ea)
-                edge_default.update(ed)
-                G.graph["edge_default"] = edge_default
-            else:
-                raise  # unknown attribute class
+    def add_attributes(self, G, attributes_xml, node_attr, edge_attr):
+        # add the attributes and the defaults of an <attributes> element
+        attr_class = attributes_xml.get("class")
+        if attr_class == "node":
+            na, nd = self.find_gexf_attributes(attributes_xml)
+            node_attr.update(na)
+            G.graph.setdefault("node_default", {}).update(nd)
+        elif attr_class == "edge":
+            ea, ed = self.find_gexf_attributes(attributes_xml)
+            edge_attr.update(ea)
+            G.graph.setdefault("edge_default", {}).update(ed)
+        else:
+            raise EasyGraphError(f"Unknown attribute class {attr_class}.")
 
+    def add_weight_attribute(self, G, edge_attr):
         # Hack to handle Gephi0.7beta bug
         # add weight attribute
-        ea = {
-            "weight": {
-                "type": "double",
-                "mode": "static",
-                "title": "weight"
-            }
+        edge_attr["weight"] = {
+            "type": "double",
+            "mode": "static",
+            "title": "weight"
         }
-        ed = {}
-        edge_attr.update(ea)
-        edge_default.update(ed)
-        G.graph["edge_default"] = edge_default
-
-        # add nodes
-        nodes_element = graph_xml.find(f"{{{self.NS_GEXF}}}nodes")
-        if nodes_element is not None:
-            for node_xml in nodes_element.findall(f"{{{self.NS_GEXF}}}node"):
-                self.add_node(G, node_xml, node_attr)
-
-        # add edges
-        edges_element = graph_xml.find(f"{{{self.NS_GEXF}}}edges")
-        if edges_element is not None:
-            for edge_xml in edges_element.findall(f"{{{self.NS_GEXF}}}edge"):
-                self.add_edge(G, edge_xml, edge_attr)
+        G.graph.setdefault("edge_default", {})
 
+    def finish_graph(self, G):
         # switch to Graph or DiGraph if no parallel edges were found.
         if self.simple_graph:
             if G.is_directed():
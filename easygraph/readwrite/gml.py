@@ -31,12 +31,9 @@ Several example graphs in GML format may be found on Mark Newman's
 from errno import E2BIG
 from io import StringIO
 from ast import literal_eval
-from collections import defaultdict
-from enum import Enum
-from lib2to3.pgen2 import token
-from typing import Any, NamedTuple
 from unicodedata import category
 import easygraph as eg
+import gc
 import warnings
 import re
 import html.entities as htmlentitydefs
@@ -120,25 +117,6 @@ def literal_destringizer(rep):
         raise ValueError(f"{rep!r} is not a string")
 
 
-class Pattern(Enum):
-    """encodes the index of each token-matching pattern in `tokenize`."""
-
-    KEYS = 0
-    REALS = 1
-    INTS = 2
-    STRINGS = 3
-    DICT_START = 4
-    DICT_END = 5
-    COMMENT_WHITESPACE = 6
-
-
-class Token(NamedTuple):
-    category: Pattern
-    value: Any
-    line: int
-    position: int
-
-
 def parse_gml(lines, label="label", destringizer=None):
     """Parse GML graph from a string or iterable.
 
@@ -216,125 +194,140 @@ def parse_gml(lines, label="label", destringizer=None):
     return G
 
 
+# One token per match, after any whitespace: a key, a real, an int, a
+# string, '[' or ']', each in its own group, a comment or the end of the
+# text without any, or else the character that cannot start a token.
+GML_TOKEN = re.compile(
+    r"""\s*(?:
+    ([A-Za-z][0-9A-Za-z_]*)\b
+    |([+-]?(?:[0-9]*\.[0-9]+|[0-9]+\.[0-9]*|INF)(?:[Ee][+-]?[0-9]+)?)
+    |([+-]?[0-9]+)
+    |("[^"\n]*")
+    |(\[)
+    |(\])
+    |\#[^\n]*
+    |\Z
+    |(.)
+    )""",
+    re.VERBOSE,
+)
+KEY, REAL, INT, STRING, DICT_START, DICT_END, INVALID = range(1, 8)
+
+
 def parse_gml_lines(lines, label, destringizer):
-    """Parse GML `lines` into a graph."""
-
-    def tokenize():
-        patterns = [
-            r"[A-Za-z][0-9A-Za-z_]*\b",  # keys
-            # reals
-            r"[+-]?(?:[0-9]*\.[0-9]+|[0-9]+\.[0-9]*|INF)(?:[Ee][+-]?[0-9]+)?",
-            r"[+-]?[0-9]+",  # ints
-            r'".*?"',  # strings
-            r"\[",  # dict start
-            r"\]",  # dict end
-            r"#.*$|\s+",  # comments and whitespaces
-        ]
-        tokens = re.compile("|".join(f"({pattern})" for pattern in patterns))
-        lineno = 0
-        for line in lines:
-            length = len(line)
-            pos = 0
-            while pos < length:
-                match = tokens.match(line, pos)
-                if match is None:
-                    m = f"cannot tokenize {line[pos:]} at ({lineno + 1}, {pos + 1})"
-                    raise EasyGraphError(m)
-                for i in range(len(patterns)):
-                    group = match.group(i + 1)
-                    if group is not None:
-                        if i == 0:  # keys
-                            value = group.rstrip()
-                        elif i == 1:  # reals
-                            value = float(group)
-                        elif i == 2:  # ints
-                            value = int(group)
-                        else:
-                            value = group
-                        if i != 6:  # comments and whitespaces
-                            yield Token(Pattern(i), value, lineno + 1, pos + 1)
-                        pos += len(group)
-                        break
-            lineno += 1
-        yield Token(None, None, lineno + 1, 1)  # EOF
-
-    def unexpected(curr_token, expected):
-        category, value, lineno, pos = curr_token
-        value = repr(value) if value is not None else "EOF"
+    """Parse GML `lines` into a graph.
+
+    The text is scanned in a single pass with one compiled pattern, and
+    the key-value lists are built as dictionaries on a stack while it is,
+    so no token objects are created. Node and edge data then go straight
+    into the graph, under their labels.
+    """
+    text = lines if isinstance(lines, str) else "\n".join(lines)
+
+    def location(pos):
+        lineno = text.count("\n", 0, pos) + 1
+        return lineno, pos - text.rfind("\n", 0, pos)
+
+    def token_value(kind, token):
+        if kind == REAL:
+            return float(token)
+        if kind == INT:
+            return int(token)
+        return token
+
+    def unexpected(match, expected):
+        if match is None:
+            value = "EOF"
+            lineno, pos = location(len(text.rstrip()))
+        else:
+            kind = match.lastindex
+            value = repr(token_value(kind, match.group(kind)))
+            lineno, pos = location(match.start(kind))
         raise EasyGraphError(
             f"expected {expected}, found {value} at ({lineno}, {pos})")
 
-    def consume(curr_token, category, expected):
-        if curr_token.category == category:
-            return next(tokens)
-        unexpected(curr_token, expected)
-
-    def parse_dict(curr_token):
-        # dict start
-        curr_token = consume(curr_token, Pattern.DICT_START, "'['")
-        # dict contents
-        curr_token, dct = parse_kv(curr_token)
-        # dict end
-        curr_token = consume(curr_token, Pattern.DICT_END, "']'")
-        return curr_token, dct
-
-    def parse_kv(curr_token):
-        dct = defaultdict(list)
-        while curr_token.category == Pattern.KEYS:
-            key = curr_token.value
-            curr_token = next(tokens)
-            category = curr_token.category
-            if category == Pattern.REALS or category == Pattern.INTS:
-                value = curr_token.value
-                curr_token = next(tokens)
-            elif category == Pattern.STRINGS:
-                value = unescape(curr_token.value[1:-1])
+    def end_dict(dct, repeated):
+        # keys given more than once hold the list of their values
+        if repeated:
+            for key, values in repeated.items():
+                if values[0] == LIST_START_VALUE:
+                    values = values[1:]
+                dct[key] = values
+        return dct
+
+    def parse_graph():
+        stack = []
+        dct = {}
+        repeated = None
+        key = None
+        for match in GML_TOKEN.finditer(text):
+            kind = match.lastindex
+            if kind is None:  # comment
+                continue
+            token = match[kind]
+            if kind == INVALID:
+                pos = match.start(kind)
+                lineno, column = location(pos)
+                line_end = text.find("\n", pos)
+                line = text[pos:] if line_end == -1 else text[pos:line_end]
+                raise EasyGraphError(
+                    f"cannot tokenize {line} at ({lineno}, {column})")
+            if key is None:
+                if kind == KEY:
+                    key = token
+                    continue
+                if kind != DICT_END or not stack:
+                    unexpected(match, "']'" if stack else "EOF")
+                value = end_dict(dct, repeated)
+                dct, repeated, key = stack.pop()
+            elif kind == INT:
+                value = int(token)
+            elif kind == REAL:
+                value = float(token)
+            elif kind == STRING:
+                value = token[1:-1]
+                if "&" in value:
+                    value = unescape(value)
                 if destringizer:
                     try:
                         value = destringizer(value)
                     except ValueError:
                         pass
-                curr_token = next(tokens)
-            elif category == Pattern.DICT_START:
-                curr_token, value = parse_dict(curr_token)
-            else:
-                if key in ("id", "label", "source", "target"):
+            elif kind == DICT_START:
+                stack.append((dct, repeated, key))
+                dct = {}
+                repeated = None
+                key = None
+                continue
+            elif key in ("id", "label", "source", "target"):
+                # String convert the token value
+                value = unescape(token)
+                if destringizer:
                     try:
-                        # String convert the token value
-                        value = unescape(str(curr_token.value))
-                        if destringizer:
-                            try:
-                                value = destringizer(value)
-                            except ValueError:
-                                pass
-                        curr_token = next(tokens)
-                    except Exception:
-                        msg = ("an int, float, string, '[' or string" +
-                               " convertable ASCII value for node id or label")
-                        unexpected(curr_token, msg)
-                elif curr_token.value in {"NAN", "INF"}:
-                    value = float(curr_token.value)
-                    curr_token = next(tokens)
-                else:  # Otherwise error out
-                    unexpected(curr_token, "an int, float, string or '['")
-            dct[key].append(value)
-
-        def clean_dict_value(value):
-            if not isinstance(value, list):
-                return value
-            if len(value) == 1:
-                return value[0]
-            if value[0] == LIST_START_VALUE:
-                return value[1:]
-            return value
-
-        dct = {key: clean_dict_value(value) for key, value in dct.items()}
-        return curr_token, dct
-
-    def parse_graph():
-        curr_token, dct = parse_kv(next(tokens))
-        if curr_token.category is not None:  # EOF
-            unexpected(curr_token, "EOF")
+                        value = destringizer(value)
+                    except ValueError:
+                        pass
+            elif token in ("NAN", "INF"):
+                value = float(token)
+            else:  # Otherwise error out
+                unexpected(match, "an int, float, string or '['")
+            if key in dct:
+                if repeated is None:
+                    repeated = {}
+                values = repeated.get(key)
+                if values is None:
+                    repeated[key] = [dct[key], value]
+                else:
+                    values.append(value)
+            else:
+                dct[key] = value
+            key = None
+
+        if key is not None:
+            unexpected(None, "an int, float, string or '['")
+        if stack:
+            unexpected(None, "']'")
+        dct = end_dict(dct, repeated)
         if "graph" not in dct:
             raise EasyGraphError("input contains no graph")
         graph = dct["graph"]
@@ -342,67 +335,86 @@ def parse_gml_lines(lines, label, destringizer):
             raise EasyGraphError("input contains more than one graph")
         return graph
 
-    tokens = tokenize()
-    graph = parse_graph()
-    directed = graph.pop("directed", False)
-    multigraph = graph.pop("multigraph", False)
-    if not multigraph:
-        G = eg.DiGraph() if directed else eg.Graph()
-    else:
-        G = eg.MultiDiGraph() if directed else eg.MultiGraph()
-    graph_attr = {k: v for k, v in graph.items() if k not in ("node", "edge")}
-    G.graph.update(graph_attr)
-
-    def pop_attr(dct, category, attr, i):
-        try:
-            return dct.pop(attr)
-        except KeyError as err:
-            raise EasyGraphError(
-                f"{category} #{i} has no {attr!r} attribute") from err
-
-    nodes = graph.get("node", [])
-    mapping = {}
-    node_labels = set()
-    for i, node in enumerate(nodes if isinstance(nodes, list) else [nodes]):
-        id = pop_attr(node, "node", "id", i)
-        if id in G:
-            raise EasyGraphError(f"node id {id!r} is duplicated")
-        if label is not None and label != "id":
-            node_label = pop_attr(node, "node", label, i)
-            if node_label in node_labels:
+    def make_graph(graph):
+        directed = graph.pop("directed", False)
+        multigraph = graph.pop("multigraph", False)
+        if not multigraph:
+            G = eg.DiGraph() if directed else eg.Graph()
+        else:
+            G = eg.MultiDiGraph() if directed else eg.MultiGraph()
+        graph_attr = {
+            k: v
+            for k, v in graph.items() if k not in ("node", "edge")
+        }
+        G.graph.update(graph_attr)
+
+        def pop_attr(dct, category, attr, i):
+            try:
+                return dct.pop(attr)
+            except KeyError as err:
                 raise EasyGraphError(
-                    f"node label {node_label!r} is duplicated")
-            node_labels.add(node_label)
+                    f"{category} #{i} has no {attr!r} attribute") from err
+
+        nodes = graph.get("node", [])
+        # nodes are added under their labels, so their ids are mapped for the
+        # edges
+        relabel = label is not None and label != "id"
+        mapping = {}
+        for i, node in enumerate(nodes if isinstance(nodes, list) else [nodes]):
+            id = pop_attr(node, "node", "id", i)
+            if id in mapping:
+                raise EasyGraphError(f"node id {id!r} is duplicated")
+            if relabel:
+                node_label = pop_attr(node, "node", label, i)
+                if node_label in G._node:
+                    raise EasyGraphError(
+                        f"node label {node_label!r} is duplicated")
+            else:
+                node_label = id
             mapping[id] = node_label
-        G.add_node(id, **node)
-
-    edges = graph.get("edge", [])
-    for i, edge in enumerate(edges if isinstance(edges, list) else [edges]):
-        source = pop_attr(edge, "edge", "source", i)
-        target = pop_attr(edge, "edge", "target", i)
-        if source not in G:
-            raise EasyGraphError(f"edge #{i} has undefined source {source!r}")
-        if target not in G:
-            raise EasyGraphError(f"edge #{i} has undefined target {target!r}")
-        if not multigraph:
-            if not G.has_edge(source, target):
-                G.add_edge(source, target, **edge)
+            G._add_one_node(node_label, node)
+
+        edges = graph.get("edge", [])
+        for i, edge in enumerate(edges if isinstance(edges, list) else [edges]):
+            source = pop_attr(edge, "edge", "source", i)
+            target = pop_attr(edge, "edge", "target", i)
+            try:
+                u = mapping[source]
+            except KeyError:
+                raise EasyGraphError(
+                    f"edge #{i} has undefined source {source!r}") from None
+            try:
+                v = mapping[target]
+            except KeyError:
+                raise EasyGraphError(
+                    f"edge #{i} has undefined target {target!r}") from None
+            if not multigraph:
+                if v not in G._adj[u]:
+                    G._add_one_edge(u, v, edge)
+                else:
+                    arrow = "->" if directed else "--"
+                    msg = f"edge #{i} ({source!r}{arrow}{target!r}) is duplicated"
+                    raise EasyGraphError(msg)
             else:
-                arrow = "->" if directed else "--"
-                msg = f"edge #{i} ({source!r}{arrow}{target!r}) is duplicated"
-                raise EasyGraphError(msg)
-        else:
-            key = edge.pop("key", None)
-            if key is not None and G.has_edge(source, target, key):
-                arrow = "->" if directed else "--"
-                msg = f"edge #{i} ({source!r}{arrow}{target!r}, {key!r})"
-                msg2 = 'Hint: If multigraph add "multigraph 1" to file header.'
-                raise EasyGraphError(msg + " is duplicated\n" + msg2)
-            G.add_edge(source, target, key, **edge)
-
-    if label is not None and label != "id":
-        G = eg.relabel_nodes(G, mapping)
-    return G
+                key = edge.pop("key", None)
+                if key is not None and G.has_edge(u, v, key):
+                    arrow = "->" if directed else "--"
+                    msg = f"edge #{i} ({source!r}{arrow}{target!r}, {key!r})"
+                    msg2 = 'Hint: If multigraph add "multigraph 1" to file header.'
+                    raise EasyGraphError(msg + " is duplicated\n" + msg2)
+                G.add_edge(u, v, key, **edge)
+
+        return G
+
+    # The cyclic garbage collector is paused, as in parse_edgelist, since
+    # it would otherwise walk the growing graph as the dicts are allocated.
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return make_graph(parse_graph())
+    finally:
+        if gc_enabled:
+            gc.enable()
 
 
 def generate_gml(G, stringizer=None):
@@ -637,19 +649,11 @@ def read_gml(path, label="label", destringizer=None):
 
     """
 
-    def filter_lines(lines):
-        for line in lines:
-            try:
-                line = line.decode("ascii")
-            except UnicodeDecodeError as err:
-                raise EasyGraphError("input is not ASCII-encoded") from err
-            if not isinstance(line, str):
-                lines = str(lines)
-            if line and line[-1] == "\n":
-                line = line[:-1]
-            yield line
-
-    G = parse_gml_lines(filter_lines(path), label, destringizer)
+    try:
+        text = path.read().decode("ascii")
+    except UnicodeDecodeError as err:
+        raise EasyGraphError("input is not ASCII-encoded") from err
+    G = parse_gml_lines(text, label, destringizer)
     return G
 
 
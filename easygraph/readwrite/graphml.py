@@ -42,6 +42,7 @@ for examples.
 """
 import warnings
 from collections import defaultdict
+from itertools import islice
 
 import easygraph as eg
 from easygraph.utils import open_file
@@ -237,14 +238,16 @@ def generate_graphml(
 def read_graphml(path,
                  node_type=str,
                  edge_key_type=int,
-                 force_multigraph=False):
+                 force_multigraph=False,
+                 stream=False,
+                 attributes=None):
     """Read graph in GraphML format from path.
 
     Parameters
     ----------
     path : file or string
-       File or filename to write.
-       Filenames ending in .gz or .bz2 will be compressed.
+       File or filename to read.
+       Filenames ending in .gz or .bz2 will be uncompressed.
 
     node_type: Python type (default: str)
        Convert node ids to this type
@@ -257,6 +260,17 @@ def read_graphml(path,
        If True, return a multigraph with edge keys. If False (the default)
        return a multigraph when multiedges are in the graph.
 
+    stream : bool (default: False)
+       If True, parse the file incrementally: nodes and edges are added to
+       the graph as soon as their element is read, and the element is then
+       discarded, so the memory used by the XML tree stays bounded whatever
+       the size of the file. Otherwise the whole document is parsed first.
+
+    attributes : collection of strings, optional (default: None)
+       Names of the graph, node and edge attributes to read. The data of
+       the other keys is skipped without being decoded. If None, all the
+       attributes are read.
+
     Returns
     -------
     graph: EasyGraph graph
@@ -293,10 +307,25 @@ def read_graphml(path,
     yEd compressed files ("file.graphmlz" extension) can be read by renaming
     the file to "file.graphml.gz".
 
+    Examples
+    --------
+    >>> G = eg.read_graphml("test.graphml")
+
+    Read a large export incrementally, keeping only the "weight" attribute:
+
+    >>> G = eg.read_graphml("export.graphml.gz", stream=True, attributes=["weight"])
+
     """
-    reader = GraphMLReader(node_type, edge_key_type, force_multigraph)
+    reader = GraphMLReader(node_type,
+                           edge_key_type,
+                           force_multigraph,
+                           attributes=attributes)
     # need to check for multiple graphs
-    glist = list(reader(path=path))
+    if stream:
+        # only the first graph is returned, the rest is not parsed
+        glist = list(islice(reader(path=path, stream=True), 1))
+    else:
+        glist = list(reader(path=path))
     if len(glist) == 0:
         # If no graph comes back, try looking for an incomplete header
         header = b'<graphml xmlns="http://graphml.graphdrawing.org/xmlns">'
@@ -847,16 +876,25 @@ class GraphMLReader(GraphML):
     def __init__(self,
                  node_type=str,
                  edge_key_type=int,
-                 force_multigraph=False):
+                 force_multigraph=False,
+                 attributes=None):
         self.construct_types()
         self.node_type = node_type
         self.edge_key_type = edge_key_type
         self.multigraph = force_multigraph  # If False, test for multiedges
         self.edge_ids = {}  # dict mapping (u,v) tuples to edge id attributes
+        # names of the attributes to decode, None for all
+        self.attributes = None if attributes is None else set(attributes)
+        self.skipped_keys = set()  # ids of the keys not to decode
 
-    def __call__(self, path=None, string=None):
+    def __call__(self, path=None, string=None, stream=False):
         from xml.etree.ElementTree import ElementTree, fromstring
 
+        if stream:
+            if path is None:
+                raise ValueError("Must specify 'path' to stream a file")
+            yield from self.iter_graphs(path)
+            return
         if path is not None:
             self.xml = ElementTree(file=path)
         elif string is not None:
@@ -867,7 +905,63 @@ class GraphMLReader(GraphML):
         for g in self.xml.findall(f"{{{self.NS_GRAPHML}}}graph"):
             yield self.make_graph(g, keys, defaults)
 
-    def make_graph(self, graph_xml, graphml_keys, defaults, G=None):
+    def iter_graphs(self, path):
+        """Parse the document incrementally and yield its graphs.
+
+        Nodes and edges are added as soon as their element is closed, then
+        the element is detached from its graph, so only the elements being
+        read are held in memory.
+        """
+        from xml.etree.ElementTree import iterparse
+
+        ns = f"{{{self.NS_GRAPHML}}}"
+        key_tag, graph_tag, data_tag = f"{ns}key", f"{ns}graph", f"{ns}data"
+        node_tag, edge_tag = f"{ns}node", f"{ns}edge"
+        skipped_keys = self.skipped_keys
+        graphml_keys, defaults = {}, {}
+        root = G = None
+        graphs = []  # the graph elements being read, from the outermost
+        for event, elem in iterparse(path, events=("start", "end")):
+            tag = elem.tag
+            if tag == data_tag:
+                # the data is decoded with its node, edge or graph
+                if event == "end" and elem.get("key") in skipped_keys:
+                    elem.text = None
+                    del elem[:]
+            elif event == "start":
+                if root is None:
+                    root = elem
+                elif tag == graph_tag:
+                    if not graphs:
+                        G = self.start_graph(elem, graphml_keys, defaults)
+                    graphs.append(elem)
+                elif tag == node_tag:
+                    # the nodes of a group are added after the group node
+                    if elem.get("yfiles.foldertype") == "group":
+                        G.add_node(self.node_type(elem.get("id")))
+                elif tag == f"{ns}hyperedge":
+                    raise eg.EasyGraphError(
+                        "GraphML reader doesn't support hyperedges")
+            elif tag == edge_tag:
+                self.add_edge(G, elem, graphml_keys)
+                graphs[-1].remove(elem)
+            elif tag == node_tag:
+                self.add_node(G, elem, graphml_keys, defaults, nested=False)
+                graphs[-1].remove(elem)
+            elif tag == graph_tag:
+                G.graph.update(self.decode_data_elements(graphml_keys, elem))
+                graphs.pop()
+                elem.clear()
+                if not graphs:
+                    root.remove(elem)
+                    yield self.finish_graph(G)
+                    G = None
+            elif tag == key_tag:
+                self.decode_key(elem, graphml_keys, defaults)
+                root.remove(elem)
+
+    def start_graph(self, graph_xml, graphml_keys, defaults, G=None):
+        """Create the graph, or reuse G, and set its default attributes."""
         # set default graph type
         edgedefault = graph_xml.get("edgedefault", None)
         if G is None:
@@ -879,6 +973,8 @@ class GraphMLReader(GraphML):
         G.graph["node_default"] = {}
         G.graph["edge_default"] = {}
         for key_id, value in defaults.items():
+            if key_id in self.skipped_keys:
+                continue
             key_for = graphml_keys[key_id]["for"]
             name = graphml_keys[key_id]["name"]
             python_type = graphml_keys[key_id]["type"]
@@ -886,6 +982,10 @@ class GraphMLReader(GraphML):
                 G.graph["node_default"].update({name: python_type(value)})
             if key_for == "edge":
                 G.graph["edge_default"].update({name: python_type(value)})
+        return G
+
+    def make_graph(self, graph_xml, graphml_keys, defaults, G=None):
+        G = self.start_graph(graph_xml, graphml_keys, defaults, G)
         # hyperedges are not supported
         hyperedge = graph_xml.find(f"{{{self.NS_GRAPHML}}}hyperedge")
         if hyperedge is not None:
@@ -900,8 +1000,10 @@ class GraphMLReader(GraphML):
         # add graph data
         data = self.decode_data_elements(graphml_keys, graph_xml)
         G.graph.update(data)
+        return self.finish_graph(G)
 
-        # switch to Graph or DiGraph if no parallel edges were found
+    def finish_graph(self, G):
+        """Switch to Graph or DiGraph if no parallel edges were found."""
         if self.multigraph:
             return G
 
@@ -910,7 +1012,7 @@ class GraphMLReader(GraphML):
         eg.set_edge_attributes(G, values=self.edge_ids, name="id")
         return G
 
-    def add_node(self, G, node_xml, graphml_keys, defaults):
+    def add_node(self, G, node_xml, graphml_keys, defaults, nested=True):
         """Add a node to the graph."""
         # warn on finding unsupported ports tag
         ports = node_xml.find(f"{{{self.NS_GRAPHML}}}port")
@@ -922,7 +1024,7 @@ class GraphMLReader(GraphML):
         data = self.decode_data_elements(graphml_keys, node_xml)
         G.add_node(node_id, **data)
         # get child nodes
-        if node_xml.attrib.get("yfiles.foldertype") == "group":
+        if nested and node_xml.attrib.get("yfiles.foldertype") == "group":
             graph_xml = node_xml.find(f"{{{self.NS_GRAPHML}}}graph")
             self.make_graph(graph_xml, graphml_keys, defaults, G)
 
@@ -970,8 +1072,11 @@ class GraphMLReader(GraphML):
     def decode_data_elements(self, graphml_keys, obj_xml):
         """Use the key information to decode the data XML if present."""
         data = {}
+        skipped_keys = self.skipped_keys
         for data_element in obj_xml.findall(f"{{{self.NS_GRAPHML}}}data"):
             key = data_element.get("key")
+            if key in skipped_keys:
+                continue
             try:
                 data_name = graphml_keys[key]["name"]
                 data_type = graphml_keys[key]["type"]
@@ -1033,31 +1138,37 @@ class GraphMLReader(GraphML):
         graphml_keys = {}
         graphml_key_defaults = {}
         for k in graph_element.findall(f"{{{self.NS_GRAPHML}}}key"):
-            attr_id = k.get("id")
-            attr_type = k.get("attr.type")
-            attr_name = k.get("attr.name")
-            yfiles_type = k.get("yfiles.type")
-            if yfiles_type is not None:
-                attr_name = yfiles_type
-                attr_type = "yfiles"
-            if attr_type is None:
-                attr_type = "string"
-                warnings.warn(f"No key type for id {attr_id}. Using string")
-            if attr_name is None:
-                raise eg.EasyGraphError(f"Unknown key for id {attr_id}.")
-            graphml_keys[attr_id] = {
-                "name": attr_name,
-                "type": self.python_type[attr_type],
-                "for": k.get("for"),
-            }
-            # check for "default" sub-element of key element
-            default = k.find(f"{{{self.NS_GRAPHML}}}default")
-            if default is not None:
-                # Handle default values identically to data element values
-                python_type = graphml_keys[attr_id]["type"]
-                if python_type == bool:
-                    graphml_key_defaults[attr_id] = self.convert_bool[
-                        default.text.lower()]
-                else:
-                    graphml_key_defaults[attr_id] = python_type(default.text)
+            self.decode_key(k, graphml_keys, graphml_key_defaults)
         return graphml_keys, graphml_key_defaults
+
+    def decode_key(self, k, graphml_keys, graphml_key_defaults):
+        """Add the key element k to the keys and key defaults."""
+        attr_id = k.get("id")
+        attr_type = k.get("attr.type")
+        attr_name = k.get("attr.name")
+        yfiles_type = k.get("yfiles.type")
+        if yfiles_type is not None:
+            attr_name = yfiles_type
+            attr_type = "yfiles"
+        if attr_type is None:
+            attr_type = "string"
+            warnings.warn(f"No key type for id {attr_id}. Using string")
+        if attr_name is None:
+            raise eg.EasyGraphError(f"Unknown key for id {attr_id}.")
+        graphml_keys[attr_id] = {
+            "name": attr_name,
+            "type": self.python_type[attr_type],
+            "for": k.get("for"),
+        }
+        if self.attributes is not None and attr_name not in self.attributes:
+            self.skipped_keys.add(attr_id)
+        # check for "default" sub-element of key element
+        default = k.find(f"{{{self.NS_GRAPHML}}}default")
+        if default is not None:
+            # Handle default values identically to data element values
+            python_type = graphml_keys[attr_id]["type"]
+            if python_type == bool:
+                graphml_key_defaults[attr_id] = self.convert_bool[
+                    default.text.lower()]
+            else:
+                graphml_key_defaults[attr_id] = python_type(default.text)
@@ -0,0 +1,96 @@
+"""
+binary read / write tests
+"""
+import os
+import tempfile
+
+import pytest
+import easygraph as eg
+
+np = pytest.importorskip("numpy")
+
+
+class TestBinary:
+
+    def setup_method(self):
+        self.G = eg.Graph(name="test")
+        self.G.add_edges([("a", "b"), ("b", "c"), ("c", "c")],
+                         edges_attr=[{
+                             "weight": 2.5,
+                             "label": "x"
+                         }, {
+                             "weight": 1.0
+                         }, {
+                             "color": (1, 2)
+                         }])
+        self.G.add_node("z", size=3)
+        self.DG = eg.DiGraph()
+        self.DG.add_edges([(3, 1), (1, 2), (2, 3)],
+                          edges_attr=[{
+                              "weight": w
+                          } for w in [1, 2, 3]])
+        (fd, self.fname) = tempfile.mkstemp()
+        os.close(fd)
+
+    def teardown_method(self):
+        os.unlink(self.fname)
+
+    def test_read_csr(self):
+        eg.write_binary(self.G, self.fname)
+        csr = eg.read_binary(self.fname, allow_pickle=True)
+        assert list(csr.nodes) == ["a", "b", "c", "z"]
+        assert not csr.is_directed()
+        assert csr.indptr.tolist() == [0, 1, 3, 5, 5]
+        assert csr.weights.tolist() == [2.5, 2.5, 1.0, 1.0, 1.0]
+        assert csr.edge_attrs["label"] == ["x", "x", None, None, None]
+        assert csr.edge_attrs["color"][4] == (1, 2)
+        assert csr.node_attrs["size"][3] == 3
+        assert csr.graph == {"name": "test"}
+        assert eg.single_source_dijkstra(csr, "a") == {
+            "a": 0,
+            "b": 2.5,
+            "c": 3.5
+        }
+
+    @pytest.mark.parametrize("mmap", [True, False])
+    def test_round_trip(self, mmap):
+        for G in (self.G, self.DG):
+            eg.write_binary(G, self.fname)
+            H = eg.read_binary(self.fname,
+                               mmap=mmap,
+                               create_using=type(G),
+                               allow_pickle=True)
+            assert H.nodes == G.nodes
+            assert sorted(H.edges) == sorted(G.edges)
+            assert H.graph == G.graph
+
+    def test_write_csr(self):
+        eg.write_binary(self.DG.freeze_csr(), self.fname)
+        csr = eg.read_binary(self.fname, weight=None)
+        assert csr.is_directed()
+        assert csr.weights.tolist() == [1, 1, 1]
+        assert csr.edge_attrs["weight"].tolist() == [1, 2, 3]
+
+    def test_not_binary(self):
+        with open(self.fname, "w") as f:
+            f.write("1 2\n")
+        with pytest.raises(eg.EasyGraphError):
+            eg.read_binary(self.fname, mmap=False)
+
+    def test_pickle(self):
+        # the tuple attributes are pickled, and only read if allowed
+        self.DG.graph["size"] = (3, 3)
+        for G in (self.G, self.DG):
+            eg.write_binary(G, self.fname)
+            with pytest.raises(eg.EasyGraphError):
+                eg.read_binary(self.fname)
+        assert eg.read_binary(self.fname,
+                              allow_pickle=True).graph == {"size": (3, 3)}
+        eg.write_binary(eg.Graph([((0, 1), 2)]), self.fname)
+        with pytest.raises(eg.EasyGraphError):
+            eg.read_binary(self.fname, create_using=eg.Graph)
+        del self.DG.graph["size"]
+        eg.write_binary(self.DG, self.fname)
+        assert eg.read_binary(self.fname).edge_attrs["weight"].tolist() == [
+            1, 2, 3
+        ]
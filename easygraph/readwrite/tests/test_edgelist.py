@@ -0,0 +1,147 @@
+"""
+edge list read / write tests
+"""
+import io
+import os
+import tempfile
+
+import pytest
+import easygraph as eg
+
+
+class TestEdgelist:
+
+    def setup_method(self):
+        self.G = eg.Graph()
+        self.G.add_edges([(1, 2), (2, 3), (3, 1)],
+                         edges_attr=[{
+                             "weight": 1.5,
+                             "color": "red"
+                         }, {
+                             "weight": 2
+                         }, {}])
+        self.DG = eg.DiGraph()
+        self.DG.add_edges([(1, 2), (2, 1), (2, 3)])
+        self.dir = tempfile.mkdtemp()
+
+    def teardown_method(self):
+        for name in os.listdir(self.dir):
+            os.unlink(os.path.join(self.dir, name))
+        os.rmdir(self.dir)
+
+    def test_parse_edgelist_no_data(self):
+        lines = ["1 2", "# comment", "", "2 3 # trailing", "3 4"]
+        G = eg.parse_edgelist(lines, nodetype=int)
+        assert list(G) == [1, 2, 3, 4]
+        assert G.edges == [(1, 2, {}), (2, 3, {}), (3, 4, {})]
+
+    def test_parse_edgelist_dict_data(self):
+        lines = ["1 2 {'weight': 3}", "2 3 {'weight': 27}", "3 4"]
+        G = eg.parse_edgelist(lines, nodetype=int)
+        assert G.edges == [(1, 2, {
+            "weight": 3
+        }), (2, 3, {
+            "weight": 27
+        }), (3, 4, {})]
+        with pytest.raises(TypeError):
+            eg.parse_edgelist(["1 2 {'weight': x}"])
+
+    def test_parse_edgelist_typed_data(self):
+        lines = ["a,b,3,x", "b,c,27,y", "c,d"]
+        G = eg.parse_edgelist(lines,
+                              delimiter=",",
+                              data=(("weight", float), ("label", str)))
+        assert G.edges == [("a", "b", {
+            "weight": 3.0,
+            "label": "x"
+        }), ("b", "c", {
+            "weight": 27.0,
+            "label": "y"
+        }), ("c", "d", {})]
+        with pytest.raises(IndexError):
+            eg.parse_edgelist(["1 2 3 4"], data=(("weight", float),))
+        with pytest.raises(TypeError):
+            eg.parse_edgelist(["1 2 z"], data=(("weight", float),))
+        with pytest.raises(TypeError):
+            eg.parse_edgelist(["1 a"], nodetype=int)
+
+    def test_parse_edgelist_batches(self):
+        lines = ["%d %d %d" % (i, i + 1, i) for i in range(100)]
+        G = eg.parse_edgelist(iter(lines),
+                              nodetype=int,
+                              data=(("weight", int),),
+                              batch_size=7)
+        assert len(G) == 101
+        assert all(G[i][i + 1] == {"weight": i} for i in range(100))
+
+    def test_generate_edgelist(self):
+        assert list(eg.generate_edgelist(self.G, data=False)) == [
+            "1 2", "1 3", "2 3"
+        ]
+        assert list(eg.generate_edgelist(self.G, data=["weight"])) == [
+            "1 2 1.5", "1 3", "2 3 2"
+        ]
+        assert list(eg.generate_edgelist(self.G))[0] == (
+            "1 2 {'weight': 1.5, 'color': 'red'}")
+
+    @pytest.mark.parametrize("ext", ["", ".gz", ".bz2"])
+    def test_write_read(self, ext):
+        fname = os.path.join(self.dir, "test.edgelist" + ext)
+        eg.write_edgelist(self.G, fname, batch_size=2)
+        H = eg.read_edgelist(fname, nodetype=int, batch_size=2)
+        assert H.edges == self.G.edges
+        eg.write_edgelist(self.G, fname, delimiter="\t", data=["weight"])
+        H = eg.read_edgelist(fname,
+                             delimiter="\t",
+                             nodetype=int,
+                             data=(("weight", float),))
+        assert H.edges == [(1, 2, {
+            "weight": 1.5
+        }), (1, 3, {}), (2, 3, {
+            "weight": 2.0
+        })]
+
+    def test_read_file_object(self):
+        fh = io.BytesIO("# edges\n1 2\r\n2 3\né è\n".encode("utf-8"))
+        G = eg.read_edgelist(fh)
+        assert G.edges == [("1", "2", {}), ("2", "3", {}),
+                           ("é", "è", {})]
+        assert not fh.closed
+
+    def test_read_create_using(self):
+        fname = os.path.join(self.dir, "test.edgelist")
+        eg.write_edgelist(self.DG, fname, data=False)
+        H = eg.read_edgelist(fname, nodetype=int, create_using=eg.DiGraph)
+        assert H.is_directed()
+        assert sorted((u, v) for u, v, _ in H.edges) == [(1, 2), (2, 1),
+                                                         (2, 3)]
+
+    def test_parse_edgelist_multigraph(self):
+        lines = ['1 2 {"weight":3}', '1 2 {"weight":4}', "2 3"]
+        G = eg.parse_edgelist(lines, nodetype=int, create_using=eg.MultiGraph)
+        assert G.edges == [(1, 2, 0, {
+            "weight": 3
+        }), (1, 2, 1, {
+            "weight": 4
+        }), (2, 3, 0, {})]
+        G = eg.parse_edgelist(lines, nodetype=int)
+        assert G.edges == [(1, 2, {"weight": 4}), (2, 3, {})]
+        with pytest.raises(ValueError):
+            eg.parse_edgelist(["1 2"], nodetype=lambda s: None)
+
+    @pytest.mark.parametrize("graph_type", [eg.MultiGraph, eg.MultiDiGraph])
+    def test_read_multigraph(self, graph_type):
+        fname = os.path.join(self.dir, "test.edgelist")
+        with open(fname, "w") as f:
+            f.write("1 2 5\n2 1 6\n1 2 7\n2 3 8\n")
+        G = eg.read_edgelist(fname,
+                             nodetype=int,
+                             create_using=graph_type,
+                             data=(("weight", int),),
+                             batch_size=2)
+        assert G.is_multigraph()
+        assert sorted(d["weight"] for _, _, _, d in G.edges) == [5, 6, 7, 8]
+        if G.is_directed():
+            assert len(G[1][2]) == 2 and len(G[2][1]) == 1
+        else:
+            assert len(G[1][2]) == 3
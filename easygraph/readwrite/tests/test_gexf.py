@@ -458,3 +458,88 @@ gexf.net/1.2draft http://www.gexf.net/1.2draft/gexf.xsd" version="1.2">
         assert sorted(G.nodes) == sorted(H.nodes)
         assert sorted(sorted(e)
                       for e in G.edges) == sorted(sorted(e) for e in H.edges)
+
+    def test_stream_read(self):
+        for fh in (self.attribute_fh, self.simple_undirected_fh):
+            G = eg.read_gexf(fh)
+            fh.seek(0)
+            H = eg.read_gexf(fh, stream=True)
+            fh.seek(0)
+            assert G.graph == H.graph
+            assert dict(G.nodes) == dict(H.nodes)
+            assert G.edges == H.edges
+        fh = io.BytesIO(b"<gexf><graph><nodes /></graph></gexf>")
+        pytest.raises(eg.EasyGraphError, eg.read_gexf, fh, stream=True)
+
+    def test_stream_read_subnodes(self):
+        data = """<?xml version="1.0" encoding="UTF-8"?>
+<gexf xmlns="http://www.gexf.net/1.1draft" version="1.1">
+  <graph defaultedgetype="directed">
+    <nodes>
+      <node id="0" label="a">
+        <nodes>
+          <node id="1" label="b" />
+          <node id="2" label="c" />
+        </nodes>
+      </node>
+      <node id="3" label="d" />
+    </nodes>
+    <edges>
+      <edge id="0" source="1" target="2" />
+    </edges>
+  </graph>
+</gexf>
+"""
+        G = eg.read_gexf(io.BytesIO(data.encode("UTF-8")), stream=True)
+        assert sorted(G.nodes) == ["0", "1", "2", "3"]
+        assert G.nodes["2"]["pid"] == "0"
+        assert G.edges == [("1", "2", {"id": "0"})]
+
+    @pytest.mark.parametrize("prettyprint", [True, False])
+    def test_stream_write(self, prettyprint):
+        G = eg.MultiDiGraph()
+        G.add_node(0,
+                   label="a",
+                   spells=[(1, 2), (3, 4)],
+                   viz={
+                       "size": 2.0,
+                       "position": {
+                           "x": 0.0,
+                           "y": 1.0,
+                           "z": 2.0
+                       }
+                   },
+                   score=[(1.5, 1, 2), (2.5, 2, 3)],
+                   name='x<y&"z')
+        G.add_node(1, label="b", start=1, end=5, flag=True)
+        G.add_edge(0, 1, weight=2.0, start=1, end=3, color="red")
+        G.add_edge(0, 1, spells=[(2, 3)], rank=[(1, 2, 3)])
+        fh = io.BytesIO()
+        eg.write_gexf(G, fh, prettyprint=prettyprint)
+        tree = fh.getvalue()
+        fh = io.BytesIO()
+        eg.write_gexf(G, fh, prettyprint=prettyprint, stream=True)
+        # the same document, up to where the viz namespace is declared
+        assert tree.split(b"<meta")[1] == fh.getvalue().split(b"<meta")[1]
+        fh.seek(0)
+        H = eg.read_gexf(fh, node_type=int, stream=True)
+        assert H.graph["mode"] == "dynamic"
+        assert H.nodes[0]["score"] == [(1.5, 1, 2), (2.5, 2, 3)]
+        assert H.nodes[0]["spells"] == [(1, 2), (3, 4)]
+        assert H.nodes[0]["viz"]["position"] == {"x": 0.0, "y": 1.0, "z": 2.0}
+        assert H.nodes[0]["name"] == 'x<y&"z'
+        assert H.nodes[1]["start"] == 1 and H.nodes[1]["flag"] is True
+        assert [d for u, v, k, d in H.edges] == [
+            {
+                "color": "red",
+                "start": 1,
+                "end": 3,
+                "id": "0",
+                "weight": 2.0
+            },
+            {
+                "rank": [(1, 2, 3)],
+                "spells": [(2, 3)],
+                "id": "1"
+            },
+        ]
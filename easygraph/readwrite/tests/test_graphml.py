@@ -1073,6 +1073,10 @@ line2]]></data>
         assert len(data) == 9
         for node_data in data:
             assert node_data["CustomProperty"] != ""
+        fh.seek(0)
+        H = eg.read_graphml(fh, stream=True)
+        assert list(H.nodes.items()) == list(G.nodes.items())
+        assert H.edges == G.edges
 
     def test_long_attribute_type(self):
         # test that graphs with attr.type="long" (as produced by botch and
@@ -1098,6 +1102,75 @@ line2]]></data>
         assert sorted(H.nodes.items()) == expected
 
 
+class TestStreamGraphML(BaseGraphML):
+
+    @pytest.mark.parametrize("name", [
+        "simple_directed", "simple_undirected", "attribute",
+        "node_attribute_default", "attribute_named_key_ids",
+        "undirected_multigraph",
+        "undirected_multigraph_no_multiedge",
+        "multigraph_only_ids_for_multiedges"
+    ])
+    def test_same_as_tree(self, name):
+        fh = getattr(self, name + "_fh")
+        G = eg.read_graphml(fh)
+        fh.seek(0)
+        H = eg.read_graphml(fh, stream=True)
+        fh.seek(0)
+        assert type(H) is type(G)
+        assert list(H.nodes.items()) == list(G.nodes.items())
+        assert H.edges == G.edges
+        assert H.graph == G.graph
+
+    def test_attributes(self):
+        for stream in (False, True):
+            G = eg.read_graphml(self.attribute_fh,
+                                stream=stream,
+                                attributes=["weight"])
+            self.attribute_fh.seek(0)
+            assert G.graph == {"node_default": {}, "edge_default": {}}
+            assert all(data == {} for data in G.nodes.values())
+            assert sorted(d["weight"] for _, _, d in G.edges
+                          if "weight" in d) == [1.0, 1.0, 1.1, 2.0]
+            assert sorted(d["id"] for _, _, d in G.edges)[0] == "e0"
+
+    def test_file(self):
+        fd, fname = tempfile.mkstemp(suffix=".graphml.gz")
+        os.close(fd)
+        try:
+            eg.write_graphml(self.simple_directed_graph, fname)
+            G = eg.read_graphml(fname, stream=True)
+            assert sorted(G.edges) == sorted(self.simple_directed_graph.edges)
+        finally:
+            os.unlink(fname)
+
+    def test_multiple_graphs(self):
+        s = """<?xml version="1.0" encoding="UTF-8"?>
+<graphml xmlns="http://graphml.graphdrawing.org/xmlns">
+  <graph id="G" edgedefault="undirected">
+    <node id="a"/><node id="b"/><edge source="a" target="b"/>
+  </graph>
+  <graph id="H" edgedefault="directed">
+    <edge source="c" target="d"/>
+  </graph>
+</graphml>"""
+        reader = eg.GraphMLReader()
+        graphs = list(reader(path=io.BytesIO(s.encode("UTF-8")), stream=True))
+        assert [sorted(G.nodes) for G in graphs] == [["a", "b"], ["c", "d"]]
+        assert [G.is_directed() for G in graphs] == [False, True]
+
+    def test_hyperedge_raise(self):
+        s = """<?xml version="1.0" encoding="UTF-8"?>
+<graphml xmlns="http://graphml.graphdrawing.org/xmlns">
+  <graph id="G" edgedefault="directed">
+    <node id="n0"/><node id="n1"/>
+    <hyperedge><endpoint node="n0"/><endpoint node="n1"/></hyperedge>
+  </graph>
+</graphml>"""
+        fh = io.BytesIO(s.encode("UTF-8"))
+        pytest.raises(eg.EasyGraphError, eg.read_graphml, fh, stream=True)
+
+
 class TestWriteGraphML(BaseGraphML):
     writer = staticmethod(eg.write_graphml_lxml)
 
@@ -85,5 +85,214 @@ class TestConvertScipy:
         data = sp.sparse.csr_matrix([[0,1,1],[1,0,1],[1,1,0]])
         G = eg.from_scipy_sparse_matrix(data)
         self.assert_equal(self.G1, G)
-    
-       
\ No newline at end of file
+
+    @pytest.mark.parametrize("graph_type", [eg.Graph, eg.DiGraph])
+    def test_to_scipy_sparse_array(self, graph_type):
+        G = graph_type()
+        G.add_edges([(1, 2), (2, 3), (3, 1), (3, 3), (4, 1)],
+                    edges_attr=[{"weight": w} for w in [2, 3, 4, 5, 6]])
+        G.add_node(5)
+        A = eg.to_scipy_sparse_array(G)
+        assert A.format == "csr"
+        np.testing.assert_array_equal(A.toarray(), eg.to_numpy_array(G))
+        A = eg.to_scipy_sparse_array(G, weight=None, format="coo")
+        assert A.format == "coo"
+        np.testing.assert_array_equal(A.toarray(),
+                                      eg.to_numpy_array(G, weight=None))
+        # induced subgraph in the order of the nodelist
+        A = eg.to_scipy_sparse_array(G, nodelist=[3, 1], dtype=int)
+        np.testing.assert_array_equal(A.toarray(),
+                                      eg.to_numpy_array(G)[[2, 0]][:, [2, 0]])
+        A = eg.to_scipy_sparse_array(eg.CSRGraph.from_graph(G),
+                                     nodelist=[3, 1])
+        np.testing.assert_array_equal(A.toarray(),
+                                      eg.to_numpy_array(G)[[2, 0]][:, [2, 0]])
+        with pytest.raises(eg.EasyGraphError):
+            eg.to_scipy_sparse_array(G, nodelist=[1, 6])
+        with pytest.raises(eg.EasyGraphError):
+            eg.to_scipy_sparse_array(G, nodelist=[1, 1])
+
+    def test_to_scipy_sparse_array_multigraph(self):
+        G = eg.MultiDiGraph()
+        G.add_edge(0, 1, weight=2)
+        G.add_edge(1, 0)
+        G.add_edge(2, 2, weight=3)
+        G.add_edge(2, 2)
+        A = eg.to_scipy_sparse_array(G)
+        np.testing.assert_array_equal(A.toarray(),
+                                      [[0, 2, 0], [1, 0, 0], [0, 0, 4]])
+        A = eg.to_scipy_sparse_array(G, weight=None)
+        np.testing.assert_array_equal(A.toarray(),
+                                      [[0, 1, 0], [1, 0, 0], [0, 0, 2]])
+
+       
+    def test_from_edgelist_types(self):
+        df = pd.DataFrame({
+            "source": [1, 2, 3],
+            "target": [2, 3, 1],
+            "weight": [1.5, 2.0, 3.0],
+            "count": [4, 5, 6],
+        })
+        G = eg.from_pandas_edgelist(df, edge_attr=True)
+        assert G[1][2] == {"weight": 1.5, "count": 4}
+        assert type(G[1][2]["count"]) is int
+        assert type(next(iter(G.nodes))) is int
+        G = eg.from_pandas_edgelist(df, edge_attr="count",
+                                    create_using=eg.DiGraph)
+        assert G.edges == [(1, 2, {"count": 4}), (2, 3, {"count": 5}),
+                           (3, 1, {"count": 6})]
+        pytest.raises(eg.EasyGraphError, eg.from_pandas_edgelist, df,
+                      edge_attr="missing")
+
+    def test_from_edgelist_multigraph_keys(self):
+        df = pd.DataFrame({
+            "source": [0, 1, 0],
+            "target": [2, 2, 2],
+            "key": ["A", "B", "C"],
+            "weight": [3, 4, 6],
+        })
+        G = eg.from_pandas_edgelist(df,
+                                    edge_attr="weight",
+                                    edge_key="key",
+                                    create_using=eg.MultiGraph())
+        assert dict(G[0][2]) == {"A": {"weight": 3}, "C": {"weight": 6}}
+
+    def test_to_edgelist_roundtrip(self):
+        G = eg.Graph()
+        G.add_edges([("A", "B"), ("C", "E")],
+                    edges_attr=[{"cost": 1, "weight": 7}, {"cost": 9}])
+        df = eg.to_pandas_edgelist(G)
+        assert list(df.columns) == ["source", "target", "cost", "weight"]
+        assert df["cost"].tolist() == [1, 9]
+        assert df["weight"].isna().tolist() == [False, True]
+        H = eg.from_pandas_edgelist(df, edge_attr="cost")
+        self.assert_equal(G, H)
+        assert H["E"]["C"] == {"cost": 9}
+
+        csr = G.freeze_csr()
+        df = eg.to_pandas_edgelist(csr, source="u", target="v")
+        assert sorted(df["u"] + df["v"]) == ["AB", "CE"]
+        assert df["weight"].tolist() == [7.0, 1.0]
+
+    def test_csr_from_edge_arrays(self):
+        df = pd.DataFrame({
+            "source": ["a", "b", "b", "a"],
+            "target": ["b", "c", "a", "c"],
+            "weight": [1.0, 2.0, 3.0, 4.0],
+        })
+        csr = eg.CSRGraph.from_edge_arrays(df["source"], df["target"],
+                                           df["weight"],
+                                           edge_attrs={"row": df.index})
+        assert csr.nodes == ["a", "b", "c"]
+        assert csr.indptr.tolist() == [0, 2, 4, 6]
+        assert csr.indices.tolist() == [1, 2, 0, 2, 0, 1]
+        # (b, a) is the last row of the edge a -- b
+        assert csr.weights.tolist() == [3.0, 4.0, 3.0, 2.0, 4.0, 2.0]
+        assert csr.edge_attrs["row"].tolist() == [2, 3, 2, 1, 3, 1]
+        assert csr.number_of_edges() == 3
+        csr = eg.CSRGraph.from_edge_arrays(df["source"],
+                                           df["target"],
+                                           directed=True)
+        assert csr.indices.tolist() == [1, 2, 0, 2]
+        assert csr.number_of_edges() == 4
+
+
+class _ArrowColumn:
+    # the parts of pyarrow.ChunkedArray used by from_arrow
+
+    def __init__(self, values):
+        self.values = values
+        self.null_count = values.count(None)
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.values, dtype=dtype)
+
+    def to_numpy(self):
+        return np.asarray(self.values)
+
+    def to_pylist(self):
+        return list(self.values)
+
+
+class _ArrowTable:
+    # the parts of pyarrow.Table used by from_arrow
+
+    def __init__(self, columns):
+        self.columns = {k: _ArrowColumn(v) for k, v in columns.items()}
+        self.column_names = list(columns)
+
+    def column(self, name):
+        return self.columns[name]
+
+
+class TestArrowColumns:
+    # runs the Arrow input path without pyarrow
+    def setup_method(self):
+        self.table = _ArrowTable({
+            "source": [0, 1, 1],
+            "target": [1, 2, 0],
+            "weight": [3.0, None, 5.0],
+        })
+
+    def test_from_arrow(self):
+        G = eg.from_arrow(self.table, edge_attr=True, create_using=eg.DiGraph)
+        assert G.edges == [(0, 1, {"weight": 3.0}), (1, 2, {}),
+                           (1, 0, {"weight": 5.0})]
+        pytest.raises(eg.EasyGraphError, eg.from_arrow, self.table,
+                      edge_attr="missing")
+
+    def test_csr_from_edge_arrays(self):
+        table = _ArrowTable({
+            "source": [0, 1, 1],
+            "target": [1, 2, 0],
+            "weight": [3.0, 4.0, 5.0],
+        })
+        csr = eg.CSRGraph.from_edge_arrays(table.column("source"),
+                                           table.column("target"),
+                                           table.column("weight"))
+        assert csr.nodes == [0, 1, 2]
+        assert csr.indptr.tolist() == [0, 1, 3, 4]
+        assert csr.weights.tolist() == [5.0, 5.0, 4.0, 4.0]
+
+
+class TestConvertArrow:
+    def setup_method(self):
+        self.pa = pytest.importorskip("pyarrow")
+
+    def test_roundtrip(self):
+        G = eg.DiGraph()
+        G.add_edges([(1, 2), (2, 3)],
+                    edges_attr=[{"weight": 1.5, "color": "red"}, {"weight": 2.0}])
+        table = eg.to_arrow(G)
+        assert table.column_names == ["source", "target", "weight", "color"]
+        assert table.column("color").null_count == 1
+        H = eg.from_arrow(table, edge_attr=True, create_using=eg.DiGraph)
+        assert H.edges == G.edges
+        H = eg.from_arrow(table)
+        assert H.edges == [(1, 2, {}), (2, 3, {})]
+
+    def test_multigraph_keys(self):
+        table = self.pa.table({
+            "source": [0, 0],
+            "target": [1, 1],
+            "key": ["x", "y"],
+            "weight": [1, 2],
+        })
+        G = eg.from_arrow(table,
+                          edge_attr="weight",
+                          edge_key="key",
+                          create_using=eg.MultiGraph)
+        assert dict(G[0][1]) == {"x": {"weight": 1}, "y": {"weight": 2}}
+        pytest.raises(eg.EasyGraphError, eg.from_arrow, table,
+                      edge_attr="missing")
+
+    def test_csr_from_edge_arrays(self):
+        table = self.pa.table({
+            "source": [0, 1, 1],
+            "target": [1, 2, 0],
+            "weight": [3.0, None, 5.0],
+        })
+        csr = eg.CSRGraph.from_edge_arrays(table["source"], table["target"],
+                                           table["weight"].fill_null(1))
+        assert csr.nodes == [0, 1, 2]
+        assert csr.weights.tolist() == [5.0, 5.0, 1.0, 1.0]
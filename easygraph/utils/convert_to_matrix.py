@@ -1,12 +1,17 @@
 import easygraph as eg
+import gc
 import itertools
 
 __all__ = [
     "to_numpy_matrix",
     "from_numpy_array",
     "to_numpy_array",
+    "to_scipy_sparse_array",
     "from_pandas_adjacency",
     "from_pandas_edgelist",
+    "to_pandas_edgelist",
+    "from_arrow",
+    "to_arrow",
     "from_scipy_sparse_matrix",
 ]
 
@@ -149,6 +154,11 @@ def from_numpy_array(A, parallel_edges=False, create_using=None):
 
     # Make sure we get even the isolated nodes of the graph.
     G.add_nodes_from(range(n))
+    if python_type in (float, int, bool, complex) and not G.is_multigraph():
+        # Weights of a simple graph go in directly as columns
+        rows, cols = A.nonzero()
+        G.add_edges_from_arrays(rows, cols, weights=A[rows, cols])
+        return G
     # Get a list of all the entries in the array with nonzero entries. These
     # coordinates become edges in the graph. (convert to int from np.int64)
     edges = ((int(e[0]), int(e[1])) for e in zip(*A.nonzero()))
@@ -382,6 +392,158 @@ def to_numpy_array(
     A = np.asarray(A, dtype=dtype)
     return A
 
+
+def to_scipy_sparse_array(G,
+                          nodelist=None,
+                          dtype=None,
+                          weight="weight",
+                          format="csr"):
+    """Returns the graph adjacency matrix as a SciPy sparse array.
+
+    Unlike `to_numpy_array`, the memory used is proportional to the number of
+    edges rather than the square of the number of nodes, so this is the
+    conversion to use for large sparse graphs.
+
+    Parameters
+    ----------
+    G : graph
+        The EasyGraph graph used to construct the sparse array.
+
+    nodelist : list, optional
+        The rows and columns are ordered according to the nodes in `nodelist`.
+        If `nodelist` is None, then the ordering is produced by G.nodes().
+
+    dtype : NumPy data type, optional
+        A valid NumPy dtype used to initialize the array. If None, then
+        numpy.float64 is used.
+
+    weight : string or None optional (default = 'weight')
+        The edge attribute that holds the numerical value used for
+        the edge weight. If an edge does not have that attribute, or if
+        `weight` is None, then the value 1 is used instead.
+
+    format : str in {'bsr', 'csr', 'csc', 'coo', 'lil', 'dia', 'dok'}
+        The type of the sparse array to be returned (default 'csr').
+
+    Returns
+    -------
+    A : SciPy sparse array
+        Graph adjacency matrix. A ``scipy.sparse`` matrix is returned instead
+        with SciPy versions that have no sparse arrays (< 1.8).
+
+    See Also
+    --------
+    to_numpy_array, from_scipy_sparse_array
+
+    Notes
+    -----
+    The entries follow the conventions of `to_numpy_array`: entry i,j of a
+    directed graph is the edge from i to j, self-loops are stored once on the
+    diagonal, and the weights of parallel edges in multigraphs are summed.
+
+    When `nodelist` does not contain every node in `G`, the adjacency matrix
+    is built from the subgraph of `G` that is induced by the nodes in
+    `nodelist`.
+
+    The arrays are filled by one pass over the adjacency of `G`, in the order
+    of `nodelist`, so the result is built in CSR form directly.
+
+    Examples
+    --------
+    >>> G = eg.MultiDiGraph()
+    >>> G.add_edge(0, 1, weight=2)
+    0
+    >>> G.add_edge(1, 0)
+    0
+    >>> G.add_edge(2, 2, weight=3)
+    0
+    >>> G.add_edge(2, 2)
+    1
+    >>> S = eg.to_scipy_sparse_array(G, nodelist=[0, 1, 2])
+    >>> S.toarray()
+    array([[0., 2., 0.],
+           [1., 0., 0.],
+           [0., 0., 4.]])
+
+    """
+    import numpy as np
+    import scipy.sparse as sp
+
+    csr_array = getattr(sp, "csr_array", sp.csr_matrix)
+    dtype = np.float64 if dtype is None else np.dtype(dtype)
+    if nodelist is None:
+        nodelist = list(G)
+        nlen = len(nodelist)
+        index = None
+    else:
+        nlen = len(nodelist)
+        for n in nodelist:
+            if n not in G:
+                raise eg.EasyGraphError(f"Node {n} in nodelist is not in G")
+        index = dict(zip(nodelist, range(nlen)))
+        if len(index) != nlen:
+            raise eg.EasyGraphError("nodelist contains duplicates.")
+
+    if isinstance(G, eg.CSRGraph):
+        A = G.to_scipy_sparse()
+        if weight is None:
+            A.data = np.ones_like(A.data)
+        elif weight != G.weight:
+            raise eg.EasyGraphError(
+                f"CSRGraph holds the weights '{G.weight}', not '{weight}'")
+        A = csr_array(A, dtype=dtype)
+        if index is not None:
+            positions = np.fromiter((G.index_of(n) for n in nodelist),
+                                    dtype=np.int64,
+                                    count=nlen)
+            A = A[positions][:, positions]
+        return A.asformat(format)
+
+    adj = G.adj
+    if index is None:
+        index = dict(zip(nodelist, range(nlen)))
+        induced = False
+    else:
+        induced = nlen != len(G)
+    degrees = np.fromiter((len(adj[u]) for u in nodelist),
+                          dtype=np.int64,
+                          count=nlen)
+    indptr = np.zeros(nlen + 1, dtype=np.int64)
+    np.cumsum(degrees, out=indptr[1:])
+    m = int(indptr[-1])
+    if induced:
+        indices = np.fromiter(
+            (index.get(v, -1) for u in nodelist for v in adj[u]),
+            dtype=np.int64,
+            count=m)
+    else:
+        indices = np.fromiter((index[v] for u in nodelist for v in adj[u]),
+                              dtype=np.int64,
+                              count=m)
+    if G.is_multigraph():
+        if weight is None:
+            values = (len(keydict) for u in nodelist
+                      for keydict in adj[u].values())
+        else:
+            values = (sum(d.get(weight, 1) for d in keydict.values())
+                      for u in nodelist for keydict in adj[u].values())
+        data = np.fromiter(values, dtype=dtype, count=m)
+    elif weight is None:
+        data = np.ones(m, dtype=dtype)
+    else:
+        data = np.fromiter(
+            (d.get(weight, 1) for u in nodelist for d in adj[u].values()),
+            dtype=dtype,
+            count=m)
+    if induced:
+        # Drop the edges leaving the nodelist and recount the rows
+        keep = indices >= 0
+        rows = np.repeat(np.arange(nlen), degrees)[keep]
+        indices, data = indices[keep], data[keep]
+        indptr[1:] = np.cumsum(np.bincount(rows, minlength=nlen))
+    A = csr_array((data, indices, indptr), shape=(nlen, nlen))
+    return A.asformat(format)
+
 def from_pandas_adjacency(df, create_using=None):
     r"""Returns a graph from Pandas DataFrame.
 
@@ -453,11 +615,10 @@ def from_pandas_edgelist(
     zero or more columns of edge attributes. Each row will be processed as one
     edge instance.
 
-    Note: This function iterates over DataFrame.values, which is not
-    guaranteed to retain the data type across columns in the row. This is only
-    a problem if your row is entirely numeric and a mix of ints and floats. In
-    that case, all values will be returned as floats. See the
-    DataFrame.iterrows documentation for an example.
+    The columns are converted to lists as a whole and the edges added in
+    one pass, so every value keeps the type of its column. To build a
+    `CSRGraph` snapshot straight from the columns, see
+    `CSRGraph.from_edge_arrays`.
 
     Parameters
     ----------
@@ -488,7 +649,7 @@ def from_pandas_edgelist(
 
     See Also
     --------
-    to_pandas_edgelist
+    to_pandas_edgelist, from_arrow, CSRGraph.from_edge_arrays
 
     Examples
     --------
@@ -549,57 +710,309 @@ def from_pandas_edgelist(
 
     """
     g = eg.empty_graph(0, create_using)
+    attr_col_headings = _edge_attr_columns(df.columns, source, target,
+                                           edge_attr)
+    try:
+        columns = [df[col].tolist() for col in attr_col_headings]
+    except (KeyError, TypeError) as err:
+        msg = f"Invalid edge_attr argument: {edge_attr}"
+        raise eg.EasyGraphError(msg) from err
+    keys = None
+    if g.is_multigraph() and edge_key is not None:
+        try:
+            keys = df[edge_key].tolist()
+        except (KeyError, TypeError) as err:
+            msg = f"Invalid edge_key argument: {edge_key}"
+            raise eg.EasyGraphError(msg) from err
+    _add_edge_columns(g, df[source].tolist(), df[target].tolist(),
+                      attr_col_headings, columns, keys)
+    return g
 
-    if edge_attr is None:
-        g.add_edges_from(zip(df[source], df[target]))
-        return g
 
-    reserved_columns = [source, target]
+def to_pandas_edgelist(G, source="source", target="target", edge_key=None):
+    """Returns the graph edge list as a Pandas DataFrame.
+
+    Parameters
+    ----------
+    G : graph
+        The EasyGraph graph, or a `CSRGraph` snapshot, whose columns of
+        weights and edge attributes are then copied as they are.
+
+    source : str or int, optional
+        A valid column name (string or integer) for the source nodes (for the
+        directed case).
+
+    target : str or int, optional
+        A valid column name (string or integer) for the target nodes (for the
+        directed case).
+
+    edge_key : str or None, optional (default=None)
+        A column name for the edge keys of a multigraph.
+
+    Returns
+    -------
+    df : Pandas DataFrame
+       Graph edge list, with one column per edge attribute. Edges without
+       an attribute hold NaN in its column.
+
+    See Also
+    --------
+    from_pandas_edgelist, to_arrow
+
+    Examples
+    --------
+    >>> G = eg.Graph()
+    >>> G.add_edges([("A", "B"), ("C", "E")],
+    ...             edges_attr=[{"cost": 1, "weight": 7}, {"cost": 9}])
+    >>> eg.to_pandas_edgelist(G)
+      source target  cost  weight
+    0      A      B     1     7.0
+    1      C      E     9     NaN
+
+    """
+    import numpy as np
+    import pandas as pd
+    return pd.DataFrame(
+        _edge_list_columns(G, source, target, edge_key, missing=np.nan))
+
+
+def from_arrow(table,
+               source="source",
+               target="target",
+               edge_attr=None,
+               create_using=None,
+               edge_key=None):
+    """Returns a graph from a PyArrow Table containing an edge list.
+
+    The columns are converted to Python lists as a whole, without going
+    through pandas, so graphs can be loaded from Parquet files with
+    ``pyarrow.parquet.read_table``. Null attribute values are left out of
+    the edge data.
+
+    Parameters
+    ----------
+    table : pyarrow.Table
+        An edge list representation of a graph.
+
+    source : str, optional
+        The column of the source nodes (for the directed case).
+
+    target : str, optional
+        The column of the target nodes (for the directed case).
+
+    edge_attr : str, iterable, True, or None
+        A column name or iterable of column names that are added to the
+        graph as edge attributes. If `True`, all of the remaining columns
+        will be added. If `None`, no edge attributes are added to the graph.
 
-    # Additional columns requested
-    attr_col_headings = []
-    attribute_data = []
+    create_using : EasyGraph graph constructor, optional (default=eg.Graph)
+        Graph type to create. If graph instance, then cleared before populated.
+
+    edge_key : str or None, optional (default=None)
+        The column of the edge keys, if create_using is a multigraph.
+
+    Returns
+    -------
+    G : graph
+
+    See Also
+    --------
+    to_arrow, from_pandas_edgelist, CSRGraph.from_edge_arrays
+
+    Examples
+    --------
+    >>> import pyarrow as pa
+    >>> table = pa.table({"source": [0, 1], "target": [1, 2],
+    ...                   "weight": [3.0, None]})
+    >>> G = eg.from_arrow(table, edge_attr=True)
+    >>> G.edges
+    [(0, 1, {'weight': 3.0}), (1, 2, {})]
+
+    Build a CSR snapshot in bulk instead:
+
+    >>> csr = eg.CSRGraph.from_edge_arrays(table["source"], table["target"],
+    ...                                    table["weight"].fill_null(1))
+
+    """
+    g = eg.empty_graph(0, create_using)
+    attr_col_headings = _edge_attr_columns(table.column_names, source,
+                                           target, edge_attr)
+    try:
+        columns = [_arrow_list(table.column(col)) for col in attr_col_headings]
+    except (KeyError, TypeError) as err:
+        msg = f"Invalid edge_attr argument: {edge_attr}"
+        raise eg.EasyGraphError(msg) from err
+    keys = None
+    if g.is_multigraph() and edge_key is not None:
+        try:
+            keys = _arrow_list(table.column(edge_key))
+        except (KeyError, TypeError) as err:
+            msg = f"Invalid edge_key argument: {edge_key}"
+            raise eg.EasyGraphError(msg) from err
+    has_nulls = any(table.column(col).null_count for col in attr_col_headings)
+    _add_edge_columns(g,
+                      _arrow_list(table.column(source)),
+                      _arrow_list(table.column(target)),
+                      attr_col_headings,
+                      columns,
+                      keys,
+                      skip_none=has_nulls)
+    return g
+
+
+def to_arrow(G, source="source", target="target", edge_key=None):
+    """Returns the graph edge list as a PyArrow Table.
+
+    Parameters
+    ----------
+    G : graph
+        The EasyGraph graph, or a `CSRGraph` snapshot, whose columns of
+        weights and edge attributes are then copied as they are.
+
+    source : str, optional
+        The column name of the source nodes (for the directed case).
+
+    target : str, optional
+        The column name of the target nodes (for the directed case).
+
+    edge_key : str or None, optional (default=None)
+        A column name for the edge keys of a multigraph.
+
+    Returns
+    -------
+    table : pyarrow.Table
+       Graph edge list, with one column per edge attribute. Edges without
+       an attribute hold null in its column.
+
+    See Also
+    --------
+    from_arrow, to_pandas_edgelist
+
+    Examples
+    --------
+    >>> import pyarrow.parquet as pq
+    >>> pq.write_table(eg.to_arrow(G), "edges.parquet")
+    >>> H = eg.from_arrow(pq.read_table("edges.parquet"), edge_attr=True)
+
+    """
+    import pyarrow as pa
+    return pa.table(
+        _edge_list_columns(G, source, target, edge_key, missing=None))
+
+
+def _edge_attr_columns(columns, source, target, edge_attr):
+    # the attribute columns requested by edge_attr
+    if edge_attr is None:
+        return []
     if edge_attr is True:
-        attr_col_headings = [c for c in df.columns if c not in reserved_columns]
+        attr_col_headings = [c for c in columns if c not in (source, target)]
     elif isinstance(edge_attr, (list, tuple)):
-        attr_col_headings = edge_attr
+        attr_col_headings = list(edge_attr)
     else:
         attr_col_headings = [edge_attr]
     if len(attr_col_headings) == 0:
         raise eg.EasyGraphError(
             f"Invalid edge_attr argument: No columns found with name: {attr_col_headings}"
         )
-
+    return attr_col_headings
+
+
+def _arrow_list(column):
+    # to_numpy() is much faster than to_pylist() but turns nulls into NaN
+    if column.null_count:
+        return column.to_pylist()
+    return column.to_numpy().tolist()
+
+
+def _add_edge_columns(G,
+                      sources,
+                      targets,
+                      names,
+                      columns,
+                      keys=None,
+                      skip_none=False):
+    # Add the edges given as lists aligned by edge, with the attribute
+    # columns named by names, building the data dicts in one pass.
+    if not names:
+        records = itertools.repeat({})
+    elif skip_none:
+        records = ({
+            name: value
+            for name, value in zip(names, row) if value is not None
+        } for row in zip(*columns))
+    else:
+        records = map(dict, map(zip, itertools.repeat(names), zip(*columns)))
+    # The cyclic garbage collector is paused, as in parse_edgelist, since
+    # it would otherwise walk the growing graph again and again.
+    gc_enabled = gc.isenabled()
+    gc.disable()
     try:
-        attribute_data = zip(*[df[col] for col in attr_col_headings])
-    except (KeyError, TypeError) as err:
-        msg = f"Invalid edge_attr argument: {edge_attr}"
-        raise eg.EasyGraphError(msg) from err
-
-    if g.is_multigraph():
-        # => append the edge keys from the df to the bundled data
-        if edge_key is not None:
-            try:
-                multigraph_edge_keys = df[edge_key]
-                attribute_data = zip(attribute_data, multigraph_edge_keys)
-            except (KeyError, TypeError) as err:
-                msg = f"Invalid edge_key argument: {edge_key}"
-                raise eg.EasyGraphError(msg) from err
-
-        for s, t, attrs in zip(df[source], df[target], attribute_data):
-            if edge_key is not None:
-                attrs, multigraph_edge_key = attrs
-                key = g.add_edge(s, t, key=multigraph_edge_key)
+        if G.is_multigraph():
+            if keys is None:
+                G.add_edges_from(zip(sources, targets, records))
             else:
-                key = g.add_edge(s, t)
+                G.add_edges_from(zip(sources, targets, keys, records))
+        elif hasattr(G, "_add_one_edge"):
+            add_one_edge = G._add_one_edge
+            for u, v, data in zip(sources, targets, records):
+                add_one_edge(u, v, data)
+        else:
+            G.add_edges(list(zip(sources, targets)),
+                        list(itertools.islice(records, len(sources))))
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _edge_list_columns(G, source, target, edge_key, missing):
+    # Columns of the edges of G, as a dict of lists or arrays
+    if isinstance(G, eg.CSRGraph):
+        import numpy as np
+        n = len(G)
+        sources = np.repeat(np.arange(n), np.diff(G.indptr))
+        keep = slice(None)
+        if not G.is_directed():
+            keep = sources <= G.indices
+        nodes = np.empty(n, dtype=object)
+        nodes[:] = G.nodes
+        columns = {
+            source: nodes[sources[keep]].tolist(),
+            target: nodes[G.indices[keep]].tolist(),
+        }
+        attrs = dict(G.edge_attrs)
+        attrs.setdefault(G.weight or "weight", G.weights)
+        for key, column in attrs.items():
+            columns[key] = np.asarray(column)[keep]
+        return columns
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _graph_edge_list_columns(G, source, target, edge_key, missing)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
 
-            g[s][t][key].update(zip(attr_col_headings, attrs))
+def _graph_edge_list_columns(G, source, target, edge_key, missing):
+    # transpose the edge tuples, then gather the attributes column by column
+    columns = list(map(list, zip(*G.edges)))
+    if not columns:
+        columns = [[], [], [], []] if G.is_multigraph() else [[], [], []]
+    if G.is_multigraph():
+        sources, targets, keys, datas = columns
     else:
-        for s, t, attrs in zip(df[source], df[target], attribute_data):
-            g.add_edge(s, t)
-            g[s][t].update(zip(attr_col_headings, attrs))
+        sources, targets, datas = columns
+        keys = None
+    columns = {source: sources, target: targets}
+    for name in dict.fromkeys(itertools.chain.from_iterable(datas)):
+        if name in columns:
+            raise eg.EasyGraphError(
+                f"Edge attribute {name!r} conflicts with a node column.")
+        columns[name] = [d.get(name, missing) for d in datas]
+    if keys is not None and edge_key is not None:
+        columns[edge_key] = keys
+    return columns
 
-    return g
 
 def from_scipy_sparse_matrix(
     A, parallel_edges=False, create_using=None, edge_attribute="weight"
@@ -686,6 +1099,10 @@ def from_scipy_sparse_array(
         raise eg.EasyGraphError(f"Adjacency matrix not square: nx,ny={A.shape}")
     # Make sure we get even the isolated nodes of the graph.
     G.add_nodes_from(range(n))
+    if not G.is_multigraph():
+        A = A.tocoo()
+        G.add_edges_from_arrays(A.row, A.col, weights=A.data)
+        return G
     # Create an iterable over (u, v, w) triples and for each triple, add an
     # edge from u to v with weight w.
     triples = _generate_weighted_edges(A)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Time read_gml against read_edgelist on the same random graph.
+
+    python scripts/benchmark_gml.py --edges 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import easygraph as eg
+
+
+def write_files(directory, n_nodes, n_edges, seed):
+    rng = random.Random(seed)
+    edges = set()
+    while len(edges) < n_edges:
+        u, v = rng.randrange(n_nodes), rng.randrange(n_nodes)
+        if u != v:
+            edges.add((min(u, v), max(u, v)))
+    gml = os.path.join(directory, "graph.gml")
+    with open(gml, "w") as f:
+        f.write("graph [\n  directed 0\n")
+        for n in range(n_nodes):
+            f.write(f'  node [\n    id {n}\n    label "{n}"\n  ]\n')
+        for u, v in edges:
+            f.write(f"  edge [\n    source {u}\n    target {v}\n"
+                    f"    weight {rng.random():.6f}\n  ]\n")
+        f.write("]\n")
+    edgelist = os.path.join(directory, "graph.edgelist")
+    with open(edgelist, "w") as f:
+        for u, v in edges:
+            f.write(f"{u} {v} {rng.random():.6f}\n")
+    return gml, edgelist
+
+
+def timed(name, path, n_edges, read):
+    start = time.perf_counter()
+    G = read(path)
+    seconds = time.perf_counter() - start
+    size = os.path.getsize(path) / 2**20
+    print(f"{name:>14}: {seconds:7.2f} s  {size / seconds:7.1f} MB/s  "
+          f"{n_edges / seconds:10.0f} edges/s  ({len(G)} nodes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--edges", type=int, default=1000000)
+    parser.add_argument("--nodes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    n_nodes = args.nodes or max(args.edges // 5, 2)
+    with tempfile.TemporaryDirectory() as directory:
+        gml, edgelist = write_files(directory, n_nodes, args.edges, args.seed)
+        timed("read_gml", gml, args.edges, eg.read_gml)
+        timed("read_edgelist", edgelist, args.edges,
+              lambda path: eg.read_edgelist(path,
+                                            data=(("weight", float),)))
+
+
+if __name__ == "__main__":
+    main()
@@ -14,12 +14,15 @@ sources = [
     'easygraph/classes/GraphC/GraphMapIter.cpp',
     'easygraph/classes/GraphC/GraphModule.cpp',
     'easygraph/classes/GraphC/ModuleMethods.cpp',
+    'easygraph/classes/GraphC/ReadFile.cpp',
 ]
 
 uname = platform.uname()
 compileArgs = []
+linkArgs = []
 if uname[0] == "Darwin" or uname[0] == "Linux":
-    compileArgs = ["-std=c++11"]
+    compileArgs = ["-std=c++11", "-pthread"]
+    linkArgs = ["-pthread"]
 CYTHON_STR = 'Cython'
 
 setuptools.setup(name="Python-EasyGraph",
@@ -71,5 +74,6 @@ setuptools.setup(name="Python-EasyGraph",
                      setuptools.Extension('cpp_easygraph',
                                           sources,
                                           optional=True,
-                                          extra_compile_args=compileArgs)
+                                          extra_compile_args=compileArgs,
+                                          extra_link_args=linkArgs)
                  ])